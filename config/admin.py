@@ -0,0 +1,132 @@
+"""
+Admin helpers for tables too large to count or list in full.
+
+EstimatedCountPaginator takes the row count of a changelist from the
+PostgreSQL planner once it exceeds ADMIN_EXACT_COUNT_LIMIT, instead of
+running COUNT(*) over millions of rows. AutocompleteFilter filters by a
+related object picked through the admin autocomplete view, so the filter
+does not load every row of the related table to list the choices.
+
+LazyAdminConfig leaves the import of the admin modules of every app to
+the first admin request, see config.admin_urls.
+"""
+
+import json
+
+from django import forms
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.apps import SimpleAdminConfig
+from django.contrib.admin.checks import check_admin_app, check_dependencies
+from django.core import checks
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.urls import reverse
+from django.utils.functional import cached_property
+
+
+class LazyAdminConfig(SimpleAdminConfig):
+    def ready(self) -> None:
+        checks.register(check_dependencies, checks.Tags.admin)
+        checks.register(check_discovered_admin, checks.Tags.admin)
+
+
+def check_discovered_admin(app_configs, **kwargs) -> list[checks.CheckMessage]:
+    # The model admins to check are only registered once discovered.
+    admin.autodiscover()
+    return check_admin_app(app_configs, **kwargs)
+
+
+def estimated_count(queryset: QuerySet) -> int | None:
+    """Return the planner's row estimate of a queryset on PostgreSQL."""
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedCountPaginator(Paginator):
+    @cached_property
+    def count(self) -> int:
+        if isinstance(self.object_list, QuerySet):
+            estimate = estimated_count(self.object_list)
+            if estimate is not None:
+                if estimate >= settings.ADMIN_EXACT_COUNT_LIMIT:
+                    return estimate
+        return super().count
+
+
+class AutocompleteFilter(admin.RelatedFieldListFilter):
+    """
+    Filter on a foreign key through the autocomplete of its model admin,
+    which needs search_fields. The model admin using the filter needs
+    AutocompleteFilterMixin for the scripts.
+    """
+
+    template = "admin/autocomplete_filter.html"
+
+    def field_choices(self, field, request, model_admin):
+        # Only the selected object is loaded, to display it.
+        if not self.lookup_val:
+            return []
+        related_model = field.remote_field.model
+        try:
+            selected = related_model._default_manager.filter(
+                pk__in=self.lookup_val
+            )
+            return [(obj.pk, str(obj)) for obj in selected]
+        except (ValueError, ValidationError):
+            # The changelist rejects the malformed parameter.
+            return []
+
+    def has_output(self) -> bool:
+        return True
+
+    def choices(self, changelist):
+        meta = self.field.model._meta
+        yield {
+            "parameter_name": self.lookup_kwarg,
+            "selected": (
+                self.lookup_choices[0] if self.lookup_choices else None
+            ),
+            "url": reverse("admin:autocomplete"),
+            "app_label": meta.app_label,
+            "model_name": meta.model_name,
+            "field_name": self.field.name,
+            "hidden_params": [
+                (name, value)
+                for name, values in changelist.filter_params.items()
+                if name not in self.expected_parameters()
+                for value in values
+            ],
+        }
+
+
+class AutocompleteFilterMixin:
+    """Adds the scripts of AutocompleteFilter to a model admin."""
+
+    @property
+    def media(self) -> forms.Media:
+        extra = "" if settings.DEBUG else ".min"
+        return super().media + forms.Media(
+            js=(
+                f"admin/js/vendor/jquery/jquery{extra}.js",
+                f"admin/js/vendor/select2/select2.full{extra}.js",
+                "admin/js/jquery.init.js",
+                "admin/js/autocomplete.js",
+            ),
+            css={
+                "screen": (
+                    f"admin/css/vendor/select2/select2{extra}.css",
+                    "admin/css/autocomplete.css",
+                ),
+            },
+        )
@@ -0,0 +1,11 @@
+"""
+Admin URLs, imported with the admin modules of every app on the first
+admin request (see config.startup.lazy_include).
+"""
+
+from django.contrib import admin
+
+admin.autodiscover()
+
+app_name = "admin"
+urlpatterns = admin.site.get_urls()
@@ -0,0 +1,237 @@
+"""
+Content-negotiated response compression.
+
+Responses are compressed with the best encoding the client accepts,
+among zstd and brotli (when their packages are installed) and gzip, at
+a level chosen by content type. Streaming responses are compressed
+chunk by chunk. Compressed bodies of static documents, such as the
+OpenAPI schema, are cached so they are only compressed once.
+"""
+
+import hashlib
+import zlib
+from typing import AsyncIterator, Iterable
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpRequest, HttpResponseBase
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class GzipCompressor:
+    def __init__(self, level: int) -> None:
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self.compressor.flush()
+
+
+class BrotliCompressor:
+    def __init__(self, level: int) -> None:
+        self.compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self.compressor.flush()
+
+    def finish(self) -> bytes:
+        return self.compressor.finish()
+
+
+class ZstdCompressor:
+    def __init__(self, level: int) -> None:
+        self.compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self.compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self.compressor.flush()
+
+
+COMPRESSORS = {"gzip": GzipCompressor}
+if brotli is not None:
+    COMPRESSORS["br"] = BrotliCompressor
+if zstandard is not None:
+    COMPRESSORS["zstd"] = ZstdCompressor
+
+DEFAULT_LEVELS = {"gzip": 6, "br": 4, "zstd": 3}
+NO_BODY_STATUSES = {204, 206, 304}
+
+
+def parse_accept_encoding(header: str) -> dict[str, float]:
+    accepted = {}
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name] = quality
+    return accepted
+
+
+def choose_encoding(header: str) -> str | None:
+    """
+    Return the available encoding the client prefers. Ties are broken by
+    the server preference in COMPRESSION_ENCODINGS.
+    """
+    accepted = parse_accept_encoding(header)
+    best, best_quality = None, 0.0
+    for name in settings.COMPRESSION_ENCODINGS:
+        if name not in COMPRESSORS:
+            continue
+        quality = accepted.get(name, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+def compression_levels(content_type: str) -> dict[str, int] | None:
+    """Return the levels configured for the longest matching type."""
+    media_type = content_type.split(";")[0].strip().lower()
+    matches = [
+        prefix
+        for prefix in settings.COMPRESSION_LEVELS
+        if media_type.startswith(prefix)
+    ]
+    if not matches:
+        return None
+    return settings.COMPRESSION_LEVELS[max(matches, key=len)]
+
+
+def compress(data: bytes, encoding: str, level: int) -> bytes:
+    compressor = COMPRESSORS[encoding](level)
+    return compressor.compress(data) + compressor.finish()
+
+
+def compress_cached(data: bytes, encoding: str, level: int) -> bytes:
+    digest = hashlib.sha256(data).hexdigest()
+    key = f"compression:{encoding}:{level}:{digest}"
+    cache = caches[settings.COMPRESSION_CACHE]
+    compressed = cache.get(key)
+    if compressed is None:
+        compressed = compress(data, encoding, level)
+        cache.set(key, compressed, settings.COMPRESSION_CACHE_TIMEOUT)
+    return compressed
+
+
+def compress_sequence(
+    chunks: Iterable[bytes], encoding: str, level: int
+) -> Iterable[bytes]:
+    # Each chunk is flushed so clients can process it without waiting
+    # for the rest of the stream.
+    compressor = COMPRESSORS[encoding](level)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def compress_async_sequence(
+    chunks: AsyncIterator[bytes], encoding: str, level: int
+) -> AsyncIterator[bytes]:
+    compressor = COMPRESSORS[encoding](level)
+    async for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+def weaken_etag(response: HttpResponseBase) -> None:
+    # The compressed body is not byte-identical to the original one.
+    etag = response.get("ETag")
+    if etag and etag.startswith('"'):
+        response.headers["ETag"] = "W/" + etag
+
+
+class CompressionMiddleware:
+    """Compress response bodies with the encoding negotiated per request."""
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponseBase:
+        response = self.get_response(request)
+        return self.compress_response(request, response)
+
+    def compress_response(
+        self, request: HttpRequest, response: HttpResponseBase
+    ) -> HttpResponseBase:
+        if (
+            response.status_code < 200
+            or response.status_code in NO_BODY_STATUSES
+            or response.has_header("Content-Encoding")
+            or response.has_header("Content-Range")
+        ):
+            return response
+
+        levels = compression_levels(response.get("Content-Type", ""))
+        if levels is None:
+            return response
+        if (
+            not response.streaming
+            and len(response.content) < settings.COMPRESSION_MIN_SIZE
+        ):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = choose_encoding(request.headers.get("Accept-Encoding", ""))
+        if encoding is None:
+            return response
+        level = levels.get(encoding, DEFAULT_LEVELS[encoding])
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = compress_async_sequence(
+                    response.streaming_content, encoding, level
+                )
+            else:
+                response.streaming_content = compress_sequence(
+                    response.streaming_content, encoding, level
+                )
+            response.headers.pop("Content-Length", None)
+        else:
+            media_type = response["Content-Type"].split(";")[0].strip()
+            if media_type in settings.COMPRESSION_CACHE_TYPES:
+                content = compress_cached(response.content, encoding, level)
+            else:
+                content = compress(response.content, encoding, level)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response.headers["Content-Length"] = str(len(content))
+
+        weaken_etag(response)
+        response.headers["Content-Encoding"] = encoding
+        return response
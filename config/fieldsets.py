@@ -0,0 +1,106 @@
+"""
+Sparse fieldsets and expansion control for API responses.
+
+`?fields=id,name` limits a response to the listed fields and
+`?expand=route` renders only the listed relations nested; other
+expandable relations fall back to their collapsed form, usually primary
+keys. Without the parameters responses are unchanged. Views use the
+same parameters to leave unrequested relations out of their querysets.
+"""
+
+import copy
+
+from django.db.models import QuerySet
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.request import Request
+
+FIELDSET_PARAMETERS = [
+    OpenApiParameter(
+        name="fields",
+        type=OpenApiTypes.STR,
+        description="Comma-separated fields to return (e.g., id,route).",
+    ),
+    OpenApiParameter(
+        name="expand",
+        type=OpenApiTypes.STR,
+        description=(
+            "Comma-separated relations to render nested; "
+            "other relations are returned as IDs."
+        ),
+    ),
+]
+
+
+def query_list(request: Request | None, name: str) -> set[str] | None:
+    """Return the names of a comma-separated query parameter, if given."""
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    value = request.query_params.get(name)
+    if value is None:
+        return None
+    return {item.strip() for item in value.split(",") if item.strip()}
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin applying ?fields= and ?expand= to the serializer
+    that renders the response. `Meta.collapsed_fields` maps expandable
+    fields to the field rendered when they are not expanded.
+    """
+
+    def renders_response(self) -> bool:
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+    def get_fields(self) -> dict[str, serializers.Field]:
+        fields = super().get_fields()
+        if not self.renders_response():
+            return fields
+
+        request = self.context.get("request")
+        if (wanted := query_list(request, "fields")) is not None:
+            fields = {
+                name: field for name, field in fields.items() if name in wanted
+            }
+
+        if (expand := query_list(request, "expand")) is not None:
+            collapsed = getattr(self.Meta, "collapsed_fields", {})
+            for name, field in collapsed.items():
+                if name in fields and name not in expand:
+                    fields[name] = copy.deepcopy(field)
+        return fields
+
+
+class SparseFieldsetViewMixin:
+    """View helpers to skip loading fields the client did not request."""
+
+    def wants_field(self, name: str) -> bool:
+        wanted = query_list(self.request, "fields")
+        return wanted is None or name in wanted
+
+    def expands_field(self, name: str) -> bool:
+        expand = query_list(self.request, "expand")
+        return self.wants_field(name) and (expand is None or name in expand)
+
+    def only_requested(
+        self, queryset: QuerySet, columns: dict[str, str | list[str]]
+    ) -> QuerySet:
+        """
+        Defer the model fields of unrequested serializer fields, given a
+        mapping of serializer field to the model field(s) it reads.
+        """
+        if query_list(self.request, "fields") is None:
+            return queryset
+
+        requested = [queryset.model._meta.pk.name]
+        for name, model_fields in columns.items():
+            if self.wants_field(name):
+                if isinstance(model_fields, str):
+                    model_fields = [model_fields]
+                requested.extend(model_fields)
+        return queryset.only(*requested)
@@ -0,0 +1,113 @@
+"""
+Gunicorn configuration, used with `gunicorn -c python:config.gunicorn`.
+
+Workers and threads are sized from the CPUs available to the process and
+DB_MAX_CONNECTIONS, the database connections this server may hold: every
+thread keeps its own connection, so workers * threads stays within it,
+next to the connections of the booking queue writers of each worker (see
+order.booking). The application is preloaded in the master (see
+config.startup), and workers are recycled after GUNICORN_MAX_REQUESTS
+requests, with jitter so they do not all restart at once. Every setting
+can be overridden from the environment.
+"""
+
+import os
+import time
+from typing import Any
+
+from config import workers as worker_metrics
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+WORKER_CLASSES = {
+    "gthread": "gthread",
+    "sync": "sync",
+    "uvicorn": "uvicorn.workers.UvicornWorker",
+}
+
+
+def env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def available_cpus() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def size_workers(
+    cpus: int, db_connections: int, max_threads: int, reserved: int = 0
+) -> tuple[int, int]:
+    """
+    Return the number of workers and of threads per worker, leaving
+    `reserved` connections per worker to its booking queue writers.
+    """
+    workers = max(1, min(2 * cpus + 1, db_connections // (1 + reserved)))
+    threads = max(1, min(max_threads, db_connections // workers - reserved))
+    return workers, threads
+
+
+worker_type = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+worker_class = WORKER_CLASSES[worker_type]
+booking_writers = (
+    env_int("BOOKING_QUEUE_PARTITIONS", 4)
+    if os.environ.get("BOOKING_QUEUE_ENABLED", "").lower() == "true"
+    else 0
+)
+default_workers, default_threads = size_workers(
+    available_cpus(),
+    env_int("DB_MAX_CONNECTIONS", 20),
+    env_int("GUNICORN_MAX_THREADS", 4),
+    booking_writers,
+)
+workers = env_int("WEB_CONCURRENCY", default_workers)
+# Async workers serve concurrent requests without threads.
+threads = (
+    env_int("GUNICORN_THREADS", default_threads)
+    if worker_type == "gthread"
+    else 1
+)
+
+if worker_type == "uvicorn":
+    wsgi_app = "config.asgi:application"
+else:
+    wsgi_app = "config.wsgi:create_app()"
+preload_app = os.environ.get("GUNICORN_PRELOAD", "true").lower() == "true"
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+max_requests = env_int("GUNICORN_MAX_REQUESTS", 1000)
+max_requests_jitter = env_int(
+    "GUNICORN_MAX_REQUESTS_JITTER", max_requests // 10
+)
+timeout = env_int("GUNICORN_TIMEOUT", 30)
+graceful_timeout = env_int("GUNICORN_GRACEFUL_TIMEOUT", 30)
+keepalive = env_int("GUNICORN_KEEPALIVE", 5)
+# Heartbeat files on a disk-backed /tmp can block workers in containers.
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG") or None
+
+
+def on_starting(server: Any) -> None:
+    worker_metrics.clear()
+
+
+def post_fork(server: Any, worker: Any) -> None:
+    worker_metrics.start(worker.pid)
+
+
+def pre_request(worker: Any, req: Any) -> None:
+    req.started_at = time.monotonic()
+    worker_metrics.request_started()
+
+
+def post_request(worker: Any, req: Any, environ: dict, resp: Any) -> None:
+    duration_ms = (time.monotonic() - req.started_at) * 1000
+    worker_metrics.request_finished(resp.status_code or 0, duration_ms)
+
+
+def child_exit(server: Any, worker: Any) -> None:
+    worker_metrics.remove(worker.pid)
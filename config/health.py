@@ -0,0 +1,46 @@
+"""
+Health checks for load balancers and orchestrators, and the request
+metrics of every server worker.
+
+Liveness answers without touching the database, so a database outage
+does not get healthy workers restarted. Readiness runs one trivial
+query on the request thread's connection, which is usually kept open.
+"""
+
+from django.db import DatabaseError, connection
+from django.http import HttpRequest, JsonResponse
+from django.views.decorators.cache import never_cache
+from drf_spectacular.utils import extend_schema
+from rest_framework.permissions import IsAdminUser
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from . import workers
+
+
+@never_cache
+def live(request: HttpRequest) -> JsonResponse:
+    return JsonResponse({"status": "ok"})
+
+
+@never_cache
+def ready(request: HttpRequest) -> JsonResponse:
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+    except DatabaseError:
+        return JsonResponse({"status": "unavailable"}, status=503)
+    return JsonResponse({"status": "ok"})
+
+
+class WorkerMetricsView(APIView):
+    """List the request metrics of every live server worker."""
+
+    permission_classes = (IsAdminUser,)
+
+    @extend_schema(
+        responses={200: {"type": "array", "items": {"type": "object"}}}
+    )
+    def get(self, request: Request) -> Response:
+        return Response(workers.read_all())
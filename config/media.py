@@ -0,0 +1,160 @@
+import mimetypes
+import os
+import re
+from typing import BinaryIO
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpRequest,
+    HttpResponse,
+    HttpResponseNotModified,
+)
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+# Uploaded file names embed a UUID or a content hash,
+# so their content never changes.
+CONTENT_ADDRESSED_RE = re.compile(
+    r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"
+    r"|[0-9a-f]{64}"
+)
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class FileRange:
+    """
+    Read-only view of a byte range of a file. It keeps `fileno()` so WSGI
+    servers can still send the range with sendfile().
+    """
+
+    def __init__(self, file: BinaryIO, start: int, length: int) -> None:
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self) -> int:
+        return self.file.fileno()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class RangeNotSatisfiable(Exception):
+    """A well-formed byte range that lies outside the file."""
+
+
+def parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """
+    Return the (start, end) of a single byte range, end inclusive, or None
+    when the header is malformed or asks for several ranges, in which case
+    it is ignored and the whole file is served.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        if int(end) == 0 or size == 0:
+            raise RangeNotSatisfiable
+        return max(size - int(end), 0), size - 1
+    start = int(start)
+    if end and int(end) < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable
+    end = min(int(end), size - 1) if end else size - 1
+    return start, end
+
+
+def cache_control(path: str) -> str:
+    if CONTENT_ADDRESSED_RE.search(os.path.basename(path)):
+        return f"public, max-age={settings.MEDIA_IMMUTABLE_MAX_AGE}, immutable"
+    return f"public, max-age={settings.MEDIA_MAX_AGE}"
+
+
+@require_safe
+def serve_media(request: HttpRequest, path: str) -> HttpResponse:
+    """
+    Serve an uploaded file with validators, long-lived caching for
+    content-addressed names and single byte-range support. When a front
+    server is configured, the transfer is handed over to it instead.
+    """
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+
+    stat = os.stat(full_path)
+    etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": http_date(stat.st_mtime),
+        "Cache-Control": cache_control(path),
+        "Accept-Ranges": "bytes",
+    }
+
+    if_none_match = request.headers.get("If-None-Match")
+    if_modified_since = parse_http_date_safe(
+        request.headers.get("If-Modified-Since", "")
+    )
+    if (if_none_match and etag in if_none_match) or (
+        not if_none_match
+        and if_modified_since
+        and int(stat.st_mtime) <= if_modified_since
+    ):
+        return HttpResponseNotModified(headers=headers)
+
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or "application/octet-stream"
+
+    if header := settings.MEDIA_SENDFILE_HEADER:
+        if header == "X-Accel-Redirect":
+            headers[header] = settings.MEDIA_SENDFILE_ROOT + path
+        else:
+            headers[header] = full_path
+        return HttpResponse(content_type=content_type, headers=headers)
+
+    byte_range = None
+    range_header = request.headers.get("Range")
+    if_range = request.headers.get("If-Range")
+    if range_header and (not if_range or if_range == etag):
+        try:
+            byte_range = parse_range(range_header, stat.st_size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response.headers["Content-Range"] = f"bytes */{stat.st_size}"
+            return response
+
+    if encoding:
+        headers["Content-Encoding"] = encoding
+
+    file = open(full_path, "rb")
+    if not byte_range:
+        headers["Content-Length"] = str(stat.st_size)
+        return FileResponse(file, content_type=content_type, headers=headers)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return FileResponse(
+        FileRange(file, start, end - start + 1),
+        status=206,
+        content_type=content_type,
+        headers=headers,
+    )
@@ -0,0 +1,211 @@
+"""
+On-demand profiling of single requests for staff users.
+
+A request sent with the `X-Profile` header or the `profile` query
+parameter is run under cProfile while every SQL query is timed. With the
+value `json` the profile replaces the response body; any other value
+stores it in PROFILING_DIR, as a JSON report and a `.prof` file for
+pstats or snakeviz, and returns its id in `X-Profile-Id`. Requests
+without the flag only pay for the flag lookup.
+
+Only one request of a process is profiled at a time, as Python 3.12+
+allows a single active profiler; flagged requests arriving meanwhile are
+served unprofiled with `X-Profile-Skipped: busy`.
+"""
+
+import cProfile
+import json
+import pstats
+import threading
+import time
+import uuid
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any, Callable
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpRequest, HttpResponseBase, JsonResponse
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+TOP_FUNCTIONS = 30
+TREE_DEPTH = 15
+# Call tree nodes below this share of the total time are left out.
+TREE_MIN_SHARE = 0.01
+
+_profiler_lock = threading.Lock()
+
+
+def profile_flag(request: HttpRequest) -> str | None:
+    return request.headers.get("X-Profile") or request.GET.get("profile")
+
+
+def is_staff_request(request: HttpRequest) -> bool:
+    """Check the session user, then the API authentication classes."""
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return user.is_staff
+
+    drf_request = Request(request)
+    for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        try:
+            result = authentication_class().authenticate(drf_request)
+        except APIException:
+            return False
+        if result is not None:
+            return result[0].is_staff
+    return False
+
+
+class QueryLog:
+    """Database execute wrapper recording each query and its duration."""
+
+    def __init__(self) -> None:
+        self.queries = []
+
+    def __call__(self, execute: Callable, sql, params, many, context) -> Any:
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(
+                {
+                    "alias": context["connection"].alias,
+                    "sql": sql,
+                    "many": many,
+                    "ms": round((time.perf_counter() - start) * 1000, 3),
+                }
+            )
+
+
+def function_name(func: tuple[str, int, str]) -> str:
+    filename, line, name = func
+    if filename == "~":
+        return name
+    return f"{filename}:{line}({name})"
+
+
+def top_functions(stats: pstats.Stats) -> list[dict[str, Any]]:
+    rows = sorted(
+        stats.stats.items(), key=lambda item: item[1][3], reverse=True
+    )
+    return [
+        {
+            "function": function_name(func),
+            "calls": calls,
+            "own_ms": round(own * 1000, 3),
+            "cumulative_ms": round(cumulative * 1000, 3),
+        }
+        for func, (_, calls, own, cumulative, _) in rows[:TOP_FUNCTIONS]
+    ]
+
+
+def call_tree(stats: pstats.Stats, total: float) -> list[dict[str, Any]]:
+    """
+    Build a call tree from the caller/callee edges recorded by cProfile.
+    Times of a node are those of the edge from its parent.
+    """
+    callees = {}
+    roots = []
+    for func, (_, _, _, cumulative, callers) in stats.stats.items():
+        if not callers:
+            roots.append((func, cumulative))
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+
+    def node(func, cumulative, path, depth):
+        children = []
+        if depth < TREE_DEPTH:
+            for child, child_time in sorted(
+                callees.get(func, []), key=lambda item: item[1], reverse=True
+            ):
+                if child in path or child_time < total * TREE_MIN_SHARE:
+                    continue
+                children.append(
+                    node(child, child_time, path | {child}, depth + 1)
+                )
+        return {
+            "function": function_name(func),
+            "cumulative_ms": round(cumulative * 1000, 3),
+            "children": children,
+        }
+
+    return [node(func, time_, {func}, 0) for func, time_ in roots]
+
+
+def build_report(
+    request: HttpRequest,
+    response: HttpResponseBase,
+    profiler: cProfile.Profile,
+    query_log: QueryLog,
+    total: float,
+) -> dict[str, Any]:
+    stats = pstats.Stats(profiler)
+    return {
+        "method": request.method,
+        "path": request.get_full_path(),
+        "status": response.status_code,
+        "total_ms": round(total * 1000, 3),
+        "sql": {
+            "count": len(query_log.queries),
+            "total_ms": round(sum(q["ms"] for q in query_log.queries), 3),
+            "queries": query_log.queries,
+        },
+        "top_functions": top_functions(stats),
+        "call_tree": call_tree(stats, total),
+    }
+
+
+def store_profile(
+    profile_id: str, profiler: cProfile.Profile, report: dict[str, Any]
+) -> None:
+    directory = Path(settings.PROFILING_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    profiler.dump_stats(directory / f"{profile_id}.prof")
+    with open(directory / f"{profile_id}.json", "w") as report_file:
+        json.dump(report, report_file, indent=2, default=str)
+
+
+class ProfilingMiddleware:
+    """Profile requests flagged by staff users."""
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponseBase:
+        flag = profile_flag(request)
+        if not flag or not is_staff_request(request):
+            return self.get_response(request)
+        if not _profiler_lock.acquire(blocking=False):
+            response = self.get_response(request)
+            response.headers["X-Profile-Skipped"] = "busy"
+            return response
+        try:
+            return self.profile(request, flag)
+        finally:
+            _profiler_lock.release()
+
+    def profile(self, request: HttpRequest, flag: str) -> HttpResponseBase:
+        profiler = cProfile.Profile()
+        query_log = QueryLog()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(query_log))
+            start = time.perf_counter()
+            response = profiler.runcall(self.get_response, request)
+            total = time.perf_counter() - start
+
+        report = build_report(request, response, profiler, query_log, total)
+        if flag == "json":
+            return JsonResponse(report, json_dumps_params={"default": str})
+
+        profile_id = uuid.uuid4().hex
+        store_profile(profile_id, profiler, report)
+        response.headers["X-Profile-Id"] = profile_id
+        response.headers["Server-Timing"] = (
+            f"total;dur={report['total_ms']}, "
+            f"sql;dur={report['sql']['total_ms']}"
+        )
+        return response
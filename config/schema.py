@@ -0,0 +1,148 @@
+"""
+OpenAPI schema generated once per code version.
+
+Introspecting every view on each request is expensive, so the rendered
+schema is kept in memory and in SCHEMA_CACHE_DIR, under a file name that
+includes the code version. It is built by the `build_schema` command at
+deploy time, or on the first request otherwise, and served with an
+ETag so clients can revalidate it.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+import drf_spectacular
+from django.apps import apps
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.views import SpectacularAPIView
+from rest_framework.request import Request
+
+SCHEMA_RENDERERS = {"yaml": OpenApiYamlRenderer, "json": OpenApiJsonRenderer}
+
+
+@dataclass(frozen=True)
+class SchemaDocument:
+    content: bytes
+    etag: str
+
+
+_documents: dict[tuple[str, str], SchemaDocument] = {}
+_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def code_version() -> str:
+    """
+    Return SCHEMA_CODE_VERSION, or a fingerprint of the project's Python
+    sources and the drf-spectacular version.
+    """
+    if settings.SCHEMA_CODE_VERSION:
+        return settings.SCHEMA_CODE_VERSION
+
+    base_dir = Path(settings.BASE_DIR)
+    paths = {base_dir / "config"}
+    for app_config in apps.get_app_configs():
+        path = Path(app_config.path)
+        if path.is_relative_to(base_dir):
+            paths.add(path)
+
+    digest = hashlib.sha256(drf_spectacular.__version__.encode())
+    for path in sorted(paths):
+        for source in sorted(path.rglob("*.py")):
+            stat = source.stat()
+            digest.update(
+                f"{source.relative_to(base_dir)}:{stat.st_size}:"
+                f"{stat.st_mtime_ns}".encode()
+            )
+    return digest.hexdigest()[:16]
+
+
+def schema_path(schema_format: str, version: str) -> Path:
+    return (
+        Path(settings.SCHEMA_CACHE_DIR) / f"schema-{version}.{schema_format}"
+    )
+
+
+def render_schema(schema_format: str) -> bytes:
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    schema = generator.get_schema(request=None, public=True)
+    return SCHEMA_RENDERERS[schema_format]().render(
+        schema, renderer_context={}
+    )
+
+
+def write_atomic(path: Path, content: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".schema-")
+    with os.fdopen(fd, "wb") as tmp_file:
+        tmp_file.write(content)
+    os.replace(tmp_path, path)
+
+
+def get_schema_document(
+    schema_format: str, rebuild: bool = False
+) -> SchemaDocument:
+    """
+    Return the rendered schema of the current code version, loading it
+    from disk or generating it when it is not in memory yet.
+    """
+    version = code_version()
+    key = (schema_format, version)
+    if not rebuild and key in _documents:
+        return _documents[key]
+
+    with _lock:
+        if not rebuild and key in _documents:
+            return _documents[key]
+
+        path = schema_path(schema_format, version)
+        if not rebuild and path.is_file():
+            content = path.read_bytes()
+        else:
+            content = render_schema(schema_format)
+            try:
+                write_atomic(path, content)
+            except OSError:
+                # A read-only deployment still serves it from memory.
+                pass
+
+        digest = hashlib.sha256(content).hexdigest()[:16]
+        document = SchemaDocument(
+            content=content,
+            etag=f'"{version}-{digest}"',
+        )
+        _documents[key] = document
+    return document
+
+
+class CachedSchemaView(SpectacularAPIView):
+    """Serve the precomputed schema in the negotiated format."""
+
+    def _get_schema_response(self, request: Request) -> HttpResponse:
+        schema_format = request.accepted_renderer.format
+        document = get_schema_document(schema_format)
+        headers = {
+            "ETag": document.etag,
+            "Cache-Control": f"public, max-age={settings.SCHEMA_MAX_AGE}",
+        }
+
+        if document.etag in request.headers.get("If-None-Match", ""):
+            return HttpResponseNotModified(headers=headers)
+
+        title = spectacular_settings.TITLE or "schema"
+        headers["Content-Disposition"] = (
+            f'inline; filename="{title}.{schema_format}"'
+        )
+        return HttpResponse(
+            document.content,
+            content_type=f"{request.accepted_media_type}; charset=utf-8",
+            headers=headers,
+        )
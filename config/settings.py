@@ -33,7 +33,8 @@ ALLOWED_HOSTS = os.environ.get("ALLOWED_HOSTS", "").split(",")
 # Application definition
 
 INSTALLED_APPS = [
-    "django.contrib.admin",
+    # Admin modules are discovered when the admin URLs are first loaded.
+    "config.admin.LazyAdminConfig",
     "django.contrib.auth",
     "django.contrib.contenttypes",
     "django.contrib.sessions",
@@ -44,17 +45,21 @@ INSTALLED_APPS = [
     "station",
     "order",
     "user",
+    "job",
 ]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    "config.compression.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "config.slow_queries.SlowQueryMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "config.profiling.ProfilingMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -62,7 +67,7 @@ ROOT_URLCONF = "config.urls"
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
-        "DIRS": [],
+        "DIRS": [BASE_DIR / "config" / "templates"],
         "APP_DIRS": True,
         "OPTIONS": {
             "context_processors": [
@@ -88,6 +93,21 @@ DATABASES = {
         "PASSWORD": os.environ["DB_PASSWORD"],
         "HOST": os.environ["DB_HOST"],
         "PORT": os.environ.get("DB_PORT", 5432),
+        # Each server thread keeps its connection between requests; the
+        # server is sized to stay within DB_MAX_CONNECTIONS (see
+        # config.gunicorn).
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", 60)),
+        "CONN_HEALTH_CHECKS": True,
+    }
+}
+
+
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", ""),
     }
 }
 
@@ -133,6 +153,35 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Media caching. Content-addressed uploads are cached for a year.
+MEDIA_MAX_AGE = 60 * 60
+MEDIA_IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+
+# Hand media transfers to the front server: "X-Accel-Redirect" (nginx,
+# using the internal MEDIA_SENDFILE_ROOT location) or "X-Sendfile".
+MEDIA_SENDFILE_HEADER = os.environ.get("MEDIA_SENDFILE_HEADER", "")
+MEDIA_SENDFILE_ROOT = os.environ.get(
+    "MEDIA_SENDFILE_ROOT", "/protected-media/"
+)
+
+# Resized copies generated for every uploaded train image.
+TRAIN_IMAGE_VARIANTS = {
+    "thumbnail": {"size": 320, "format": "JPEG"},
+    "medium": {"size": 1024, "format": "JPEG"},
+    "webp": {"size": 1024, "format": "WEBP"},
+}
+# Generate variants in a background job instead of the request.
+IMAGE_PROCESSING_ASYNC = True
+
+# Background jobs, run by `manage.py run_worker`.
+JOB_WORKER_CONCURRENCY = int(os.environ.get("JOB_WORKER_CONCURRENCY", 4))
+JOB_POLL_INTERVAL = 1.0
+JOB_BATCH_SIZE = 50
+JOB_MAX_ATTEMPTS = 5
+JOB_LOCK_TIMEOUT = timedelta(minutes=10)
+JOB_RETRY_BACKOFF = timedelta(seconds=10)
+JOB_RETRY_BACKOFF_MAX = timedelta(hours=1)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -148,15 +197,129 @@ REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 10,
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "user.throttling.AnonThrottle",
+        "user.throttling.UserThrottle",
+        "user.throttling.ScopedThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {
         "anon": "10/minute",
         "user": "30/minute",
+        "journey_search": "20/minute",
+        "order_create": "5/minute",
     },
 }
 
+# Where throttle state is kept. The cache store is shared by the workers
+# when CACHE_BACKEND is a shared cache such as Redis or Memcached, and is
+# per process with the default local memory cache. DatabaseThrottleStore
+# shares state without a cache server, at a write per request.
+THROTTLE_STORE = {
+    "BACKEND": os.environ.get(
+        "THROTTLE_STORE", "user.throttling.CacheThrottleStore"
+    ),
+    "OPTIONS": {},
+}
+
+# Clears the caches, and with them the throttle state, between tests.
+TEST_RUNNER = "config.test_runner.TestRunner"
+
+# Upper bound of a journey duration. It limits how far back overlap
+# checks have to look for journeys of the same train or crew member.
+MAX_JOURNEY_DURATION = timedelta(days=10)
+
+# Response compression. Encodings are listed in server preference;
+# br and zstd need the Brotli and zstandard packages. Levels are set per
+# content type prefix, and only matching responses are compressed.
+# HTML is left out: pages embed CSRF tokens, which compression would
+# expose to BREACH.
+COMPRESSION_ENCODINGS = ["zstd", "br", "gzip"]
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_LEVELS = {
+    "application/json": {"gzip": 6, "br": 4, "zstd": 3},
+    "application/vnd.oai.openapi": {"gzip": 9, "br": 11, "zstd": 19},
+}
+# Compressed bodies of these static documents are cached.
+COMPRESSION_CACHE_TYPES = [
+    "application/vnd.oai.openapi",
+    "application/vnd.oai.openapi+json",
+]
+COMPRESSION_CACHE = "default"
+COMPRESSION_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Where profiles of requests flagged with X-Profile by staff are kept.
+PROFILING_DIR = os.environ.get(
+    "PROFILING_DIR", str(BASE_DIR / "var" / "profiles")
+)
+
+# Opt-in capture of queries slower than the threshold. A share of the
+# slow SELECT queries is explained; the latest entries of each process
+# are listed at /api/slow-queries/ for admins.
+SLOW_QUERY_ENABLED = (
+    os.environ.get("SLOW_QUERY_ENABLED", "False").lower() == "true"
+)
+SLOW_QUERY_THRESHOLD_MS = float(
+    os.environ.get("SLOW_QUERY_THRESHOLD_MS", "200")
+)
+SLOW_QUERY_EXPLAIN_RATE = float(
+    os.environ.get("SLOW_QUERY_EXPLAIN_RATE", "0.1")
+)
+SLOW_QUERY_BUFFER_SIZE = 200
+
+# Each server worker writes its request metrics to WORKER_METRICS_DIR at
+# most every WORKER_METRICS_INTERVAL seconds; admins read them at
+# /api/metrics/workers/.
+WORKER_METRICS_DIR = os.environ.get(
+    "WORKER_METRICS_DIR", str(BASE_DIR / "var" / "workers")
+)
+WORKER_METRICS_INTERVAL = 1.0
+
+# Station autocomplete. Each process rebuilds its index of station names
+# after station changes, checked for at most every
+# AUTOCOMPLETE_VERSION_CHECK_INTERVAL seconds, and, to refresh
+# popularity, when it is older than AUTOCOMPLETE_MAX_AGE seconds;
+# stations are ranked by tickets sold over the last
+# AUTOCOMPLETE_POPULARITY_DAYS.
+AUTOCOMPLETE_MAX_AGE = 300
+AUTOCOMPLETE_VERSION_CHECK_INTERVAL = 5
+AUTOCOMPLETE_POPULARITY_DAYS = 90
+AUTOCOMPLETE_LIMIT = 10
+
+# Admin changelists show the planner's row estimate instead of an exact
+# count once it reaches this many rows.
+ADMIN_EXACT_COUNT_LIMIT = 100_000
+
+# Catalogue change feed. Entries younger than CHANGE_FEED_SETTLE_TIME are
+# held back, so changes committed out of token order are not skipped.
+# It must exceed the longest transaction writing catalogue changes: a
+# change committed later than that after it was logged can be missed by
+# clients. Entries and tombstones are purged after CHANGE_LOG_RETENTION.
+CHANGE_FEED_PAGE_SIZE = 1000
+CHANGE_FEED_SETTLE_TIME = timedelta(
+    seconds=float(os.environ.get("CHANGE_FEED_SETTLE_TIME", 5))
+)
+CHANGE_LOG_RETENTION = timedelta(days=30)
+
+# Limits of one batch availability request.
+AVAILABILITY_MAX_JOURNEYS = 500
+AVAILABILITY_MAX_DAYS = 31
+
+# Largest party that can join the waitlist of a sold-out journey.
+WAITLIST_MAX_PARTY_SIZE = 10
+
+# Optional booking through per-journey single-writer queues, for flash
+# sales (see order.booking). Each writer thread holds a database
+# connection of its own, on top of the server threads.
+BOOKING_QUEUE_ENABLED = (
+    os.environ.get("BOOKING_QUEUE_ENABLED", "False").lower() == "true"
+)
+BOOKING_QUEUE_PARTITIONS = int(os.environ.get("BOOKING_QUEUE_PARTITIONS", 4))
+BOOKING_QUEUE_BATCH_SIZE = 50
+# Seconds an order request waits for its writer before giving up.
+BOOKING_QUEUE_TIMEOUT = 10
+
+# How long order responses are kept for Idempotency-Key replays.
+IDEMPOTENCY_KEY_TTL = timedelta(hours=24)
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=5),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
@@ -170,3 +333,12 @@ SPECTACULAR_SETTINGS = {
     "SERVE_INCLUDE_SCHEMA": False,
     "SERVE_PERMISSIONS": ["rest_framework.permissions.AllowAny"],
 }
+
+# The schema is generated once per code version and cached on disk.
+# CODE_VERSION (e.g. a git commit) is used when set, otherwise a
+# fingerprint of the project sources.
+SCHEMA_CODE_VERSION = os.environ.get("CODE_VERSION", "")
+SCHEMA_CACHE_DIR = os.environ.get(
+    "SCHEMA_CACHE_DIR", str(BASE_DIR / "var" / "schema")
+)
+SCHEMA_MAX_AGE = 300
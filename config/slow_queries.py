@@ -0,0 +1,173 @@
+"""
+Opt-in capture of slow SQL queries with sampled query plans.
+
+When SLOW_QUERY_ENABLED is set, every request runs with a database
+execute wrapper that records queries slower than SLOW_QUERY_THRESHOLD_MS
+together with the view and action that issued them. For a sample of the
+slow SELECT queries the plan is captured with EXPLAIN (ANALYZE, BUFFERS)
+on PostgreSQL, or the backend's plain EXPLAIN elsewhere. Entries are
+kept in a per-process ring buffer that admins read through the API.
+"""
+
+import logging
+import random
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack
+from typing import Any, Callable
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DatabaseError, connections, transaction
+from django.http import HttpRequest, HttpResponseBase
+from django.utils import timezone
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+logger = logging.getLogger(__name__)
+
+_entries = deque(maxlen=settings.SLOW_QUERY_BUFFER_SIZE)
+_lock = threading.Lock()
+
+
+def recent_entries() -> list[dict[str, Any]]:
+    with _lock:
+        return list(reversed(_entries))
+
+
+def clear_entries() -> None:
+    with _lock:
+        _entries.clear()
+
+
+def view_origin(view_func: Callable, request: HttpRequest) -> str:
+    """Name the view handling a request, e.g. `JourneyViewSet.list`."""
+    view_class = getattr(view_func, "cls", None)
+    if view_class is None:
+        return view_func.__qualname__
+    actions = getattr(view_func, "actions", None) or {}
+    action = actions.get(request.method.lower(), request.method.lower())
+    return f"{view_class.__name__}.{action}"
+
+
+def explain(connection, sql: str, params: Any) -> str | None:
+    options = {}
+    if connection.vendor == "postgresql":
+        options = {"analyze": True, "buffers": True}
+    prefix = connection.ops.explain_query_prefix(**options)
+    try:
+        # The savepoint keeps a failing EXPLAIN from breaking the
+        # transaction the query ran in.
+        with transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                cursor.execute(f"{prefix} {sql}", params)
+                rows = cursor.fetchall()
+    except DatabaseError:
+        logger.exception("Could not explain slow query")
+        return None
+    return "\n".join(" ".join(str(value) for value in row) for row in rows)
+
+
+class SlowQueryRecorder:
+    """Execute wrapper recording the slow queries of one request."""
+
+    def __init__(self, origin: str) -> None:
+        self.origin = origin
+        self.explaining = False
+
+    def __call__(self, execute: Callable, sql, params, many, context) -> Any:
+        if self.explaining:
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration = (time.perf_counter() - start) * 1000
+        if duration >= settings.SLOW_QUERY_THRESHOLD_MS:
+            self.record(context["connection"], sql, params, many, duration)
+        return result
+
+    def record(self, connection, sql, params, many, duration) -> None:
+        plan = None
+        if (
+            not many
+            and sql.lstrip()[:6].upper() == "SELECT"
+            and random.random() < settings.SLOW_QUERY_EXPLAIN_RATE
+        ):
+            self.explaining = True
+            try:
+                plan = explain(connection, sql, params)
+            finally:
+                self.explaining = False
+
+        entry = {
+            "time": timezone.now().isoformat(),
+            "origin": self.origin,
+            "database": connection.alias,
+            "duration_ms": round(duration, 3),
+            "sql": sql,
+            "params": repr(params)[:1000],
+            "plan": plan,
+        }
+        with _lock:
+            _entries.append(entry)
+        logger.warning(
+            "Slow query (%.1f ms) in %s: %s", duration, self.origin, sql
+        )
+
+
+class SlowQueryMiddleware:
+    """Attach a SlowQueryRecorder to the connections for each request."""
+
+    def __init__(self, get_response) -> None:
+        if not settings.SLOW_QUERY_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponseBase:
+        recorder = SlowQueryRecorder(origin=request.path_info)
+        request.slow_query_recorder = recorder
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            return self.get_response(request)
+
+    def process_view(
+        self, request: HttpRequest, view_func: Callable, view_args, view_kwargs
+    ) -> None:
+        request.slow_query_recorder.origin = view_origin(view_func, request)
+
+
+class SlowQueryView(APIView):
+    """List (GET) or clear (DELETE) the slow queries of this process."""
+
+    permission_classes = (IsAdminUser,)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "origin",
+                type=OpenApiTypes.STR,
+                description=(
+                    "Only queries issued by this view action, "
+                    "e.g. `JourneyViewSet.list`."
+                ),
+            ),
+        ],
+        responses={200: {"type": "array", "items": {"type": "object"}}},
+    )
+    def get(self, request: Request) -> Response:
+        entries = recent_entries()
+        if origin := request.query_params.get("origin"):
+            entries = [e for e in entries if e["origin"] == origin]
+        return Response(entries)
+
+    @extend_schema(responses={204: None})
+    def delete(self, request: Request) -> Response:
+        clear_entries()
+        return Response(status=status.HTTP_204_NO_CONTENT)
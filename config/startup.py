@@ -0,0 +1,127 @@
+"""
+Process startup: lazily loaded subsystems and a preloadable application.
+
+Workers import only what serving the API needs. The OpenAPI schema and
+docs views, Pillow and the admin are loaded on first use, so a worker
+that never renders them never pays for them. config.wsgi.create_app
+builds the WSGI application and warms it up; with gunicorn's
+`--preload` that happens once in the master, and recycled workers fork
+from it sharing the loaded modules copy-on-write instead of importing
+them again.
+
+`python manage.py profile_startup` reports the import time per module.
+"""
+
+import gc
+import os
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from django.db import connections
+from django.http import HttpRequest, HttpResponseBase
+from django.urls import URLResolver, get_resolver
+from django.urls.resolvers import RoutePattern
+from django.utils.module_loading import import_string
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.settings import api_settings
+
+
+def lazy_view(view_path: str, **initkwargs: Any) -> Callable:
+    """Return a view importing its class-based view on the first request."""
+    view = None
+
+    @csrf_exempt
+    def dispatch(
+        request: HttpRequest, *args: Any, **kwargs: Any
+    ) -> HttpResponseBase:
+        nonlocal view
+        if view is None:
+            view = import_string(view_path).as_view(**initkwargs)
+        return view(request, *args, **kwargs)
+
+    return dispatch
+
+
+def lazy_include(route: str, urlconf: str, namespace: str) -> URLResolver:
+    """
+    Like include(), but the URLconf module is imported when a URL below
+    `route` is first resolved or reversed.
+    """
+    return URLResolver(
+        RoutePattern(route, is_endpoint=False),
+        urlconf,
+        app_name=namespace,
+        namespace=namespace,
+    )
+
+
+def warm_up() -> None:
+    """
+    Load what every request needs, without touching the database: the
+    URLconf with all API views and serializers and the authentication
+    and permission classes. Reverse lookups are left out, as building
+    them loads every lazily included URLconf.
+    """
+    get_resolver().url_patterns
+    for name in (
+        "DEFAULT_AUTHENTICATION_CLASSES",
+        "DEFAULT_PERMISSION_CLASSES",
+        "DEFAULT_RENDERER_CLASSES",
+        "DEFAULT_PARSER_CLASSES",
+        "DEFAULT_PAGINATION_CLASS",
+    ):
+        getattr(api_settings, name)
+    # Forked workers must not share connections opened while loading.
+    connections.close_all()
+
+
+def freeze() -> None:
+    """
+    Leave the objects loaded so far out of garbage collection. They live
+    as long as the process, and collecting would write to their pages,
+    copying them into every forked worker.
+    """
+    gc.collect()
+    gc.freeze()
+
+
+@dataclass(frozen=True)
+class ModuleImport:
+    name: str
+    self_us: int
+    cumulative_us: int
+
+
+def parse_import_times(output: str) -> list[ModuleImport]:
+    """Parse the report of `python -X importtime`."""
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        if not self_us.strip().isdigit():
+            continue  # The header line.
+        imports.append(
+            ModuleImport(name.strip(), int(self_us), int(cumulative_us))
+        )
+    return imports
+
+
+def profile_imports(code: str) -> tuple[float, list[ModuleImport]]:
+    """
+    Run code in a fresh interpreter with the current settings and return
+    its wall time in seconds and the import time of every module.
+    """
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        env=os.environ,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    elapsed = time.perf_counter() - started
+    return elapsed, parse_import_times(result.stderr)
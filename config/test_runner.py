@@ -0,0 +1,29 @@
+"""
+Test runner clearing the caches before each test.
+
+Test cases roll back the database after each test, but not the caches.
+Throttle state is kept in the cache (see user.throttling), so without
+this, requests made by earlier tests would count against later ones.
+"""
+
+from unittest import TextTestResult
+
+from django.core.cache import caches
+from django.test.runner import DiscoverRunner
+
+
+class CacheClearingResult(TextTestResult):
+    def startTest(self, test) -> None:
+        for cache in caches.all():
+            cache.clear()
+        super().startTest(test)
+
+
+class TestRunner(DiscoverRunner):
+    def get_resultclass(self):
+        resultclass = super().get_resultclass()
+        if resultclass is None:
+            return CacheClearingResult
+        return type(
+            resultclass.__name__, (CacheClearingResult, resultclass), {}
+        )
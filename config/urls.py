@@ -1,18 +1,41 @@
 from django.conf import settings
-from django.conf.urls.static import static
-from django.contrib import admin
 from django.urls import path, include
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 
+from . import health
+from .media import serve_media
+from .slow_queries import SlowQueryView
+from .startup import lazy_include, lazy_view
+
+# The admin and the schema views are loaded on first use.
 urlpatterns = [
-    path("admin/", admin.site.urls),
+    lazy_include("admin/", "config.admin_urls", namespace="admin"),
     path("api/user/", include("user.urls", namespace="user")),
     path("api/station/", include("station.urls", namespace="station")),
     path("api/order/", include("order.urls", namespace="order")),
-    path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
+    path(
+        "api/schema/",
+        lazy_view("config.schema.CachedSchemaView"),
+        name="schema",
+    ),
+    path("api/slow-queries/", SlowQueryView.as_view(), name="slow-queries"),
+    path("api/health/live/", health.live, name="health-live"),
+    path("api/health/ready/", health.ready, name="health-ready"),
+    path(
+        "api/metrics/workers/",
+        health.WorkerMetricsView.as_view(),
+        name="worker-metrics",
+    ),
     path(
         "api/docs/",
-        SpectacularSwaggerView.as_view(url_name="schema"),
+        lazy_view(
+            "drf_spectacular.views.SpectacularSwaggerView",
+            url_name="schema",
+        ),
         name="swagger-ui",
     ),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    path(
+        f"{settings.MEDIA_URL.strip('/')}/<path:path>",
+        serve_media,
+        name="media",
+    ),
+]
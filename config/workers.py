@@ -0,0 +1,117 @@
+"""
+Request metrics of each application server worker.
+
+The gunicorn hooks in config.gunicorn count the requests of the worker
+process they run in and write a snapshot to WORKER_METRICS_DIR, at most
+once per WORKER_METRICS_INTERVAL seconds, one file per worker. Any
+worker can then report all live workers. Uvicorn workers do not run the
+request hooks, so they only report their memory.
+"""
+
+import json
+import os
+import resource
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+
+
+@dataclass
+class WorkerMetrics:
+    pid: int
+    booted_at: float
+    requests: int = 0
+    in_flight: int = 0
+    errors: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+
+_metrics: WorkerMetrics | None = None
+_written_at = 0.0
+_lock = threading.Lock()
+
+
+def metrics_dir() -> Path:
+    return Path(settings.WORKER_METRICS_DIR)
+
+
+def start(pid: int) -> None:
+    """Begin counting the requests of a freshly forked worker."""
+    global _metrics
+    _metrics = WorkerMetrics(pid=pid, booted_at=time.time())
+    write()
+
+
+def request_started() -> None:
+    if _metrics is None:
+        return
+    with _lock:
+        _metrics.in_flight += 1
+
+
+def request_finished(status_code: int, duration_ms: float) -> None:
+    global _written_at
+    if _metrics is None:
+        return
+    with _lock:
+        _metrics.in_flight -= 1
+        _metrics.requests += 1
+        _metrics.errors += status_code >= 500
+        _metrics.total_ms += duration_ms
+        _metrics.max_ms = max(_metrics.max_ms, duration_ms)
+        # Claimed under the lock, so one thread writes per interval.
+        now = time.monotonic()
+        due = now - _written_at >= settings.WORKER_METRICS_INTERVAL
+        if due:
+            _written_at = now
+    if due:
+        write()
+
+
+def snapshot() -> dict[str, Any]:
+    with _lock:
+        data = asdict(_metrics)
+    requests = data["requests"]
+    data["avg_ms"] = round(data["total_ms"] / requests, 2) if requests else 0
+    data["max_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    data["updated_at"] = time.time()
+    return data
+
+
+def write() -> None:
+    global _written_at
+    _written_at = time.monotonic()
+    directory = metrics_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{_metrics.pid}.json"
+    # Per thread, in case a write overlaps one that started earlier.
+    temporary = path.with_suffix(f".{threading.get_ident()}.tmp")
+    temporary.write_text(json.dumps(snapshot()))
+    # Readers never see a half-written file.
+    os.replace(temporary, path)
+
+
+def read_all() -> list[dict[str, Any]]:
+    """Return the latest snapshot of every live worker."""
+    workers = []
+    for path in sorted(metrics_dir().glob("*.json")):
+        try:
+            workers.append(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            continue  # Removed or replaced while reading.
+    return workers
+
+
+def remove(pid: int) -> None:
+    (metrics_dir() / f"{pid}.json").unlink(missing_ok=True)
+
+
+def clear() -> None:
+    """Drop the snapshots left by workers of a previous server."""
+    for path in metrics_dir().glob("*.json"):
+        path.unlink(missing_ok=True)
@@ -2,6 +2,8 @@
 WSGI config for config project.
 
 It exposes the WSGI callable as a module-level variable named ``application``.
+Preforking servers can build it with the ``create_app()`` factory instead,
+which loads and freezes everything workers share (see config.startup).
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
@@ -9,8 +11,19 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 
 import os
 
+from django.core.handlers.wsgi import WSGIHandler
 from django.core.wsgi import get_wsgi_application
 
+from config.startup import freeze, warm_up
+
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
+
+def create_app() -> WSGIHandler:
+    application = get_wsgi_application()
+    warm_up()
+    freeze()
+    return application
+
+
 application = get_wsgi_application()
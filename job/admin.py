@@ -0,0 +1,24 @@
+from django.contrib import admin
+from django.db.models import QuerySet
+from django.http import HttpRequest
+from django.utils import timezone
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "task", "status", "attempts", "run_at", "locked_by")
+    list_filter = ("status", "task")
+    search_fields = ("task", "batch_key")
+    actions = ("retry_jobs",)
+
+    @admin.action(description="Retry selected jobs now")
+    def retry_jobs(self, request: HttpRequest, queryset: QuerySet) -> None:
+        queryset.update(
+            status=Job.Status.QUEUED,
+            attempts=0,
+            run_at=timezone.now(),
+            locked_by="",
+            locked_until=None,
+        )
@@ -0,0 +1,69 @@
+import multiprocessing
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from job.worker import work
+
+
+class Command(BaseCommand):
+    help = "Run background jobs until interrupted."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=settings.JOB_WORKER_CONCURRENCY,
+            help="Number of worker threads or processes.",
+        )
+        parser.add_argument(
+            "--pool",
+            choices=("thread", "process"),
+            default="thread",
+            help="Run workers as threads or as processes.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once the queue is empty.",
+        )
+
+    def handle(self, *args, **options):
+        concurrency, once = options["concurrency"], options["once"]
+        if options["pool"] == "process":
+            # Children must not inherit the parent's connections.
+            connections.close_all()
+            stop = multiprocessing.Event()
+            workers = [
+                multiprocessing.Process(
+                    target=work, args=(stop, once), name=f"job-worker-{i}"
+                )
+                for i in range(concurrency)
+            ]
+        else:
+            stop = threading.Event()
+            workers = [
+                threading.Thread(
+                    target=work, args=(stop, once), name=f"job-worker-{i}"
+                )
+                for i in range(concurrency)
+            ]
+
+        def shutdown(signum, frame):
+            self.stdout.write("Stopping after the current jobs...")
+            stop.set()
+
+        signal.signal(signal.SIGINT, shutdown)
+        signal.signal(signal.SIGTERM, shutdown)
+
+        self.stdout.write(
+            f"Starting {concurrency} {options['pool']} worker(s)."
+        )
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.stdout.write(self.style.SUCCESS("Workers stopped."))
@@ -0,0 +1,70 @@
+import datetime
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from django.conf import settings
+
+from .models import Job
+
+
+@dataclass(frozen=True)
+class Task:
+    name: str
+    func: Callable
+    batch: bool
+    max_attempts: int
+
+
+_tasks: dict[str, Task] = {}
+
+
+def task(
+    name: str, *, batch: bool = False, max_attempts: int | None = None
+) -> Callable:
+    """
+    Register a function as a background task. Batch tasks are called
+    with the payloads of all claimed jobs sharing a batch key, other
+    tasks with one payload at a time.
+    """
+
+    def register(func: Callable) -> Callable:
+        _tasks[name] = Task(
+            name=name,
+            func=func,
+            batch=batch,
+            max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+        )
+        return func
+
+    return register
+
+
+def get_task(name: str) -> Task | None:
+    return _tasks.get(name)
+
+
+def enqueue(
+    name: str,
+    payload: dict[str, Any] | None = None,
+    *,
+    batch_key: str = "",
+    run_at: datetime.datetime | None = None,
+) -> Job:
+    """
+    Queue a job. The row is written in the current transaction, so the
+    job only becomes visible to workers if the transaction commits.
+    """
+    registered = get_task(name)
+    if registered is None:
+        raise LookupError(f"Unknown task {name!r}.")
+
+    job = Job(
+        task=name,
+        payload=payload or {},
+        batch_key=batch_key,
+        max_attempts=registered.max_attempts,
+    )
+    if run_at:
+        job.run_at = run_at
+    job.save()
+    return job
@@ -0,0 +1,122 @@
+import datetime
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from job.models import Job
+from job.registry import enqueue, task
+from job.worker import claim_jobs, run_jobs, run_pending
+
+calls = []
+
+
+@task("tests.record")
+def record(value):
+    calls.append(value)
+
+
+@task("tests.record_many", batch=True)
+def record_many(payloads):
+    calls.append(sorted(payload["value"] for payload in payloads))
+
+
+@task("tests.explode", max_attempts=2)
+def explode():
+    raise ValueError("boom")
+
+
+@override_settings(
+    JOB_RETRY_BACKOFF=datetime.timedelta(seconds=10),
+    JOB_RETRY_BACKOFF_MAX=datetime.timedelta(minutes=1),
+)
+class JobWorkerTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_finished_jobs_are_deleted(self):
+        """Test that a successful job runs once and is removed"""
+        enqueue("tests.record", {"value": 1})
+
+        self.assertEqual(run_pending(), 1)
+
+        self.assertEqual(calls, [1])
+        self.assertFalse(Job.objects.exists())
+        self.assertEqual(run_pending(), 0)
+
+    def test_similar_jobs_are_batched(self):
+        """Test that batch tasks get all claimed payloads at once"""
+        for value in (3, 1, 2):
+            enqueue("tests.record_many", {"value": value})
+        enqueue("tests.record_many", {"value": 9}, batch_key="other")
+
+        run_pending()
+
+        self.assertCountEqual(calls, [[1, 2, 3], [9]])
+
+    def test_failed_jobs_are_retried_with_backoff(self):
+        """Test that failures are rescheduled until attempts run out"""
+        job = enqueue("tests.explode")
+
+        run_pending()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.QUEUED)
+        self.assertEqual(job.attempts, 1)
+        self.assertIn("ValueError: boom", job.last_error)
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertEqual(run_pending(), 0)
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        run_pending()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    def test_expired_leases_are_reclaimed(self):
+        """Test that jobs of a dead worker are claimed again"""
+        enqueue("tests.record", {"value": 1})
+        (job,) = claim_jobs("dead-worker", 10)
+        self.assertEqual(claim_jobs("worker", 10), [])
+
+        Job.objects.filter(pk=job.pk).update(
+            locked_until=timezone.now() - datetime.timedelta(seconds=1)
+        )
+
+        self.assertEqual(run_pending("worker"), 1)
+        self.assertEqual(calls, [1])
+
+    def test_jobs_reclaimed_while_waiting_are_skipped(self):
+        """Test that a batch does not run jobs another worker took over"""
+        for value in (1, 2):
+            enqueue("tests.record", {"value": value})
+        first, second = claim_jobs("worker", 10)
+        Job.objects.filter(pk=second.pk).update(locked_by="other-worker")
+
+        run_jobs([first, second], "worker")
+
+        self.assertEqual(calls, [1])
+        second.refresh_from_db()
+        self.assertEqual(second.locked_by, "other-worker")
+
+    def test_expired_last_attempt_is_failed(self):
+        """Test that a job whose last attempt never ended is not rerun"""
+        job = enqueue("tests.explode")
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.Status.RUNNING,
+            attempts=2,
+            locked_by="dead-worker",
+            locked_until=timezone.now() - datetime.timedelta(seconds=1),
+        )
+
+        self.assertEqual(run_pending("worker"), 0)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.FAILED)
+        self.assertEqual(job.attempts, 2)
+        self.assertIn("Lease expired", job.last_error)
+
+    def test_unknown_tasks_cannot_be_queued(self):
+        """Test that enqueue rejects unregistered tasks"""
+        with self.assertRaises(LookupError):
+            enqueue("tests.missing")
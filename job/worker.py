@@ -0,0 +1,198 @@
+"""
+Claiming and running background jobs.
+
+Each worker claims a batch of due jobs in a short transaction with
+SELECT ... FOR UPDATE SKIP LOCKED, so concurrent workers never wait for
+or run the same job. Claimed jobs are leased for JOB_LOCK_TIMEOUT, and
+the lease of each group of jobs is renewed right before it runs, so a
+long batch does not let later jobs expire while they wait. A job whose
+worker died becomes claimable again once its lease expires, unless it
+has no attempts left, in which case it is marked failed.
+"""
+
+import datetime
+import logging
+import os
+import random
+import socket
+import threading
+import traceback
+from collections import defaultdict
+from typing import Protocol
+
+from django.conf import settings
+from django.db import (
+    DatabaseError,
+    close_old_connections,
+    connection,
+    transaction,
+)
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Job
+from .registry import get_task
+
+logger = logging.getLogger(__name__)
+
+
+class StopEvent(Protocol):
+    def is_set(self) -> bool: ...
+
+    def wait(self, timeout: float | None = None) -> bool: ...
+
+
+def worker_name() -> str:
+    thread = threading.current_thread().name
+    return f"{socket.gethostname()}:{os.getpid()}:{thread}"
+
+
+def retry_delay(attempts: int) -> datetime.timedelta:
+    """Exponential backoff with jitter, capped at JOB_RETRY_BACKOFF_MAX."""
+    delay = settings.JOB_RETRY_BACKOFF * 2 ** (attempts - 1)
+    delay = min(delay, settings.JOB_RETRY_BACKOFF_MAX)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def claim_jobs(worker: str, limit: int) -> list[Job]:
+    now = timezone.now()
+    due = Q(status=Job.Status.QUEUED, run_at__lte=now) | Q(
+        status=Job.Status.RUNNING, locked_until__lt=now
+    )
+    with transaction.atomic():
+        jobs = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(due)
+            .order_by("run_at", "id")[:limit]
+        )
+        if not jobs:
+            return []
+        locked_until = now + settings.JOB_LOCK_TIMEOUT
+        claimed = []
+        for job in jobs:
+            if (
+                job.status == Job.Status.RUNNING
+                and job.attempts >= job.max_attempts
+            ):
+                # Its last attempt never finished, likely killing the
+                # worker; running it again would do the same.
+                job.status = Job.Status.FAILED
+                job.locked_by = ""
+                job.locked_until = None
+                job.last_error = "Lease expired on the last attempt."
+                logger.error("Job %s failed permanently: lease expired", job)
+                continue
+            job.status = Job.Status.RUNNING
+            job.attempts += 1
+            job.locked_by = worker
+            job.locked_until = locked_until
+            claimed.append(job)
+        Job.objects.bulk_update(
+            jobs,
+            ["status", "attempts", "locked_by", "locked_until", "last_error"],
+        )
+    return claimed
+
+
+def renew_lease(jobs: list[Job], worker: str) -> list[Job]:
+    """
+    Extend the lease of the jobs still held by worker and return them.
+    Jobs whose lease expired and that another worker claimed are left out.
+    """
+    with transaction.atomic():
+        held = set(
+            Job.objects.select_for_update()
+            .filter(
+                pk__in=[job.pk for job in jobs],
+                status=Job.Status.RUNNING,
+                locked_by=worker,
+            )
+            .values_list("pk", flat=True)
+        )
+        Job.objects.filter(pk__in=held).update(
+            locked_until=timezone.now() + settings.JOB_LOCK_TIMEOUT
+        )
+    return [job for job in jobs if job.pk in held]
+
+
+def group_jobs(jobs: list[Job]) -> list[list[Job]]:
+    """Group jobs of batch tasks by batch key; others run one by one."""
+    batches = defaultdict(list)
+    groups = []
+    for job in jobs:
+        registered = get_task(job.task)
+        if registered and registered.batch:
+            batches[(job.task, job.batch_key)].append(job)
+        else:
+            groups.append([job])
+    return groups + list(batches.values())
+
+
+def fail_jobs(jobs: list[Job], error: str) -> None:
+    now = timezone.now()
+    for job in jobs:
+        job.last_error = error
+        job.locked_by = ""
+        job.locked_until = None
+        if job.attempts >= job.max_attempts:
+            job.status = Job.Status.FAILED
+            logger.error("Job %s failed permanently: %s", job, error)
+        else:
+            job.status = Job.Status.QUEUED
+            job.run_at = now + retry_delay(job.attempts)
+    Job.objects.bulk_update(
+        jobs, ["status", "run_at", "locked_by", "locked_until", "last_error"]
+    )
+
+
+def run_group(jobs: list[Job]) -> None:
+    registered = get_task(jobs[0].task)
+    if registered is None:
+        fail_jobs(jobs, f"Unknown task {jobs[0].task!r}.")
+        return
+
+    try:
+        with transaction.atomic():
+            if registered.batch:
+                registered.func([job.payload for job in jobs])
+            else:
+                registered.func(**jobs[0].payload)
+    except Exception:
+        fail_jobs(jobs, traceback.format_exc())
+    else:
+        Job.objects.filter(pk__in=[job.pk for job in jobs]).delete()
+
+
+def run_jobs(jobs: list[Job], worker: str) -> None:
+    for group in group_jobs(jobs):
+        group = renew_lease(group, worker)
+        if group:
+            run_group(group)
+
+
+def run_pending(worker: str = "", limit: int | None = None) -> int:
+    """Claim and run one batch of due jobs. Returns how many ran."""
+    worker = worker or worker_name()
+    jobs = claim_jobs(worker, limit or settings.JOB_BATCH_SIZE)
+    run_jobs(jobs, worker)
+    return len(jobs)
+
+
+def work(stop: StopEvent, once: bool = False) -> None:
+    """Run jobs until stopped, polling while the queue is empty."""
+    worker = worker_name()
+    try:
+        while not stop.is_set():
+            close_old_connections()
+            try:
+                if run_pending(worker):
+                    continue
+            except DatabaseError:
+                # Lost connections and lock timeouts must not kill the
+                # worker; the claimed jobs are retried once leases expire.
+                logger.exception("Could not run jobs")
+            if once:
+                return
+            stop.wait(settings.JOB_POLL_INTERVAL)
+    finally:
+        connection.close()
@@ -1,10 +1,25 @@
+from collections import Counter
+
 from django.contrib import admin
-from .models import Order, Ticket
+from django.db import transaction
+from django.db.models import QuerySet
+from django.forms import BaseInlineFormSet, ModelForm
+from django.http import HttpRequest
+
+from config.admin import (
+    AutocompleteFilter,
+    AutocompleteFilterMixin,
+    EstimatedCountPaginator,
+)
+from .cancellation import cancel_orders, cancel_tickets
+from .models import Order, Ticket, WaitlistEntry
+from .signals import tickets_booked, tickets_released
 
 
 class TicketInline(admin.TabularInline):
     model = Ticket
     extra = 1
+    raw_id_fields = ("journey",)
 
 
 @admin.register(Order)
@@ -12,10 +27,96 @@ class OrderAdmin(admin.ModelAdmin):
     inlines = (TicketInline,)
     list_display = ("id", "user", "created_at")
     list_filter = ("created_at",)
+    list_select_related = ("user",)
     search_fields = ("user__email",)
+    raw_id_fields = ("user",)
+    ordering = ("-id",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    # Deleting goes through cancellation so seats are released.
+    def delete_model(self, request: HttpRequest, obj: Order) -> None:
+        cancel_orders(Order.objects.filter(pk=obj.pk))
+
+    def delete_queryset(
+        self, request: HttpRequest, queryset: QuerySet
+    ) -> None:
+        cancel_orders(queryset)
+
+    @transaction.atomic
+    def save_formset(
+        self,
+        request: HttpRequest,
+        form: ModelForm,
+        formset: BaseInlineFormSet,
+        change: bool,
+    ) -> None:
+        """
+        Save inline tickets through the booking counters: moved tickets
+        release their old journey's seat and take one on the new journey,
+        and deleted tickets are cancelled.
+        """
+        tickets = formset.save(commit=False)
+        moved = [
+            ticket
+            for ticket, fields in formset.changed_objects
+            if "journey" in fields
+        ]
+        released = Counter(
+            Ticket.objects.filter(
+                pk__in=[ticket.pk for ticket in moved]
+            ).values_list("journey_id", flat=True)
+        )
+        for ticket in tickets:
+            if ticket in moved:
+                ticket.departure_date = None
+            ticket.save()
+        if moved:
+            tickets_released.send(sender=Ticket, counts=released)
+            tickets_booked.send(sender=Ticket, tickets=moved)
+        cancel_tickets(
+            Ticket.objects.filter(
+                pk__in=[ticket.pk for ticket in formset.deleted_objects]
+            )
+        )
 
 
 @admin.register(Ticket)
-class TicketAdmin(admin.ModelAdmin):
-    list_display = ("journey", "order", "cargo", "seat")
-    list_filter = ("journey__route__source", "journey__route__destination")
+class TicketAdmin(AutocompleteFilterMixin, admin.ModelAdmin):
+    list_display = ("id", "journey", "order", "cargo", "seat")
+    list_filter = (
+        ("journey__route__source", AutocompleteFilter),
+        ("journey__route__destination", AutocompleteFilter),
+    )
+    list_select_related = (
+        "journey__route__source",
+        "journey__route__destination",
+        "order__user",
+    )
+    raw_id_fields = ("journey", "order")
+    # The model orders by seat; the newest tickets come from the pk index.
+    ordering = ("-id",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
+
+    def delete_model(self, request: HttpRequest, obj: Ticket) -> None:
+        cancel_tickets(Ticket.objects.filter(pk=obj.pk))
+
+    def delete_queryset(
+        self, request: HttpRequest, queryset: QuerySet
+    ) -> None:
+        cancel_tickets(queryset)
+
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(admin.ModelAdmin):
+    list_display = ("journey", "user", "party_size", "created_at", "order")
+    list_filter = ("allocated_at",)
+    list_select_related = (
+        "journey__route__source",
+        "journey__route__destination",
+        "user",
+        "order__user",
+    )
+    raw_id_fields = ("journey", "user", "order")
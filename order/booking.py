@@ -0,0 +1,263 @@
+"""
+Booking of orders, directly or through per-journey single-writer queues.
+
+By default every order request books in its own transaction. On a flash
+sale hundreds of those target the same journeys and wait on each other's
+locks on the ticket indexes. With BOOKING_QUEUE_ENABLED, order requests
+are routed by journey to one of BOOKING_QUEUE_PARTITIONS writer threads
+of the process, chosen by consistent hashing, so a journey always has a
+single writer. A writer takes up to BOOKING_QUEUE_BATCH_SIZE waiting
+orders, checks their seats with one query and books the accepted ones in
+one transaction, then hands each request its order or its error.
+
+An order is routed by the lowest journey id among its tickets; seats on
+its other journeys are still guarded by the ticket unique constraint.
+Requests already inside a transaction, such as those with an
+Idempotency-Key, book directly so they commit or roll back as a whole.
+"""
+
+import bisect
+import hashlib
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from typing import Any
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.utils import timezone
+
+from station.fares import journey_fares
+from .models import Order, Ticket
+from .signals import tickets_booked
+
+logger = logging.getLogger(__name__)
+
+
+class SeatTaken(Exception):
+    """A seat of the order was booked first by another order."""
+
+
+class QueueTimeout(Exception):
+    """The order was not booked within BOOKING_QUEUE_TIMEOUT."""
+
+
+def ticket_objects(
+    order: Order, tickets_data: list[dict[str, Any]], fares: dict
+) -> list[Ticket]:
+    return [
+        Ticket(
+            order=order,
+            departure_date=timezone.localdate(data["journey"].departure_time),
+            price=fares.get(data["journey"].pk),
+            **data,
+        )
+        for data in tickets_data
+    ]
+
+
+@transaction.atomic
+def book_order(user: Any, tickets_data: list[dict[str, Any]]) -> Order:
+    """Book one order in its own transaction."""
+    fares = journey_fares({data["journey"].pk for data in tickets_data})
+    order = Order.objects.create(user=user)
+    tickets = Ticket.objects.bulk_create(
+        ticket_objects(order, tickets_data, fares)
+    )
+    tickets_booked.send(sender=Ticket, tickets=tickets)
+    return order
+
+
+@dataclass
+class BookingRequest:
+    user: Any
+    tickets: list[dict[str, Any]]
+    future: Future = field(default_factory=Future)
+
+    @property
+    def journey_id(self) -> int:
+        return min(data["journey"].pk for data in self.tickets)
+
+    @property
+    def seats(self) -> set[tuple[int, int, int]]:
+        return {
+            (data["journey"].pk, data["cargo"], data["seat"])
+            for data in self.tickets
+        }
+
+
+def taken_seats(
+    requests: list[BookingRequest],
+) -> set[tuple[int, int, int]]:
+    """Return the seats of the requests that are already booked."""
+    wanted = set().union(*(request.seats for request in requests))
+    booked = Ticket.objects.filter(
+        journey_id__in={journey for journey, _, _ in wanted},
+        cargo__in={cargo for _, cargo, _ in wanted},
+        seat__in={seat for _, _, seat in wanted},
+    ).values_list("journey_id", "cargo", "seat")
+    return wanted & set(booked)
+
+
+def book_batch(requests: list[BookingRequest]) -> None:
+    """
+    Book a batch of orders, first come first served, and resolve the
+    future of each request with its order or SeatTaken.
+    """
+    taken = taken_seats(requests)
+    accepted = []
+    for request in requests:
+        if request.seats & taken:
+            request.future.set_exception(SeatTaken())
+        else:
+            taken |= request.seats
+            accepted.append(request)
+    if not accepted:
+        return
+
+    try:
+        orders = book_together(accepted)
+    except IntegrityError:
+        # A seat on a journey routed elsewhere was taken meanwhile.
+        orders = [book_alone(request) for request in accepted]
+    for request, order in zip(accepted, orders):
+        if order is None:
+            request.future.set_exception(SeatTaken())
+        else:
+            request.future.set_result(order)
+
+
+@transaction.atomic
+def book_together(requests: list[BookingRequest]) -> list[Order]:
+    fares = journey_fares(
+        {journey for request in requests for journey, _, _ in request.seats}
+    )
+    orders = Order.objects.bulk_create(
+        [Order(user=request.user) for request in requests]
+    )
+    tickets = Ticket.objects.bulk_create(
+        [
+            ticket
+            for order, request in zip(orders, requests)
+            for ticket in ticket_objects(order, request.tickets, fares)
+        ]
+    )
+    tickets_booked.send(sender=Ticket, tickets=tickets)
+    return orders
+
+
+def book_alone(request: BookingRequest) -> Order | None:
+    try:
+        return book_order(request.user, request.tickets)
+    except IntegrityError:
+        return None
+
+
+class HashRing:
+    """Consistent hashing of journey ids onto partitions."""
+
+    def __init__(self, partitions: int, replicas: int = 64) -> None:
+        self.points = sorted(
+            (self.hash(f"{partition}:{replica}"), partition)
+            for partition in range(partitions)
+            for replica in range(replicas)
+        )
+        self.hashes = [point for point, _ in self.points]
+
+    @staticmethod
+    def hash(key: str) -> int:
+        digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "big")
+
+    def partition(self, journey_id: int) -> int:
+        position = bisect.bisect(self.hashes, self.hash(str(journey_id)))
+        return self.points[position % len(self.points)][1]
+
+
+class BookingQueue:
+    """Writer threads of one process, each owning a part of the ring."""
+
+    def __init__(self, partitions: int, batch_size: int) -> None:
+        self.ring = HashRing(partitions)
+        self.batch_size = batch_size
+        self.queues = [queue.SimpleQueue() for _ in range(partitions)]
+        self.pid = os.getpid()
+        for partition, requests in enumerate(self.queues):
+            threading.Thread(
+                target=self.write,
+                args=(requests,),
+                name=f"booking-writer-{partition}",
+                daemon=True,
+            ).start()
+
+    def submit(self, request: BookingRequest) -> None:
+        self.queues[self.ring.partition(request.journey_id)].put(request)
+
+    def write(self, requests: queue.SimpleQueue) -> None:
+        while True:
+            batch = [requests.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(requests.get_nowait())
+                except queue.Empty:
+                    break
+            # Requests that gave up waiting are dropped.
+            batch = [
+                request
+                for request in batch
+                if request.future.set_running_or_notify_cancel()
+            ]
+            if not batch:
+                continue
+            close_old_connections()
+            try:
+                book_batch(batch)
+            except Exception as error:
+                logger.exception("Booking batch failed")
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(error)
+
+
+_queue: BookingQueue | None = None
+_lock = threading.Lock()
+
+
+def get_queue() -> BookingQueue:
+    """Return the queue of this process, started on first use."""
+    global _queue
+    # Threads do not survive a fork; a forked worker starts its own.
+    if _queue is None or _queue.pid != os.getpid():
+        with _lock:
+            if _queue is None or _queue.pid != os.getpid():
+                _queue = BookingQueue(
+                    settings.BOOKING_QUEUE_PARTITIONS,
+                    settings.BOOKING_QUEUE_BATCH_SIZE,
+                )
+    return _queue
+
+
+def place_order(user: Any, tickets_data: list[dict[str, Any]]) -> Order:
+    """Book an order, through the booking queue when it is enabled."""
+    if (
+        not settings.BOOKING_QUEUE_ENABLED
+        or transaction.get_connection().in_atomic_block
+    ):
+        try:
+            return book_order(user, tickets_data)
+        except IntegrityError:
+            raise SeatTaken
+
+    request = BookingRequest(user=user, tickets=tickets_data)
+    get_queue().submit(request)
+    try:
+        return request.future.result(settings.BOOKING_QUEUE_TIMEOUT)
+    except FutureTimeoutError:
+        if request.future.cancel():
+            raise QueueTimeout
+        # Already being booked; the writer finishes it shortly.
+        return request.future.result()
@@ -0,0 +1,82 @@
+"""
+Set-based cancellation of tickets and orders.
+
+The tickets to cancel are locked and read in one query, removed with a
+single DELETE and announced once through `tickets_released`, so seat
+counters and route stats are adjusted in the same transaction whatever
+the number of tickets. Orders left without tickets are deleted too.
+Orders deleted any other way, such as through the cascade of a deleted
+user, are cancelled first by a pre_delete receiver (see order.signals).
+"""
+
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from django.db import transaction
+from django.db.models import QuerySet
+
+from .models import Order, Ticket
+from .signals import tickets_released
+
+_cancelling = ContextVar("cancelling", default=False)
+
+
+def in_progress() -> bool:
+    """Whether orders are being deleted by a cancellation."""
+    return _cancelling.get()
+
+
+@contextmanager
+def cancelling() -> Iterator[None]:
+    token = _cancelling.set(True)
+    try:
+        yield
+    finally:
+        _cancelling.reset(token)
+
+
+@transaction.atomic
+def cancel_tickets(tickets: QuerySet) -> int:
+    """
+    Delete the given tickets and release their seats. Returns the number
+    of cancelled tickets.
+    """
+    rows = list(
+        tickets.order_by()
+        .select_for_update()
+        .values_list("pk", "journey_id", "order_id", "departure_date")
+    )
+    if not rows:
+        return 0
+
+    pks, journey_ids, order_ids, days = zip(*rows)
+    with cancelling():
+        # The departure dates let PostgreSQL prune the ticket partitions.
+        Ticket.objects.filter(
+            pk__in=pks, departure_date__in=set(days)
+        ).delete()
+        Order.objects.filter(
+            pk__in=set(order_ids), tickets__isnull=True
+        ).delete()
+    tickets_released.send(sender=Ticket, counts=Counter(journey_ids))
+    return len(rows)
+
+
+@transaction.atomic
+def cancel_orders(orders: QuerySet) -> int:
+    """Delete the given orders and release the seats of their tickets."""
+    order_ids = list(
+        orders.order_by().select_for_update().values_list("pk", flat=True)
+    )
+    cancelled = cancel_tickets(Ticket.objects.filter(order_id__in=order_ids))
+    # Orders without tickets are not reached through their tickets.
+    with cancelling():
+        Order.objects.filter(pk__in=order_ids).delete()
+    return cancelled
+
+
+def cancel_journeys(journeys: QuerySet) -> int:
+    """Cancel every ticket sold for the given journeys."""
+    return cancel_tickets(Ticket.objects.filter(journey__in=journeys))
@@ -0,0 +1,12 @@
+from typing import Any
+
+from job.registry import task
+from station.models import Journey
+from .waitlist import allocate_waitlist
+
+
+@task("order.allocate_waitlist", batch=True)
+def allocate_waitlist_seats(payloads: list[dict[str, Any]]) -> None:
+    # A seat booked concurrently fails the job, which is retried.
+    journey_ids = {payload["journey_id"] for payload in payloads}
+    allocate_waitlist(Journey.objects.filter(pk__in=journey_ids))
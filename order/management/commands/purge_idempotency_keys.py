@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from order.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = "Delete idempotency keys older than IDEMPOTENCY_KEY_TTL."
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - settings.IDEMPOTENCY_KEY_TTL
+        deleted, _ = IdempotencyKey.objects.filter(
+            created_at__lt=cutoff
+        ).delete()
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {deleted} expired idempotency keys.")
+        )
@@ -0,0 +1,33 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from order.stats import rebuild_route_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute daily route statistics from journeys and tickets."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--from",
+            dest="date_from",
+            type=datetime.date.fromisoformat,
+            help="First departure date to rebuild (YYYY-MM-DD).",
+        )
+        parser.add_argument(
+            "--to",
+            dest="date_to",
+            type=datetime.date.fromisoformat,
+            help="Last departure date to rebuild (YYYY-MM-DD).",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rows = rebuild_route_stats(
+                options["date_from"], options["date_to"]
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {rows} route day statistics.")
+        )
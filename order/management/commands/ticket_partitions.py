@@ -0,0 +1,51 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from order import partitions
+
+
+def parse_month(value: str) -> datetime.date:
+    return datetime.datetime.strptime(value, "%Y-%m").date()
+
+
+class Command(BaseCommand):
+    help = (
+        "Create upcoming monthly ticket partitions and detach old ones "
+        "(PostgreSQL only). Run it regularly, e.g. daily from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ahead",
+            type=int,
+            default=3,
+            help="Number of future months to create partitions for.",
+        )
+        parser.add_argument(
+            "--detach-before",
+            type=parse_month,
+            help="Detach partitions of months before this one (YYYY-MM).",
+        )
+        parser.add_argument(
+            "--archive-schema",
+            help="Move detached partitions to this schema.",
+        )
+
+    def handle(self, *args, **options):
+        if not partitions.is_partitioned():
+            raise CommandError(
+                "The ticket table is not partitioned on this database."
+            )
+
+        for name in partitions.create_future_partitions(options["ahead"]):
+            self.stdout.write(f"Created partition {name}.")
+
+        if before := options["detach_before"]:
+            detached = partitions.detach_partitions(
+                before, options["archive_schema"]
+            )
+            for name in detached:
+                self.stdout.write(f"Detached partition {name}.")
+
+        self.stdout.write(self.style.SUCCESS("Ticket partitions are ready."))
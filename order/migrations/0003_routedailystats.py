@@ -0,0 +1,51 @@
+# Generated by Django 5.2.5 on 2026-10-19 09:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("order", "0002_initial"),
+        ("station", "0002_train_image_variants"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RouteDailyStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("journeys", models.PositiveIntegerField(default=0)),
+                ("capacity", models.PositiveIntegerField(default=0)),
+                ("tickets_sold", models.PositiveIntegerField(default=0)),
+                (
+                    "route",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_stats",
+                        to="station.route",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "route daily stats",
+                "ordering": ["date", "route"],
+                "indexes": [
+                    models.Index(
+                        fields=["date"], name="order_route_date_4eacf0_idx"
+                    )
+                ],
+                "unique_together": {("route", "date")},
+            },
+        ),
+    ]
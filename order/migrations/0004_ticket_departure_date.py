@@ -0,0 +1,39 @@
+# Generated by Django 5.2.5 on 2026-10-19 09:40
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import TruncDate
+
+
+def fill_departure_date(apps, schema_editor):
+    Journey = apps.get_model("station", "Journey")
+    Ticket = apps.get_model("order", "Ticket")
+    Ticket.objects.update(
+        departure_date=Subquery(
+            Journey.objects.filter(pk=OuterRef("journey_id"))
+            .annotate(day=TruncDate("departure_time"))
+            .values("day")[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("order", "0003_routedailystats"),
+        ("station", "0003_journey_departure_time_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ticket",
+            name="departure_date",
+            field=models.DateField(editable=False, null=True),
+        ),
+        migrations.RunPython(fill_departure_date, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="ticket",
+            name="departure_date",
+            field=models.DateField(editable=False),
+        ),
+    ]
@@ -0,0 +1,105 @@
+# Generated by Django 5.2.5 on 2026-10-19 09:45
+
+import datetime
+
+from django.db import migrations
+
+MONTHS_AHEAD = 3
+
+
+def next_month(month):
+    return (month + datetime.timedelta(days=32)).replace(day=1)
+
+
+def partition_ticket_table(apps, schema_editor):
+    """
+    Turn order_ticket into a table range-partitioned by departure_date,
+    with one partition per month and a default partition. PostgreSQL
+    needs the partition key in every unique constraint, so the primary
+    key and the seat constraint gain departure_date; since it is derived
+    from the journey, the seat constraint keeps its meaning.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    execute = schema_editor.execute
+    execute("ALTER TABLE order_ticket RENAME TO order_ticket_unpartitioned")
+    execute(
+        "ALTER INDEX order_ticket_pkey RENAME TO order_ticket_unpartitioned_pkey"
+    )
+    execute(
+        "ALTER TABLE order_ticket_unpartitioned "
+        "ALTER COLUMN id DROP IDENTITY"
+    )
+    execute("""
+        CREATE TABLE order_ticket (
+            id bigint NOT NULL,
+            cargo integer NOT NULL CHECK (cargo >= 0),
+            seat integer NOT NULL CHECK (seat >= 0),
+            journey_id bigint NOT NULL
+                REFERENCES station_journey (id) DEFERRABLE INITIALLY DEFERRED,
+            order_id bigint NOT NULL
+                REFERENCES order_order (id) DEFERRABLE INITIALLY DEFERRED,
+            departure_date date NOT NULL,
+            PRIMARY KEY (id, departure_date),
+            CONSTRAINT order_ticket_journey_cargo_seat_uniq
+                UNIQUE (journey_id, cargo, seat, departure_date)
+        ) PARTITION BY RANGE (departure_date)
+        """)
+    execute("CREATE SEQUENCE order_ticket_id_seq OWNED BY order_ticket.id")
+    execute(
+        "ALTER TABLE order_ticket ALTER COLUMN id "
+        "SET DEFAULT nextval('order_ticket_id_seq')"
+    )
+    execute(
+        "CREATE INDEX order_ticket_order_id_idx ON order_ticket (order_id)"
+    )
+    execute(
+        "CREATE TABLE order_ticket_default PARTITION OF order_ticket DEFAULT"
+    )
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT min(departure_date) FROM order_ticket_unpartitioned"
+        )
+        first_day = cursor.fetchone()[0]
+
+    today = datetime.date.today()
+    month = min(first_day or today, today).replace(day=1)
+    last_month = today.replace(day=1)
+    for _ in range(MONTHS_AHEAD):
+        last_month = next_month(last_month)
+    while month <= last_month:
+        execute(
+            f"CREATE TABLE order_ticket_p{month:%Y_%m} "
+            "PARTITION OF order_ticket FOR VALUES FROM (%s) TO (%s)",
+            [month, next_month(month)],
+        )
+        month = next_month(month)
+
+    execute(
+        "INSERT INTO order_ticket "
+        "(id, cargo, seat, journey_id, order_id, departure_date) "
+        "SELECT id, cargo, seat, journey_id, order_id, departure_date "
+        "FROM order_ticket_unpartitioned"
+    )
+    execute(
+        "SELECT setval('order_ticket_id_seq', "
+        "coalesce((SELECT max(id) FROM order_ticket), 0) + 1, false)"
+    )
+    execute("DROP TABLE order_ticket_unpartitioned")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("order", "0004_ticket_departure_date"),
+    ]
+
+    # The partitioned table behaves like the plain one for Django,
+    # so the migration is not reverted.
+    operations = [
+        migrations.RunPython(
+            partition_ticket_table, migrations.RunPython.noop
+        ),
+    ]
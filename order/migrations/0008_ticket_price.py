@@ -0,0 +1,20 @@
+# Generated by Django 5.2.5 on 2026-10-19 10:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("order", "0007_waitlistentry"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ticket",
+            name="price",
+            field=models.DecimalField(
+                blank=True, decimal_places=2, max_digits=8, null=True
+            ),
+        ),
+    ]
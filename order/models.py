@@ -1,8 +1,10 @@
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.db.models.functions import TruncDate
 
-from station.models import Journey
+from station.models import Journey, Route
 
 
 class Order(models.Model):
@@ -29,6 +31,13 @@ class Ticket(models.Model):
     order = models.ForeignKey(
         Order, on_delete=models.CASCADE, related_name="tickets"
     )
+    # Copy of the journey's departure date, the partition key of the
+    # ticket table on PostgreSQL (see order.partitions).
+    departure_date = models.DateField(editable=False)
+    # Fare of the journey when the ticket was booked.
+    price = models.DecimalField(
+        max_digits=8, decimal_places=2, null=True, blank=True
+    )
 
     class Meta:
         unique_together = ("journey", "cargo", "seat")
@@ -49,5 +58,112 @@ class Ticket(models.Model):
                 }
             )
 
+    def save(self, *args, **kwargs) -> None:
+        if self.departure_date is None:
+            self.departure_date = (
+                Journey.objects.filter(pk=self.journey_id)
+                .annotate(day=TruncDate("departure_time"))
+                .values_list("day", flat=True)
+                .get()
+            )
+        super().save(*args, **kwargs)
+
     def __str__(self) -> str:
         return f"{self.journey} (Cargo: {self.cargo}, Seat: {self.seat})"
+
+
+class RouteDailyStats(models.Model):
+    """Tickets sold and seats offered per route and departure date."""
+
+    route = models.ForeignKey(
+        Route, on_delete=models.CASCADE, related_name="daily_stats"
+    )
+    date = models.DateField()
+    journeys = models.PositiveIntegerField(default=0)
+    capacity = models.PositiveIntegerField(default=0)
+    tickets_sold = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("route", "date")
+        ordering = ["date", "route"]
+        indexes = [models.Index(fields=["date"])]
+        verbose_name_plural = "route daily stats"
+
+    @property
+    def load_factor(self) -> float:
+        if not self.capacity:
+            return 0.0
+        return round(self.tickets_sold / self.capacity, 4)
+
+    def __str__(self) -> str:
+        return f"Route {self.route_id} on {self.date}"
+
+
+class IdempotencyKey(models.Model):
+    """Stored outcome of a request sent with an Idempotency-Key header."""
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="idempotency_keys",
+    )
+    key = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64)
+    response_status = models.PositiveSmallIntegerField(null=True)
+    response_body = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        unique_together = ("user", "key")
+
+    def __str__(self) -> str:
+        return f"{self.key} ({self.user})"
+
+
+class WaitlistEntry(models.Model):
+    """A party waiting for seats on a sold-out journey."""
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="waitlist_entries",
+    )
+    journey = models.ForeignKey(
+        Journey, on_delete=models.CASCADE, related_name="waitlist_entries"
+    )
+    party_size = models.PositiveSmallIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    # The order booked for the party once seats were allocated.
+    order = models.OneToOneField(
+        Order,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="waitlist_entry",
+    )
+    allocated_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["created_at", "id"]
+        verbose_name_plural = "waitlist entries"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "journey"],
+                condition=models.Q(allocated_at__isnull=True),
+                name="unique_waiting_user_journey",
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["journey", "created_at"],
+                condition=models.Q(allocated_at__isnull=True),
+                name="waitlist_waiting_idx",
+            )
+        ]
+
+    @property
+    def is_waiting(self) -> bool:
+        return self.allocated_at is None
+
+    def __str__(self) -> str:
+        return f"{self.user} x{self.party_size} for {self.journey}"
@@ -0,0 +1,140 @@
+"""
+Monthly range partitions of the ticket table on PostgreSQL.
+
+Tickets are partitioned by the departure date of their journey, so
+bookings, availability counts and the seat uniqueness check only touch
+the partitions of upcoming months. Rows outside every monthly partition
+land in the default partition.
+"""
+
+import datetime
+
+from django.db import connection, transaction
+
+PARENT_TABLE = "order_ticket"
+DEFAULT_PARTITION = "order_ticket_default"
+
+
+def month_start(day: datetime.date) -> datetime.date:
+    return day.replace(day=1)
+
+
+def next_month(month: datetime.date) -> datetime.date:
+    return (month + datetime.timedelta(days=32)).replace(day=1)
+
+
+def partition_name(month: datetime.date) -> str:
+    return f"{PARENT_TABLE}_p{month:%Y_%m}"
+
+
+def is_supported() -> bool:
+    return connection.vendor == "postgresql"
+
+
+def is_partitioned() -> bool:
+    if not is_supported():
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table "
+            "WHERE partrelid = to_regclass(%s)",
+            [PARENT_TABLE],
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions() -> dict[str, datetime.date]:
+    """Return the monthly partitions attached to the ticket table."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = to_regclass(%s)",
+            [PARENT_TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    partitions = {}
+    prefix = f"{PARENT_TABLE}_p"
+    for name in names:
+        if name.startswith(prefix):
+            month = datetime.datetime.strptime(name[len(prefix) :], "%Y_%m")
+            partitions[name] = month.date()
+    return partitions
+
+
+@transaction.atomic
+def create_partition(month: datetime.date) -> bool:
+    """
+    Create and attach the partition of a month. Rows of that month that
+    already sit in the default partition are moved into it first, which
+    PostgreSQL requires before attaching. Returns False if it exists.
+    """
+    name = partition_name(month)
+    if name in list_partitions():
+        return False
+
+    start, end = month, next_month(month)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE TABLE "{name}" (LIKE "{PARENT_TABLE}" '
+            "INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM "{DEFAULT_PARTITION}" '
+            "WHERE departure_date >= %s AND departure_date < %s "
+            f'RETURNING *) INSERT INTO "{name}" SELECT * FROM moved',
+            [start, end],
+        )
+        cursor.execute(
+            f'ALTER TABLE "{PARENT_TABLE}" ATTACH PARTITION "{name}" '
+            "FOR VALUES FROM (%s) TO (%s)",
+            [start, end],
+        )
+    return True
+
+
+def create_future_partitions(months_ahead: int) -> list[str]:
+    """Ensure partitions exist from the current month on."""
+    created = []
+    month = month_start(datetime.date.today())
+    for _ in range(months_ahead + 1):
+        if create_partition(month):
+            created.append(partition_name(month))
+        month = next_month(month)
+    return created
+
+
+def detach_partitions(
+    before: datetime.date, archive_schema: str | None = None
+) -> list[str]:
+    """
+    Detach the partitions of months before `before`. Detached tables keep
+    their rows and can be moved to an archive schema, dumped or dropped.
+    """
+    detached = []
+    with transaction.atomic(), connection.cursor() as cursor:
+        if archive_schema:
+            cursor.execute(f'CREATE SCHEMA IF NOT EXISTS "{archive_schema}"')
+        for name, month in sorted(list_partitions().items()):
+            if month >= month_start(before):
+                continue
+            cursor.execute(
+                f'ALTER TABLE "{PARENT_TABLE}" DETACH PARTITION "{name}"'
+            )
+            # Archived rows must not block deleting their journeys/orders.
+            cursor.execute(
+                "SELECT conname FROM pg_constraint "
+                "WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+                [name],
+            )
+            for (constraint,) in cursor.fetchall():
+                cursor.execute(
+                    f'ALTER TABLE "{name}" DROP CONSTRAINT "{constraint}"'
+                )
+            if archive_schema:
+                cursor.execute(
+                    f'ALTER TABLE "{name}" SET SCHEMA "{archive_schema}"'
+                )
+            detached.append(name)
+    return detached
@@ -1,22 +1,36 @@
 from typing import Any
 
-from django.db import transaction
-from rest_framework import serializers
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import serializers, status
+from rest_framework.exceptions import APIException
 from rest_framework.validators import UniqueTogetherValidator
 
+from config.fieldsets import SparseFieldsetMixin
+from station.models import JourneySearchEntry
 from station.serializers import JourneyListSerializer
-from .models import Order, Ticket
+from .booking import QueueTimeout, SeatTaken, place_order
+from .models import Order, RouteDailyStats, Ticket, WaitlistEntry
+
+SEAT_TAKEN = "This seat is already taken on this journey."
+
+
+class BookingQueueBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Too many bookings for this journey, try again."
+    default_code = "booking_queue_busy"
 
 
 class TicketSerializer(serializers.ModelSerializer):
     class Meta:
         model = Ticket
-        fields = ("id", "cargo", "seat", "journey")
+        fields = ("id", "cargo", "seat", "journey", "price")
+        read_only_fields = ("price",)
         validators = [
             UniqueTogetherValidator(
                 queryset=Ticket.objects.all(),
                 fields=("journey", "cargo", "seat"),
-                message="This seat is already taken on this journey.",
+                message=SEAT_TAKEN,
             )
         ]
 
@@ -25,7 +39,7 @@ class TicketDetailSerializer(TicketSerializer):
     journey = JourneyListSerializer(many=False, read_only=True)
 
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     tickets = TicketSerializer(many=True, allow_empty=False)
 
     class Meta:
@@ -62,13 +76,15 @@ class OrderSerializer(serializers.ModelSerializer):
                 )
         return tickets
 
-    @transaction.atomic
     def create(self, validated_data: dict[str, Any]) -> Order:
-        tickets_data = validated_data.pop("tickets")
-        order = Order.objects.create(**validated_data)
-        for ticket_data in tickets_data:
-            Ticket.objects.create(order=order, **ticket_data)
-        return order
+        try:
+            return place_order(
+                validated_data["user"], validated_data["tickets"]
+            )
+        except SeatTaken:
+            raise serializers.ValidationError({"tickets": [SEAT_TAKEN]})
+        except QueueTimeout:
+            raise BookingQueueBusy
 
 
 class OrderListSerializer(OrderSerializer):
@@ -83,3 +99,108 @@ class OrderListSerializer(OrderSerializer):
 
 class OrderDetailSerializer(OrderSerializer):
     tickets = TicketDetailSerializer(many=True, read_only=True)
+
+    class Meta(OrderSerializer.Meta):
+        collapsed_fields = {
+            "tickets": TicketSerializer(many=True, read_only=True),
+        }
+
+
+class RouteDailyStatsSerializer(
+    SparseFieldsetMixin, serializers.ModelSerializer
+):
+    route_name = serializers.StringRelatedField(source="route")
+
+    class Meta:
+        model = RouteDailyStats
+        fields = (
+            "route",
+            "route_name",
+            "date",
+            "journeys",
+            "capacity",
+            "tickets_sold",
+            "load_factor",
+        )
+
+
+class OrderCancelSerializer(serializers.Serializer):
+    tickets = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+        help_text="Tickets to cancel. The whole order when omitted.",
+    )
+
+
+class CancellationSerializer(serializers.Serializer):
+    journeys = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+    )
+    orders = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+    )
+    tickets = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+    )
+
+    def validate(self, data: dict[str, Any]) -> dict[str, Any]:
+        if len(data) != 1:
+            raise serializers.ValidationError(
+                "Pass exactly one of journeys, orders or tickets."
+            )
+        return data
+
+
+class CancellationResultSerializer(serializers.Serializer):
+    tickets_cancelled = serializers.IntegerField()
+
+
+class WaitlistEntrySerializer(serializers.ModelSerializer):
+    party_size = serializers.IntegerField(
+        min_value=1, max_value=settings.WAITLIST_MAX_PARTY_SIZE
+    )
+
+    class Meta:
+        model = WaitlistEntry
+        fields = (
+            "id",
+            "journey",
+            "party_size",
+            "created_at",
+            "order",
+            "allocated_at",
+        )
+        read_only_fields = ("order", "allocated_at")
+
+    def validate(self, data: dict[str, Any]) -> dict[str, Any]:
+        journey = data["journey"]
+        if journey.departure_time <= timezone.now():
+            raise serializers.ValidationError(
+                {"journey": "This journey has already departed."}
+            )
+
+        user = self.context["request"].user
+        if WaitlistEntry.objects.filter(
+            user=user, journey=journey, allocated_at=None
+        ).exists():
+            raise serializers.ValidationError(
+                {"journey": "You are already waiting for this journey."}
+            )
+
+        available = (
+            JourneySearchEntry.objects.filter(journey=journey)
+            .values_list("tickets_available", flat=True)
+            .first()
+        )
+        if available is not None and available >= data["party_size"]:
+            raise serializers.ValidationError(
+                "Enough seats are available, book them directly."
+            )
+        return data
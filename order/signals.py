@@ -0,0 +1,141 @@
+from collections import Counter
+from typing import Any
+
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from job.registry import enqueue
+from station import projection
+from station.models import Journey, Train
+from . import stats
+from .models import Order, Ticket, WaitlistEntry
+
+# Sent with `tickets`, a list of newly saved tickets. Bulk writes send it
+# once for the whole batch instead of relying on post_save.
+tickets_booked = Signal()
+# Sent with `counts`, the number of cancelled tickets per journey id,
+# once per set-based cancellation (see order.cancellation).
+tickets_released = Signal()
+
+
+@receiver(post_save, sender=Ticket)
+def ticket_saved(
+    sender: type[Ticket], instance: Ticket, created: bool, **kwargs: Any
+) -> None:
+    if created:
+        tickets_booked.send(sender=Ticket, tickets=[instance])
+
+
+@receiver(pre_delete, sender=Order)
+def cancel_deleted_order(
+    sender: type[Order], instance: Order, **kwargs: Any
+) -> None:
+    # Imported here, as order.cancellation sends this module's signals.
+    from . import cancellation
+
+    # Deletes cascading from a user skip cancellation otherwise.
+    if not cancellation.in_progress():
+        cancellation.cancel_tickets(Ticket.objects.filter(order=instance))
+
+
+@receiver(tickets_booked)
+def count_tickets_sold(
+    sender: type[Ticket], tickets: list[Ticket], **kwargs: Any
+) -> None:
+    stats.record_tickets_sold(tickets)
+
+
+@receiver(tickets_booked)
+def take_available_seats(
+    sender: type[Ticket], tickets: list[Ticket], **kwargs: Any
+) -> None:
+    sold = Counter(ticket.journey_id for ticket in tickets)
+    projection.adjust_tickets_available(
+        {journey_id: -count for journey_id, count in sold.items()}
+    )
+
+
+@receiver(tickets_released)
+def count_tickets_released(
+    sender: type[Ticket], counts: dict[int, int], **kwargs: Any
+) -> None:
+    stats.adjust_tickets_sold(
+        {journey_id: -count for journey_id, count in counts.items()}
+    )
+
+
+@receiver(tickets_released)
+def free_released_seats(
+    sender: type[Ticket], counts: dict[int, int], **kwargs: Any
+) -> None:
+    projection.adjust_tickets_available(counts)
+
+
+@receiver(tickets_released)
+def schedule_waitlist_allocation(
+    sender: type[Ticket], counts: dict[int, int], **kwargs: Any
+) -> None:
+    waiting = (
+        WaitlistEntry.objects.filter(journey_id__in=counts, allocated_at=None)
+        .order_by()
+        .values_list("journey_id", flat=True)
+        .distinct()
+    )
+    for journey_id in waiting:
+        enqueue("order.allocate_waitlist", {"journey_id": journey_id})
+
+
+@receiver(pre_save, sender=Journey)
+def remember_journey_day(
+    sender: type[Journey], instance: Journey, **kwargs: Any
+) -> None:
+    instance._previous_route_days = (
+        stats.route_days(Journey.objects.filter(pk=instance.pk))
+        if instance.pk
+        else set()
+    )
+
+
+@receiver(post_save, sender=Journey)
+def journey_saved(
+    sender: type[Journey], instance: Journey, **kwargs: Any
+) -> None:
+    days = stats.route_days(Journey.objects.filter(pk=instance.pk))
+    for _, day in days:
+        Ticket.objects.filter(journey_id=instance.pk).exclude(
+            departure_date=day
+        ).update(departure_date=day)
+    stats.refresh_route_days(days | instance._previous_route_days)
+
+
+@receiver(post_delete, sender=Journey)
+def journey_deleted(
+    sender: type[Journey], instance: Journey, **kwargs: Any
+) -> None:
+    day = timezone.localdate(instance.departure_time)
+    stats.refresh_route_days({(instance.route_id, day)})
+
+
+@receiver(pre_save, sender=Train)
+def remember_train_capacity(
+    sender: type[Train], instance: Train, **kwargs: Any
+) -> None:
+    instance._previous_capacity = (
+        Train.objects.filter(pk=instance.pk)
+        .values_list("cargo_num", "places_in_cargo")
+        .first()
+    )
+
+
+@receiver(post_save, sender=Train)
+def train_saved(sender: type[Train], instance: Train, **kwargs: Any) -> None:
+    previous = instance._previous_capacity
+    if previous and previous != (instance.cargo_num, instance.places_in_cargo):
+        upcoming = instance.journeys.filter(departure_time__gte=timezone.now())
+        stats.refresh_route_days(stats.route_days(upcoming))
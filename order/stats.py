@@ -0,0 +1,157 @@
+import datetime
+from collections import Counter
+from typing import Iterable
+
+from django.db.models import Count, F, Q, QuerySet, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from station.models import Journey
+from .models import RouteDailyStats, Ticket
+
+RouteDay = tuple[int, datetime.date]
+
+
+def route_days(journeys: QuerySet) -> set[RouteDay]:
+    """Return the (route id, departure date) pairs of the given journeys."""
+    return set(
+        journeys.annotate(day=TruncDate("departure_time")).values_list(
+            "route_id", "day"
+        )
+    )
+
+
+def day_bounds(day: datetime.date) -> tuple[datetime.datetime, ...]:
+    start = datetime.datetime.combine(
+        day, datetime.time.min, tzinfo=timezone.get_current_timezone()
+    )
+    return start, start + datetime.timedelta(days=1)
+
+
+def aggregate_route_days(
+    journey_filter: Q, ticket_filter: Q
+) -> dict[RouteDay, dict[str, int]]:
+    """
+    Compute journeys, capacity and tickets sold per route day.
+    The two filters must select the same journeys, the second one
+    spelled from the Ticket side.
+    """
+    totals = {}
+    journey_rows = (
+        Journey.objects.filter(journey_filter)
+        .annotate(day=TruncDate("departure_time"))
+        .values("route_id", "day")
+        .annotate(
+            journeys=Count("id"),
+            capacity=Sum(F("train__cargo_num") * F("train__places_in_cargo")),
+        )
+    )
+    for row in journey_rows:
+        totals[(row["route_id"], row["day"])] = {
+            "journeys": row["journeys"],
+            "capacity": row["capacity"],
+            "tickets_sold": 0,
+        }
+
+    ticket_rows = (
+        Ticket.objects.filter(ticket_filter)
+        .annotate(day=TruncDate("journey__departure_time"))
+        .values("journey__route_id", "day")
+        .annotate(tickets_sold=Count("id"))
+    )
+    for row in ticket_rows:
+        key = (row["journey__route_id"], row["day"])
+        if key in totals:
+            totals[key]["tickets_sold"] = row["tickets_sold"]
+    return totals
+
+
+def save_route_days(totals: dict[RouteDay, dict[str, int]]) -> None:
+    RouteDailyStats.objects.bulk_create(
+        [
+            RouteDailyStats(route_id=route_id, date=day, **values)
+            for (route_id, day), values in totals.items()
+        ],
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=["route", "date"],
+        update_fields=["journeys", "capacity", "tickets_sold"],
+    )
+
+
+def refresh_route_days(days: Iterable[RouteDay]) -> None:
+    """Recompute the stats rows of a few route days from source tables."""
+    journey_filter, ticket_filter = Q(pk__in=[]), Q(pk__in=[])
+    days = set(days)
+    for route_id, day in days:
+        start, end = day_bounds(day)
+        journey_filter |= Q(
+            route_id=route_id,
+            departure_time__gte=start,
+            departure_time__lt=end,
+        )
+        ticket_filter |= Q(
+            journey__route_id=route_id,
+            journey__departure_time__gte=start,
+            journey__departure_time__lt=end,
+        )
+
+    totals = aggregate_route_days(journey_filter, ticket_filter)
+    save_route_days(totals)
+
+    stale = Q(pk__in=[])
+    for route_id, day in days - set(totals):
+        stale |= Q(route_id=route_id, date=day)
+    RouteDailyStats.objects.filter(stale).delete()
+
+
+def record_tickets_sold(tickets: Iterable[Ticket]) -> None:
+    """Add newly sold tickets to the counters of their route days."""
+    adjust_tickets_sold(Counter(ticket.journey_id for ticket in tickets))
+
+
+def adjust_tickets_sold(changes: dict[int, int]) -> None:
+    """Apply ticket count deltas, keyed by journey id, to route days."""
+    sold = Counter()
+    days = (
+        Journey.objects.filter(id__in=changes)
+        .annotate(day=TruncDate("departure_time"))
+        .values_list("id", "route_id", "day")
+    )
+    for journey_id, route_id, day in days:
+        sold[(route_id, day)] += changes[journey_id]
+
+    missing = []
+    for (route_id, day), count in sold.items():
+        if not count:
+            continue
+        updated = RouteDailyStats.objects.filter(
+            route_id=route_id, date=day
+        ).update(tickets_sold=F("tickets_sold") + count)
+        if not updated:
+            missing.append((route_id, day))
+    if missing:
+        refresh_route_days(missing)
+
+
+def rebuild_route_stats(
+    date_from: datetime.date | None = None,
+    date_to: datetime.date | None = None,
+) -> int:
+    """Recompute all stats rows in a date range. Returns the row count."""
+    journey_filter, ticket_filter, stats_filter = Q(), Q(), Q()
+    if date_from:
+        start, _ = day_bounds(date_from)
+        journey_filter &= Q(departure_time__gte=start)
+        ticket_filter &= Q(journey__departure_time__gte=start)
+        stats_filter &= Q(date__gte=date_from)
+    if date_to:
+        _, end = day_bounds(date_to)
+        journey_filter &= Q(departure_time__lt=end)
+        ticket_filter &= Q(journey__departure_time__lt=end)
+        stats_filter &= Q(date__lte=date_to)
+
+    totals = aggregate_route_days(journey_filter, ticket_filter)
+    RouteDailyStats.objects.filter(stats_filter).delete()
+    save_route_days(totals)
+    return len(totals)
@@ -0,0 +1,161 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from order.models import Order, RouteDailyStats
+from order.tests.test_api import create_sample_journey
+from station.models import Journey, JourneySearchEntry, Station
+
+TICKET_CHANGELIST_URL = reverse("admin:order_ticket_changelist")
+
+
+class TicketAdminTests(TestCase):
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser(
+            "admin@example.com", "password123"
+        )
+        self.client.force_login(self.admin)
+        self.journey = create_sample_journey()
+        self.order = Order.objects.create(user=self.admin)
+        self.seat = 0
+
+    def add_tickets(self, count):
+        for _ in range(count):
+            self.seat += 1
+            self.order.tickets.create(
+                cargo=1, seat=self.seat, journey=self.journey
+            )
+
+    def count_changelist_queries(self, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(TICKET_CHANGELIST_URL, params or {})
+        self.assertEqual(res.status_code, 200)
+        return len(queries), res
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        """Test that listed tickets are loaded with their relations"""
+        self.add_tickets(2)
+        few, _ = self.count_changelist_queries()
+
+        self.add_tickets(20)
+        many, res = self.count_changelist_queries()
+
+        self.assertEqual(few, many)
+        self.assertContains(res, "Source -&gt; Destination")
+
+    def test_station_filter_loads_only_selected_station(self):
+        """Test that station filters do not list every station"""
+        self.add_tickets(1)
+        Station.objects.create(name="Unrelated", latitude=0, longitude=0)
+        source = self.journey.route.source
+
+        _, res = self.count_changelist_queries(
+            {"journey__route__source__id__exact": source.id}
+        )
+
+        self.assertContains(res, "admin-autocomplete")
+        self.assertContains(
+            res, f'<option value="{source.id}" selected>Source</option>'
+        )
+        self.assertNotContains(res, "Unrelated")
+        self.assertEqual(len(res.context["cl"].result_list), 1)
+
+
+class OrderAdminTests(TestCase):
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser(
+            "admin@example.com", "password123"
+        )
+        self.client.force_login(self.admin)
+        self.journey = create_sample_journey()
+        self.other_journey = Journey.objects.create(
+            route=self.journey.route,
+            train=self.journey.train,
+            departure_time="2025-10-11T10:00:00Z",
+            arrival_time="2025-10-11T12:00:00Z",
+        )
+        self.customer = get_user_model().objects.create_user(
+            "customer@example.com", "password123"
+        )
+        self.order = Order.objects.create(user=self.customer)
+        self.ticket = self.order.tickets.create(
+            cargo=1, seat=1, journey=self.journey
+        )
+        self.kept = self.order.tickets.create(
+            cargo=1, seat=2, journey=self.journey
+        )
+
+    def tickets_available(self, journey):
+        return JourneySearchEntry.objects.get(
+            journey=journey
+        ).tickets_available
+
+    def tickets_sold(self):
+        return sum(
+            RouteDailyStats.objects.values_list("tickets_sold", flat=True)
+        )
+
+    def save_inline(self, ticket_forms):
+        data = {
+            "user": self.customer.id,
+            "tickets-TOTAL_FORMS": len(ticket_forms),
+            "tickets-INITIAL_FORMS": len(ticket_forms),
+            "tickets-MIN_NUM_FORMS": 0,
+            "tickets-MAX_NUM_FORMS": 1000,
+        }
+        for index, fields in enumerate(ticket_forms):
+            for name, value in fields.items():
+                data[f"tickets-{index}-{name}"] = value
+        res = self.client.post(
+            reverse("admin:order_order_change", args=[self.order.id]), data
+        )
+        self.assertEqual(res.status_code, 302)
+
+    def ticket_form(self, ticket, **changes):
+        return {
+            "id": ticket.id,
+            "order": self.order.id,
+            "cargo": ticket.cargo,
+            "seat": ticket.seat,
+            "journey": ticket.journey_id,
+            "price": "",
+            **changes,
+        }
+
+    def test_inline_delete_releases_seats(self):
+        """Test that deleting an inline ticket releases its seat"""
+        self.assertEqual(self.tickets_available(self.journey), 498)
+
+        self.save_inline(
+            [
+                self.ticket_form(self.ticket, DELETE="on"),
+                self.ticket_form(self.kept),
+            ]
+        )
+
+        self.assertFalse(self.order.tickets.filter(pk=self.ticket.pk))
+        self.assertEqual(self.tickets_available(self.journey), 499)
+        self.assertEqual(self.tickets_sold(), 1)
+
+    def test_inline_journey_change_moves_the_seat(self):
+        """Test that moving a ticket to another journey moves its seat"""
+        self.save_inline(
+            [
+                self.ticket_form(self.ticket, journey=self.other_journey.id),
+                self.ticket_form(self.kept),
+            ]
+        )
+
+        self.assertEqual(self.tickets_available(self.journey), 499)
+        self.assertEqual(self.tickets_available(self.other_journey), 499)
+        self.assertEqual(self.tickets_sold(), 2)
+
+    def test_deleting_a_user_releases_their_seats(self):
+        """Test that orders deleted with their user release their seats"""
+        self.customer.delete()
+
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(self.tickets_available(self.journey), 500)
+        self.assertEqual(self.tickets_sold(), 0)
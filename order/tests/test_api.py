@@ -123,6 +123,18 @@ class OrderApiTests(TestCase):
         self.assertEqual(res.data["id"], order.id)
         self.assertEqual(len(res.data["tickets"]), 1)
 
+    def test_retrieve_order_without_expanded_tickets(self):
+        """Test that unexpanded tickets reference their journey by ID"""
+        order = Order.objects.create(user=self.user)
+        order.tickets.create(cargo=1, seat=1, journey=self.journey)
+
+        url = reverse("order:order-detail", args=[order.id])
+        res = self.client.get(url, {"fields": "tickets", "expand": ""})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(res.data), ["tickets"])
+        self.assertEqual(res.data["tickets"][0]["journey"], self.journey.id)
+
     def test_retrieve_other_user_order_fails(self):
         """Test user cannot retrieve someone else’s order"""
         another_user = get_user_model().objects.create_user(
@@ -0,0 +1,134 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from order.booking import (
+    BookingRequest,
+    HashRing,
+    SeatTaken,
+    book_batch,
+    place_order,
+)
+from order.models import Order, Ticket
+from order.tests.test_api import ORDER_URL, create_sample_journey
+
+
+class HashRingTests(SimpleTestCase):
+    def test_journeys_keep_their_partition(self):
+        """Test that a journey is always routed to the same partition"""
+        ring = HashRing(4)
+
+        partitions = {ring.partition(journey) for journey in range(1000)}
+
+        self.assertEqual(partitions, {0, 1, 2, 3})
+        self.assertEqual(
+            [ring.partition(journey) for journey in range(100)],
+            [HashRing(4).partition(journey) for journey in range(100)],
+        )
+
+    def test_adding_a_partition_moves_few_journeys(self):
+        """Test that growing the ring only moves journeys to the new one"""
+        before, after = HashRing(4), HashRing(5)
+
+        moved = [
+            journey
+            for journey in range(1000)
+            if before.partition(journey) != after.partition(journey)
+        ]
+
+        self.assertLess(len(moved), 400)
+        self.assertTrue(all(after.partition(j) == 4 for j in moved))
+
+
+class BookBatchTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "test@example.com", "password123"
+        )
+        self.journey = create_sample_journey()
+        self.journey.refresh_from_db()
+
+    def request(self, *seats):
+        return BookingRequest(
+            user=self.user,
+            tickets=[
+                {"journey": self.journey, "cargo": 1, "seat": seat}
+                for seat in seats
+            ],
+        )
+
+    def test_first_request_wins_a_seat(self):
+        """Test that a seat goes to the earliest request of the batch"""
+        first, second, third = (
+            self.request(1, 2),
+            self.request(2),
+            self.request(3),
+        )
+
+        book_batch([first, second, third])
+
+        self.assertEqual(first.future.result().tickets.count(), 2)
+        self.assertIsInstance(second.future.exception(), SeatTaken)
+        self.assertEqual(third.future.result().tickets.count(), 1)
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_booked_seats_are_rejected(self):
+        """Test that seats booked before the batch are not sold again"""
+        place_order(self.user, self.request(5).tickets)
+        request = self.request(5)
+
+        book_batch([request])
+
+        self.assertIsInstance(request.future.exception(), SeatTaken)
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_batch_queries_do_not_grow_with_its_size(self):
+        """Test that a batch is booked with a fixed number of queries"""
+        with CaptureQueriesContext(connection) as single:
+            book_batch([self.request(1)])
+        with self.assertNumQueries(len(single)):
+            book_batch([self.request(seat) for seat in range(10, 30)])
+
+        self.assertEqual(Ticket.objects.count(), 21)
+
+
+class PlaceOrderTests(TestCase):
+    def test_taken_seat_raises(self):
+        """Test that booking a taken seat directly raises SeatTaken"""
+        user = get_user_model().objects.create_user("a@b.com", "pass")
+        journey = create_sample_journey()
+        journey.refresh_from_db()
+        tickets = [{"journey": journey, "cargo": 1, "seat": 1}]
+        place_order(user, tickets)
+
+        with self.assertRaises(SeatTaken):
+            place_order(user, tickets)
+
+
+@override_settings(BOOKING_QUEUE_ENABLED=True)
+class BookingQueueApiTests(TransactionTestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@example.com", "password123"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.journey = create_sample_journey()
+
+    def test_orders_are_booked_through_the_queue(self):
+        """Test that queued orders are booked and taken seats refused"""
+        payload = {
+            "tickets": [{"cargo": 1, "seat": 1, "journey": self.journey.id}]
+        }
+
+        res = self.client.post(ORDER_URL, payload, format="json")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Order.objects.get().user, self.user)
+
+        res = self.client.post(ORDER_URL, payload, format="json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Ticket.objects.count(), 1)
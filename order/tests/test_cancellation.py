@@ -0,0 +1,170 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from order.models import Order, RouteDailyStats, Ticket
+from order.tests.test_api import create_sample_journey
+from station.models import JourneySearchEntry
+
+ORDER_URL = reverse("order:order-list")
+CANCELLATIONS_URL = reverse("order:cancellations")
+
+
+def cancel_url(order_id):
+    return reverse("order:order-cancel", args=[order_id])
+
+
+class CancellationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@example.com", "password123"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.journey = create_sample_journey()
+        self.journey.departure_time = timezone.now() + timedelta(days=2)
+        self.journey.arrival_time = self.journey.departure_time + timedelta(
+            hours=2
+        )
+        self.journey.save()
+
+    def book(self, *seats):
+        payload = {
+            "tickets": [
+                {"cargo": 1, "seat": seat, "journey": self.journey.id}
+                for seat in seats
+            ]
+        }
+        res = self.client.post(ORDER_URL, payload, format="json")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        return Order.objects.get(pk=res.data["id"])
+
+    def assert_seats_taken(self, taken):
+        entry = JourneySearchEntry.objects.get(journey=self.journey)
+        self.assertEqual(entry.tickets_available, 500 - taken)
+        stats = RouteDailyStats.objects.get(route=self.journey.route)
+        self.assertEqual(stats.tickets_sold, taken)
+
+    def test_cancel_whole_order(self):
+        """Test that cancelling an order deletes it and frees its seats"""
+        order = self.book(1, 2, 3)
+        self.book(4)
+        self.assert_seats_taken(4)
+
+        res = self.client.post(cancel_url(order.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["tickets_cancelled"], 3)
+        self.assertFalse(Order.objects.filter(pk=order.pk).exists())
+        self.assert_seats_taken(1)
+
+    def test_cancel_some_tickets(self):
+        """Test that single tickets can be cancelled and rebooked"""
+        order = self.book(1, 2)
+        ticket = order.tickets.get(seat=2)
+
+        res = self.client.post(
+            cancel_url(order.id), {"tickets": [ticket.id]}, format="json"
+        )
+
+        self.assertEqual(res.data["tickets_cancelled"], 1)
+        self.assertEqual(
+            list(order.tickets.values_list("seat", flat=True)), [1]
+        )
+        self.assert_seats_taken(1)
+        self.book(2)
+        self.assert_seats_taken(2)
+
+        res = self.client.post(
+            cancel_url(order.id),
+            {"tickets": [order.tickets.get().id]},
+            format="json",
+        )
+        self.assertFalse(Order.objects.filter(pk=order.pk).exists())
+
+    def test_cancel_releases_seats_in_few_queries(self):
+        """Test that the number of queries does not grow with tickets"""
+        small, large = self.book(1), self.book(*range(2, 42))
+
+        with CaptureQueriesContext(connection) as small_queries:
+            self.client.post(cancel_url(small.id))
+        with CaptureQueriesContext(connection) as large_queries:
+            self.client.post(cancel_url(large.id))
+
+        self.assertEqual(len(large_queries), len(small_queries))
+        self.assertFalse(Ticket.objects.exists())
+        self.assert_seats_taken(0)
+
+    def test_cancel_unknown_ticket_fails(self):
+        """Test that tickets of other orders cannot be cancelled"""
+        order = self.book(1)
+        other = self.book(2)
+
+        res = self.client.post(
+            cancel_url(order.id),
+            {"tickets": [other.tickets.get().id]},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assert_seats_taken(2)
+
+    def test_cancel_other_user_order_fails(self):
+        """Test that users cannot cancel orders of other users"""
+        order = self.book(1)
+        other_user = get_user_model().objects.create_user(
+            "other@example.com", "password123"
+        )
+        self.client.force_authenticate(user=other_user)
+
+        res = self.client.post(cancel_url(order.id))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assert_seats_taken(1)
+
+    def test_cancel_departed_journey_fails(self):
+        """Test that tickets of departed journeys cannot be cancelled"""
+        order = self.book(1)
+        self.journey.departure_time = timezone.now() - timedelta(hours=1)
+        self.journey.save()
+
+        res = self.client.post(cancel_url(order.id))
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue(Order.objects.filter(pk=order.pk).exists())
+
+    def test_admin_cancels_all_tickets_of_journey(self):
+        """Test that admins cancel every ticket of a journey at once"""
+        self.book(1, 2)
+        self.book(3)
+        admin_user = get_user_model().objects.create_superuser(
+            "admin@example.com", "password123"
+        )
+        self.client.force_authenticate(user=admin_user)
+
+        res = self.client.post(
+            CANCELLATIONS_URL, {"journeys": [self.journey.id]}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["tickets_cancelled"], 3)
+        self.assertFalse(Order.objects.exists())
+        self.assert_seats_taken(0)
+
+    def test_bulk_cancellation_requires_admin(self):
+        """Test that bulk cancellation is forbidden for regular users"""
+        self.book(1)
+
+        res = self.client.post(
+            CANCELLATIONS_URL, {"journeys": [self.journey.id]}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+        self.assert_seats_taken(1)
@@ -0,0 +1,80 @@
+import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from order.models import IdempotencyKey, Order, Ticket
+from order.tests.test_api import create_sample_journey
+
+ORDER_URL = reverse("order:order-list")
+
+
+class IdempotentOrderTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@example.com", "password123"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.journey = create_sample_journey()
+        self.payload = {
+            "tickets": [{"cargo": 1, "seat": 1, "journey": self.journey.id}]
+        }
+
+    def post(self, payload, key="order-key-1"):
+        return self.client.post(
+            ORDER_URL, payload, format="json", HTTP_IDEMPOTENCY_KEY=key
+        )
+
+    def test_retry_replays_original_response(self):
+        """Test that a retried order returns the first response"""
+        first = self.post(self.payload)
+        retry = self.post(self.payload)
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.data["id"], first.data["id"])
+        self.assertEqual(retry.headers["Idempotent-Replayed"], "true")
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_reused_key_with_different_request_fails(self):
+        """Test that a key cannot be reused for another request"""
+        self.post(self.payload)
+        other = {
+            "tickets": [{"cargo": 1, "seat": 2, "journey": self.journey.id}]
+        }
+        res = self.post(other)
+        self.assertEqual(res.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_failed_request_is_not_stored(self):
+        """Test that a rejected order can be retried with the same key"""
+        invalid = {
+            "tickets": [{"cargo": 99, "seat": 1, "journey": self.journey.id}]
+        }
+        res = self.post(invalid)
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_purge_deletes_expired_keys(self):
+        """Test that the purge command removes old keys in bulk"""
+        self.post(self.payload, key="old")
+        other = {
+            "tickets": [{"cargo": 1, "seat": 2, "journey": self.journey.id}]
+        }
+        self.post(other, key="new")
+        IdempotencyKey.objects.filter(key="old").update(
+            created_at=timezone.now() - datetime.timedelta(days=2)
+        )
+
+        call_command("purge_idempotency_keys", stdout=StringIO())
+
+        keys = IdempotencyKey.objects.values_list("key", flat=True)
+        self.assertEqual(list(keys), ["new"])
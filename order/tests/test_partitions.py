@@ -0,0 +1,59 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from order.models import Order, Ticket
+from order.partitions import next_month, partition_name
+from order.tests.test_api import create_sample_journey
+
+ORDER_URL = reverse("order:order-list")
+
+
+class TicketPartitioningTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@example.com", "password123"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.journey = create_sample_journey()
+
+    def test_tickets_store_journey_departure_date(self):
+        """Test that every write path fills the partition key"""
+        order = Order.objects.create(user=self.user)
+        order.tickets.create(cargo=1, seat=1, journey=self.journey)
+        payload = {
+            "tickets": [{"cargo": 1, "seat": 2, "journey": self.journey.id}]
+        }
+        self.client.post(ORDER_URL, payload, format="json")
+
+        dates = set(Ticket.objects.values_list("departure_date", flat=True))
+        self.assertEqual(dates, {datetime.date(2025, 10, 10)})
+
+    def test_rescheduled_journey_moves_its_tickets(self):
+        """Test that changing the departure updates the ticket rows"""
+        order = Order.objects.create(user=self.user)
+        order.tickets.create(cargo=1, seat=1, journey=self.journey)
+
+        self.journey.departure_time = "2025-11-02T10:00:00Z"
+        self.journey.arrival_time = "2025-11-02T12:00:00Z"
+        self.journey.save()
+
+        ticket = Ticket.objects.get()
+        self.assertEqual(ticket.departure_date, datetime.date(2025, 11, 2))
+
+    def test_partition_naming(self):
+        """Test monthly partition names and boundaries"""
+        month = datetime.date(2025, 12, 1)
+        self.assertEqual(partition_name(month), "order_ticket_p2025_12")
+        self.assertEqual(next_month(month), datetime.date(2026, 1, 1))
+
+    def test_command_requires_partitioned_table(self):
+        """Test that the command refuses to run without partitioning"""
+        with self.assertRaises(CommandError):
+            call_command("ticket_partitions")
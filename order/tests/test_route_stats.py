@@ -0,0 +1,98 @@
+import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from order.models import Order, RouteDailyStats
+from order.tests.test_api import create_sample_journey
+from station.models import Journey
+
+ORDER_URL = reverse("order:order-list")
+ROUTE_STATS_URL = reverse("order:route-stats-list")
+JOURNEY_DATE = datetime.date(2025, 10, 10)
+
+
+class RouteDailyStatsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@example.com", "password123"
+        )
+        self.admin_user = get_user_model().objects.create_superuser(
+            "admin@example.com", "password123"
+        )
+        self.journey = create_sample_journey()
+        self.route = self.journey.route
+
+    def book(self, *seats):
+        self.client.force_authenticate(user=self.user)
+        payload = {
+            "tickets": [
+                {"cargo": 1, "seat": seat, "journey": self.journey.id}
+                for seat in seats
+            ]
+        }
+        return self.client.post(ORDER_URL, payload, format="json")
+
+    def test_stats_follow_journeys_and_orders(self):
+        """Test that stats are maintained as journeys and orders change"""
+        stats = RouteDailyStats.objects.get(route=self.route)
+        self.assertEqual(stats.date, JOURNEY_DATE)
+        self.assertEqual((stats.journeys, stats.capacity), (1, 500))
+
+        self.book(1, 2, 3)
+        order = Order.objects.create(user=self.user)
+        order.tickets.create(cargo=2, seat=1, journey=self.journey)
+
+        stats.refresh_from_db()
+        self.assertEqual(stats.tickets_sold, 4)
+        self.assertEqual(stats.load_factor, 0.008)
+
+        Journey.objects.get(pk=self.journey.pk).delete()
+        self.assertFalse(RouteDailyStats.objects.exists())
+
+    def test_rebuild_command_matches_incremental_counters(self):
+        """Test that a rebuild reproduces the incremental counters"""
+        self.book(1, 2)
+        expected = list(RouteDailyStats.objects.values())
+        RouteDailyStats.objects.all().delete()
+
+        call_command(
+            "rebuild_route_stats", "--from", "2025-10-01", stdout=StringIO()
+        )
+
+        rebuilt = list(RouteDailyStats.objects.values())
+        for row in expected + rebuilt:
+            row.pop("id")
+        self.assertEqual(rebuilt, expected)
+
+    def test_route_stats_admin_only(self):
+        """Test that route statistics are only available to admins"""
+        self.client.force_authenticate(user=self.user)
+        res = self.client.get(ROUTE_STATS_URL)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_filter_route_stats_by_station_and_dates(self):
+        """Test filtering statistics by station and date range"""
+        self.book(1)
+        self.client.force_authenticate(user=self.admin_user)
+
+        res = self.client.get(
+            ROUTE_STATS_URL,
+            {
+                "station": self.route.destination_id,
+                "date_from": "2025-10-01",
+                "date_to": "2025-10-31",
+            },
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["results"]), 1)
+        self.assertEqual(res.data["results"][0]["tickets_sold"], 1)
+
+        res = self.client.get(ROUTE_STATS_URL, {"date_from": "2025-11-01"})
+        self.assertEqual(res.data["results"], [])
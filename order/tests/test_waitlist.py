@@ -0,0 +1,166 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from job.models import Job
+from job.worker import run_pending
+from order.cancellation import cancel_tickets
+from order.models import Order, Ticket, WaitlistEntry
+from station.models import (
+    Journey,
+    JourneySearchEntry,
+    Route,
+    Station,
+    Train,
+    TrainType,
+)
+
+ORDER_URL = reverse("order:order-list")
+WAITLIST_URL = reverse("order:waitlist-list")
+
+
+class WaitlistTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.users = [
+            get_user_model().objects.create_user(
+                f"user{i}@example.com", "password123"
+            )
+            for i in range(4)
+        ]
+        route = Route.objects.create(
+            source=Station.objects.create(
+                name="Source", latitude=1.0, longitude=1.0
+            ),
+            destination=Station.objects.create(
+                name="Destination", latitude=2.0, longitude=2.0
+            ),
+            distance=100,
+        )
+        train = Train.objects.create(
+            name="Small",
+            cargo_num=1,
+            places_in_cargo=3,
+            train_type=TrainType.objects.create(name="Local"),
+        )
+        departure = timezone.now() + timedelta(days=1)
+        self.journey = Journey.objects.create(
+            route=route,
+            train=train,
+            departure_time=departure,
+            arrival_time=departure + timedelta(hours=2),
+        )
+        self.client.force_authenticate(user=self.users[0])
+        self.client.post(
+            ORDER_URL,
+            {
+                "tickets": [
+                    {"cargo": 1, "seat": seat, "journey": self.journey.id}
+                    for seat in (1, 2, 3)
+                ]
+            },
+            format="json",
+        )
+
+    def join(self, user, party_size):
+        self.client.force_authenticate(user=user)
+        return self.client.post(
+            WAITLIST_URL,
+            {"journey": self.journey.id, "party_size": party_size},
+            format="json",
+        )
+
+    def release(self, *seats):
+        cancel_tickets(
+            Ticket.objects.filter(journey=self.journey, seat__in=seats)
+        )
+
+    def test_released_seats_go_to_parties_that_fit(self):
+        """Test that seats are allocated first come first served"""
+        self.join(self.users[1], 2)
+        self.join(self.users[2], 1)
+        self.join(self.users[3], 3)
+        run_pending()
+        self.assertEqual(
+            WaitlistEntry.objects.filter(allocated_at=None).count(), 3
+        )
+
+        self.release(2)
+        run_pending()
+
+        allocated = WaitlistEntry.objects.get(user=self.users[2])
+        self.assertEqual(
+            list(allocated.order.tickets.values_list("seat", flat=True)),
+            [2],
+        )
+        self.assertTrue(
+            WaitlistEntry.objects.get(user=self.users[1]).is_waiting
+        )
+
+        self.release(1, 3)
+        self.assertEqual(
+            Job.objects.filter(task="order.allocate_waitlist").count(), 1
+        )
+        run_pending()
+
+        allocated = WaitlistEntry.objects.get(user=self.users[1])
+        self.assertEqual(allocated.order.user, self.users[1])
+        self.assertEqual(allocated.order.tickets.count(), 2)
+        self.assertTrue(
+            WaitlistEntry.objects.get(user=self.users[3]).is_waiting
+        )
+        entry = JourneySearchEntry.objects.get(journey=self.journey)
+        self.assertEqual(entry.tickets_available, 0)
+
+    def test_releases_without_waiting_parties_queue_nothing(self):
+        """Test that no job is queued when nobody is waiting"""
+        self.release(1)
+
+        self.assertFalse(
+            Job.objects.filter(task="order.allocate_waitlist").exists()
+        )
+
+    def test_join_with_seats_available_fails(self):
+        """Test that parties that fit in the free seats must book"""
+        self.release(1, 2)
+
+        res = self.join(self.users[1], 2)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.join(self.users[1], 3)
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_join_twice_fails(self):
+        """Test that a user waits at most once per journey"""
+        self.assertEqual(
+            self.join(self.users[1], 1).status_code, status.HTTP_201_CREATED
+        )
+
+        res = self.join(self.users[1], 2)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_leave_waitlist(self):
+        """Test that users can leave the waitlist before allocation"""
+        entry_id = self.join(self.users[1], 1).data["id"]
+
+        res = self.client.delete(f"{WAITLIST_URL}{entry_id}/")
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.release(1)
+        run_pending()
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_list_only_own_entries(self):
+        """Test that users only see their own waitlist entries"""
+        self.join(self.users[1], 1)
+        self.join(self.users[2], 1)
+
+        res = self.client.get(WAITLIST_URL)
+
+        self.assertEqual(res.data["count"], 1)
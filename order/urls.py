@@ -1,11 +1,21 @@
 from django.urls import path, include
 from rest_framework import routers
 
-from .views import OrderViewSet
+from .views import (
+    CancellationView,
+    OrderViewSet,
+    RouteDailyStatsViewSet,
+    WaitlistViewSet,
+)
 
 app_name = "order"
 
 router = routers.DefaultRouter()
 router.register("orders", OrderViewSet, basename="order")
+router.register("waitlist", WaitlistViewSet, basename="waitlist")
+router.register("route-stats", RouteDailyStatsViewSet, basename="route-stats")
 
-urlpatterns = [path("", include(router.urls))]
+urlpatterns = [
+    path("cancellations/", CancellationView.as_view(), name="cancellations"),
+    path("", include(router.urls)),
+]
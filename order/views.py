@@ -1,20 +1,43 @@
+import hashlib
+import json
 from typing import Type
 
-from django.db.models import Count, QuerySet
+from django.db import transaction
+from django.db.models import Count, Q, QuerySet
+from django.utils import timezone
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import (
     extend_schema_view,
     extend_schema,
     OpenApiParameter,
 )
-from rest_framework import viewsets, mixins
-from rest_framework.permissions import IsAuthenticated
+from rest_framework import generics, viewsets, mixins, status
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.response import Response
 from rest_framework.serializers import Serializer
-from .models import Order
+
+from config.fieldsets import FIELDSET_PARAMETERS, SparseFieldsetViewMixin
+from job.registry import enqueue
+from station.models import Journey
+from .cancellation import cancel_journeys, cancel_orders, cancel_tickets
+from .models import (
+    IdempotencyKey,
+    Order,
+    RouteDailyStats,
+    Ticket,
+    WaitlistEntry,
+)
 from .serializers import (
+    CancellationResultSerializer,
+    CancellationSerializer,
+    OrderCancelSerializer,
     OrderSerializer,
     OrderListSerializer,
     OrderDetailSerializer,
+    RouteDailyStatsSerializer,
+    WaitlistEntrySerializer,
 )
 
 
@@ -32,15 +55,26 @@ from .serializers import (
                 description=(
                     "Filter orders by creation date (format: YYYY-MM-DD)."
                 ),
-            )
+            ),
+            *FIELDSET_PARAMETERS,
         ],
     ),
     create=extend_schema(
         summary="Create a new order",
         description=(
             "Create a new order with a list of tickets. "
-            "This action is available only for authenticated users."
+            "This action is available only for authenticated users. "
+            "Retries sent with the same Idempotency-Key header "
+            "return the original response without booking again."
         ),
+        parameters=[
+            OpenApiParameter(
+                name="Idempotency-Key",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.HEADER,
+                description="Unique client-generated key of the request.",
+            )
+        ],
     ),
     retrieve=extend_schema(
         summary="Retrieve a specific order",
@@ -49,9 +83,11 @@ from .serializers import (
             "including all tickets and their journey information. "
             "Users can only access their own orders."
         ),
+        parameters=FIELDSET_PARAMETERS,
     ),
 )
 class OrderViewSet(
+    SparseFieldsetViewMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     mixins.CreateModelMixin,
@@ -60,6 +96,7 @@ class OrderViewSet(
     queryset = Order.objects.all()
     serializer_class = OrderSerializer
     permission_classes = (IsAuthenticated,)
+    throttle_scopes = {"create": "order_create"}
 
     def get_queryset(self) -> QuerySet:
         queryset = self.queryset.filter(user=self.request.user)
@@ -71,10 +108,18 @@ class OrderViewSet(
             queryset = queryset.annotate(tickets_count=Count("tickets"))
 
         if self.action == "retrieve":
-            queryset = queryset.prefetch_related(
-                "tickets__journey__route__source",
-                "tickets__journey__route__destination",
-                "tickets__journey__train",
+            if self.expands_field("tickets"):
+                queryset = queryset.prefetch_related(
+                    "tickets__journey__route__source",
+                    "tickets__journey__route__destination",
+                    "tickets__journey__train",
+                )
+            elif self.wants_field("tickets"):
+                queryset = queryset.prefetch_related("tickets")
+
+        if self.action in ("list", "retrieve"):
+            queryset = self.only_requested(
+                queryset, {"created_at": "created_at"}
             )
         return queryset
 
@@ -83,7 +128,241 @@ class OrderViewSet(
             return OrderListSerializer
         if self.action == "retrieve":
             return OrderDetailSerializer
+        if self.action == "cancel":
+            return OrderCancelSerializer
         return self.serializer_class
 
+    @extend_schema(
+        summary="Cancel an order or some of its tickets",
+        description=(
+            "Cancel the given tickets of the order, or the whole order "
+            "when no tickets are passed, and release their seats. "
+            "Orders left without tickets are deleted. Tickets of "
+            "journeys that already departed cannot be cancelled."
+        ),
+        responses=CancellationResultSerializer,
+    )
+    @action(methods=["POST"], detail=True)
+    @transaction.atomic
+    def cancel(self, request: Request, pk=None) -> Response:
+        order = self.get_object()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        tickets = order.tickets.all()
+        if requested := serializer.validated_data.get("tickets"):
+            tickets = tickets.filter(pk__in=requested)
+            unknown = set(requested) - set(
+                tickets.values_list("pk", flat=True)
+            )
+            if unknown:
+                return Response(
+                    {
+                        "tickets": (
+                            "Unknown tickets for this order: "
+                            f"{sorted(unknown)}."
+                        )
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        if tickets.filter(
+            journey__departure_time__lte=timezone.now()
+        ).exists():
+            return Response(
+                {
+                    "detail": "Tickets of departed journeys cannot be cancelled."
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if requested:
+            cancelled = cancel_tickets(tickets)
+        else:
+            cancelled = cancel_orders(Order.objects.filter(pk=order.pk))
+        return Response({"tickets_cancelled": cancelled})
+
+    def create(self, request: Request, *args, **kwargs) -> Response:
+        key = request.headers.get("Idempotency-Key")
+        if not key:
+            return super().create(request, *args, **kwargs)
+        if len(key) > 255:
+            return Response(
+                {"detail": "Idempotency-Key must be at most 255 characters."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        request_hash = hashlib.sha256(
+            json.dumps(request.data, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
+        # The key row is locked for the whole booking, so a concurrent
+        # retry waits and then replays the stored response. Failed
+        # requests roll the key back and can be retried.
+        with transaction.atomic():
+            keys = IdempotencyKey.objects.select_for_update()
+            record, created = keys.get_or_create(
+                user=request.user,
+                key=key,
+                defaults={"request_hash": request_hash},
+            )
+            if not created:
+                if record.request_hash != request_hash:
+                    return Response(
+                        {
+                            "detail": (
+                                "Idempotency-Key was already used "
+                                "with a different request."
+                            )
+                        },
+                        status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    )
+                return Response(
+                    record.response_body,
+                    status=record.response_status,
+                    headers={"Idempotent-Replayed": "true"},
+                )
+
+            response = super().create(request, *args, **kwargs)
+            record.response_status = response.status_code
+            record.response_body = response.data
+            record.save(update_fields=["response_status", "response_body"])
+        return response
+
     def perform_create(self, serializer: Serializer) -> None:
         serializer.save(user=self.request.user)
+
+
+@extend_schema_view(
+    list=extend_schema(
+        summary="List waitlist entries of the current user",
+        description=(
+            "Allocated entries link to the order booked for the party."
+        ),
+    ),
+    create=extend_schema(
+        summary="Join the waitlist of a sold-out journey",
+        description=(
+            "Wait for seats on a journey without enough free seats for "
+            "the party. Released seats are allocated in the background, "
+            "first come first served, to the parties they fit, and an "
+            "order is booked for each served party."
+        ),
+    ),
+    destroy=extend_schema(summary="Leave the waitlist"),
+)
+class WaitlistViewSet(
+    mixins.ListModelMixin,
+    mixins.CreateModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    queryset = WaitlistEntry.objects.all()
+    serializer_class = WaitlistEntrySerializer
+    permission_classes = (IsAuthenticated,)
+    throttle_scopes = {"create": "order_create"}
+
+    def get_queryset(self) -> QuerySet:
+        queryset = self.queryset.filter(user=self.request.user)
+        if self.action == "destroy":
+            queryset = queryset.filter(allocated_at=None)
+        return queryset
+
+    @transaction.atomic
+    def perform_create(self, serializer: Serializer) -> None:
+        entry = serializer.save(user=self.request.user)
+        # Seats released while the request was validated are not lost.
+        enqueue("order.allocate_waitlist", {"journey_id": entry.journey_id})
+
+
+@extend_schema_view(
+    list=extend_schema(
+        summary="List daily route statistics (admin only)",
+        description=(
+            "Tickets sold, capacity and load factor per route and "
+            "departure date, read from a pre-aggregated table."
+        ),
+        parameters=[
+            OpenApiParameter(
+                name="route",
+                type=OpenApiTypes.INT,
+                description="Filter by route ID.",
+            ),
+            OpenApiParameter(
+                name="station",
+                type=OpenApiTypes.INT,
+                description="Filter by source or destination station ID.",
+            ),
+            OpenApiParameter(
+                name="date_from",
+                type=OpenApiTypes.DATE,
+                description="First departure date (format: YYYY-MM-DD).",
+            ),
+            OpenApiParameter(
+                name="date_to",
+                type=OpenApiTypes.DATE,
+                description="Last departure date (format: YYYY-MM-DD).",
+            ),
+        ],
+    ),
+)
+class RouteDailyStatsViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    queryset = RouteDailyStats.objects.select_related(
+        "route__source", "route__destination"
+    )
+    serializer_class = RouteDailyStatsSerializer
+    permission_classes = (IsAdminUser,)
+
+    def get_queryset(self) -> QuerySet:
+        queryset = self.queryset
+        params = self.request.query_params
+
+        if (route := params.get("route", "")).isdigit():
+            queryset = queryset.filter(route_id=int(route))
+
+        if (station := params.get("station", "")).isdigit():
+            queryset = queryset.filter(
+                Q(route__source_id=int(station))
+                | Q(route__destination_id=int(station))
+            )
+
+        if date_from := params.get("date_from"):
+            queryset = queryset.filter(date__gte=date_from)
+
+        if date_to := params.get("date_to"):
+            queryset = queryset.filter(date__lte=date_to)
+
+        return queryset
+
+
+@extend_schema(
+    summary="Cancel tickets in bulk (admin only)",
+    description=(
+        "Cancel every ticket of the given journeys or orders, or the "
+        "given tickets, with one set-based operation. Seats are released "
+        "and orders left without tickets are deleted."
+    ),
+    responses=CancellationResultSerializer,
+)
+class CancellationView(generics.GenericAPIView):
+    serializer_class = CancellationSerializer
+    permission_classes = (IsAdminUser,)
+
+    def post(self, request: Request) -> Response:
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        if "journeys" in data:
+            cancelled = cancel_journeys(
+                Journey.objects.filter(pk__in=data["journeys"])
+            )
+        elif "orders" in data:
+            cancelled = cancel_orders(
+                Order.objects.filter(pk__in=data["orders"])
+            )
+        else:
+            cancelled = cancel_tickets(
+                Ticket.objects.filter(pk__in=data["tickets"])
+            )
+        return Response({"tickets_cancelled": cancelled})
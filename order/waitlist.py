@@ -0,0 +1,112 @@
+"""
+Allocation of released seats to waitlisted parties.
+
+Seats freed by cancellations are handed out by a background job, not by
+the request that released them. For each journey the allocator locks
+the journey row, reads the taken seats in one query and walks the
+waiting parties in FIFO order, giving every party that still fits the
+first free seats. Orders and tickets of all served parties are written
+with bulk inserts.
+"""
+
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from station.fares import journey_fares
+from station.models import Journey
+from .models import Order, Ticket, WaitlistEntry
+from .signals import tickets_booked
+
+Seat = tuple[int, int]
+
+
+def free_seats(journey: Journey) -> list[Seat]:
+    """Return the free (cargo, seat) pairs of a journey in seat order."""
+    taken = set(
+        Ticket.objects.filter(journey=journey).values_list("cargo", "seat")
+    )
+    train = journey.train
+    return [
+        (cargo, seat)
+        for cargo in range(1, train.cargo_num + 1)
+        for seat in range(1, train.places_in_cargo + 1)
+        if (cargo, seat) not in taken
+    ]
+
+
+def assign_seats(
+    entries: list[WaitlistEntry], seats: list[Seat]
+) -> list[tuple[WaitlistEntry, list[Seat]]]:
+    """
+    Give seats to waiting parties in order. A party larger than the
+    remaining seats is skipped and keeps its place in the queue.
+    """
+    assigned = []
+    for entry in entries:
+        if not seats:
+            break
+        if entry.party_size <= len(seats):
+            assigned.append((entry, seats[: entry.party_size]))
+            seats = seats[entry.party_size :]
+    return assigned
+
+
+def allocate_journey(journey: Journey) -> int:
+    """Book free seats of a locked journey for its waiting parties."""
+    entries = list(
+        WaitlistEntry.objects.filter(journey=journey, allocated_at=None)
+        .select_for_update()
+        .order_by("created_at", "id")
+    )
+    if not entries:
+        return 0
+    assigned = assign_seats(entries, free_seats(journey))
+    if not assigned:
+        return 0
+
+    orders = Order.objects.bulk_create(
+        [Order(user_id=entry.user_id) for entry, _ in assigned]
+    )
+    departure_date = timezone.localdate(journey.departure_time)
+    price = journey_fares([journey.pk]).get(journey.pk)
+    tickets = Ticket.objects.bulk_create(
+        [
+            Ticket(
+                order=order,
+                journey=journey,
+                cargo=cargo,
+                seat=seat,
+                departure_date=departure_date,
+                price=price,
+            )
+            for order, (_, seats) in zip(orders, assigned)
+            for cargo, seat in seats
+        ]
+    )
+    tickets_booked.send(sender=Ticket, tickets=tickets)
+
+    now = timezone.now()
+    for order, (entry, _) in zip(orders, assigned):
+        entry.order = order
+        entry.allocated_at = now
+    WaitlistEntry.objects.bulk_update(
+        [entry for entry, _ in assigned], ["order", "allocated_at"]
+    )
+    return len(assigned)
+
+
+@transaction.atomic
+def allocate_waitlist(journeys: QuerySet) -> int:
+    """
+    Allocate free seats of the given upcoming journeys. Returns the
+    number of parties that got seats.
+    """
+    # Locking the journeys serializes allocators of the same journey.
+    locked = (
+        journeys.filter(departure_time__gt=timezone.now())
+        .select_related("train")
+        .select_for_update(of=("self",))
+        .order_by("pk")
+    )
+    return sum(allocate_journey(journey) for journey in locked)
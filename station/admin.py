@@ -1,4 +1,10 @@
 from django.contrib import admin
+
+from config.admin import (
+    AutocompleteFilter,
+    AutocompleteFilterMixin,
+    EstimatedCountPaginator,
+)
 from .models import (
     Station,
     Route,
@@ -6,6 +12,9 @@ from .models import (
     Train,
     Crew,
     Journey,
+    Tariff,
+    DistanceBand,
+    DemandMultiplier,
 )
 
 
@@ -18,6 +27,9 @@ class StationAdmin(admin.ModelAdmin):
 @admin.register(Route)
 class RouteAdmin(admin.ModelAdmin):
     list_display = ("source", "destination", "distance")
+    list_select_related = ("source", "destination")
+    autocomplete_fields = ("source", "destination")
+    search_fields = ("source__name", "destination__name")
 
 
 @admin.register(Train)
@@ -28,11 +40,43 @@ class TrainAdmin(admin.ModelAdmin):
 
 
 @admin.register(Journey)
-class JourneyAdmin(admin.ModelAdmin):
+class JourneyAdmin(AutocompleteFilterMixin, admin.ModelAdmin):
     list_display = ("route", "train", "departure_time", "arrival_time")
-    list_filter = ("route__source", "route__destination", "departure_time")
+    list_filter = (
+        ("route__source", AutocompleteFilter),
+        ("route__destination", AutocompleteFilter),
+        "departure_time",
+    )
+    list_select_related = ("route__source", "route__destination", "train")
     search_fields = ("route__source__name", "route__destination__name")
+    autocomplete_fields = ("route", "train", "crew")
+    # Newest first, from the departure_time index.
+    ordering = ("-departure_time",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
+
+
+class DistanceBandInline(admin.TabularInline):
+    model = DistanceBand
+    extra = 1
+
+
+@admin.register(Tariff)
+class TariffAdmin(admin.ModelAdmin):
+    inlines = (DistanceBandInline,)
+    list_display = ("train_type", "base_fare")
+
+
+@admin.register(DemandMultiplier)
+class DemandMultiplierAdmin(admin.ModelAdmin):
+    list_display = ("min_fill_ratio", "multiplier")
+
+
+@admin.register(Crew)
+class CrewAdmin(admin.ModelAdmin):
+    list_display = ("first_name", "last_name")
+    search_fields = ("first_name", "last_name")
 
 
 admin.site.register(TrainType)
-admin.site.register(Crew)
@@ -0,0 +1,220 @@
+"""
+In-process index of station names for type-ahead and name lookups.
+
+Names are normalized for case and diacritics. Prefixes of the name and
+of each word are found by bisecting a sorted list; names containing the
+query elsewhere, or close to it with a typo, are found through a trigram
+index. Matches are ranked by how they matched, then by popularity, the
+tickets sold from and to the station over the last
+AUTOCOMPLETE_POPULARITY_DAYS.
+
+Each process builds the index on first use and rebuilds it when the
+latest station entry of the change log (see station.changes) differs
+from the one it was built at. That entry is read at most every
+AUTOCOMPLETE_VERSION_CHECK_INTERVAL seconds, so station changes made by
+other processes are seen within that interval, and those made by this
+one right away. Popularity is refreshed once the index is older than
+AUTOCOMPLETE_MAX_AGE seconds.
+"""
+
+import bisect
+import datetime
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db.models import F, Max, Sum
+from django.utils import timezone
+
+from .changes import MODEL_KEYS
+from .models import ChangeLogEntry, JourneySearchEntry, Station
+
+NON_ALPHANUMERIC = re.compile(r"[^0-9a-z]+")
+# Share of the query's trigrams a name needs for a fuzzy match.
+TRIGRAM_THRESHOLD = 0.5
+
+PREFIX, WORD_PREFIX, SUBSTRING, FUZZY = range(4)
+
+
+def normalize(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return NON_ALPHANUMERIC.sub(" ", stripped).strip()
+
+
+def trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass(frozen=True)
+class StationName:
+    id: int
+    name: str
+    normalized: str
+    popularity: int
+
+
+class StationIndex:
+    def __init__(
+        self, stations: list[StationName], version: int | None = None
+    ) -> None:
+        self.stations = stations
+        self.version = version
+        self.built_at = self.checked_at = time.monotonic()
+        # (text starting at a word, is the whole name, station position)
+        self.prefixes = sorted(
+            (station.normalized[start:], start == 0, position)
+            for position, station in enumerate(stations)
+            for start in word_starts(station.normalized)
+        )
+        self.trigrams: dict[str, list[int]] = {}
+        for position, station in enumerate(stations):
+            for trigram in trigrams(station.normalized):
+                self.trigrams.setdefault(trigram, []).append(position)
+
+    def matches(self, query: str) -> dict[int, int]:
+        """Return the best match kind of every matching station position."""
+        found = {}
+        start = bisect.bisect_left(self.prefixes, (query,))
+        for text, whole, position in self.prefixes[start:]:
+            if not text.startswith(query):
+                break
+            kind = PREFIX if whole else WORD_PREFIX
+            found[position] = min(kind, found.get(position, kind))
+
+        if len(query) < 3:
+            return found
+
+        query_trigrams = trigrams(query)
+        shared = Counter(
+            position
+            for trigram in query_trigrams
+            for position in self.trigrams.get(trigram, ())
+        )
+        for position, count in shared.items():
+            if position in found:
+                continue
+            if query in self.stations[position].normalized:
+                found[position] = SUBSTRING
+            elif count >= TRIGRAM_THRESHOLD * len(query_trigrams):
+                found[position] = FUZZY
+        return found
+
+    def search(self, text: str, limit: int) -> list[StationName]:
+        query = normalize(text)
+        if not query:
+            return []
+        found = self.matches(query)
+        ranked = sorted(
+            found,
+            key=lambda position: (
+                found[position],
+                -self.stations[position].popularity,
+                self.stations[position].normalized,
+            ),
+        )
+        return [self.stations[position] for position in ranked[:limit]]
+
+    def station_ids(self, text: str) -> list[int]:
+        """Return the ids of stations whose name contains the text."""
+        query = normalize(text)
+        if not query:
+            return []
+        if len(query) < 3:
+            return [
+                station.id
+                for station in self.stations
+                if query in station.normalized
+            ]
+        return [
+            self.stations[position].id
+            for position, kind in self.matches(query).items()
+            if kind != FUZZY
+        ]
+
+
+def word_starts(normalized: str) -> list[int]:
+    return [0] + [i + 1 for i, c in enumerate(normalized) if c == " "]
+
+
+def station_popularity() -> Counter:
+    since = timezone.localdate() - datetime.timedelta(
+        days=settings.AUTOCOMPLETE_POPULARITY_DAYS
+    )
+    entries = JourneySearchEntry.objects.filter(
+        departure_date__gte=since
+    ).order_by()
+    sold = F("capacity") - F("tickets_available")
+    popularity = Counter()
+    for field in ("source_id", "destination_id"):
+        for station_id, tickets in entries.values_list(field).annotate(
+            tickets=Sum(sold)
+        ):
+            popularity[station_id] += tickets or 0
+    return popularity
+
+
+def stations_version() -> int | None:
+    """Return the id of the latest logged station change."""
+    return ChangeLogEntry.objects.filter(model=MODEL_KEYS[Station]).aggregate(
+        version=Max("id")
+    )["version"]
+
+
+def build_index(version: int | None = None) -> StationIndex:
+    popularity = station_popularity()
+    return StationIndex(
+        [
+            StationName(
+                id=pk,
+                name=name,
+                normalized=normalize(name),
+                popularity=popularity[pk],
+            )
+            for pk, name in Station.objects.values_list("pk", "name")
+        ],
+        version,
+    )
+
+
+_index: StationIndex | None = None
+_lock = threading.Lock()
+
+
+def get_index() -> StationIndex:
+    global _index
+    index = _index
+    now = time.monotonic()
+    max_age = settings.AUTOCOMPLETE_MAX_AGE
+    interval = settings.AUTOCOMPLETE_VERSION_CHECK_INTERVAL
+    if (
+        index is not None
+        and now - index.checked_at < interval
+        and now - index.built_at <= max_age
+    ):
+        return index
+
+    # Read before building, so changes made meanwhile trigger a rebuild.
+    version = stations_version()
+    if (
+        index is None
+        or index.version != version
+        or now - index.built_at > max_age
+    ):
+        with _lock:
+            if _index is index:
+                _index = build_index(version)
+            index = _index
+    else:
+        index.checked_at = now
+    return index
+
+
+def invalidate() -> None:
+    global _index
+    _index = None
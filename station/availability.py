@@ -0,0 +1,74 @@
+"""
+Seat availability of many journeys at once.
+
+Remaining seats come from the JourneySearchEntry counters; free seats
+per cargo are counted for all requested journeys in one grouped query.
+Requests matching more than AVAILABILITY_MAX_JOURNEYS journeys are
+rejected without loading them.
+"""
+
+from collections import defaultdict
+from typing import Any
+
+from django.conf import settings
+from django.db.models import Count, Q
+
+from .models import Journey, JourneySearchEntry
+
+
+class TooManyJourneys(Exception):
+    """More journeys match than AVAILABILITY_MAX_JOURNEYS."""
+
+
+def cargo_availability(journey_ids: list[int]) -> dict[int, list[dict]]:
+    """Return the free seats of every cargo, keyed by journey id."""
+    taken = defaultdict(dict)
+    layout = {}
+    rows = (
+        Journey.objects.filter(pk__in=journey_ids)
+        .values(
+            "id",
+            "train__cargo_num",
+            "train__places_in_cargo",
+            "tickets__cargo",
+        )
+        .annotate(taken=Count("tickets"))
+        .order_by()
+    )
+    for row in rows:
+        layout[row["id"]] = (
+            row["train__cargo_num"],
+            row["train__places_in_cargo"],
+        )
+        if row["tickets__cargo"] is not None:
+            taken[row["id"]][row["tickets__cargo"]] = row["taken"]
+
+    return {
+        journey_id: [
+            {
+                "cargo": cargo,
+                "free": places - taken[journey_id].get(cargo, 0),
+            }
+            for cargo in range(1, cargo_num + 1)
+        ]
+        for journey_id, (cargo_num, places) in layout.items()
+    }
+
+
+def journey_availability(
+    journey_filter: Q, cargos: bool = False
+) -> list[dict[str, Any]]:
+    """Return the availability of the journeys matching the filter."""
+    limit = settings.AVAILABILITY_MAX_JOURNEYS
+    results = list(
+        JourneySearchEntry.objects.filter(journey_filter).values(
+            "journey_id", "departure_time", "capacity", "tickets_available"
+        )[: limit + 1]
+    )
+    if len(results) > limit:
+        raise TooManyJourneys
+    if cargos:
+        per_cargo = cargo_availability([r["journey_id"] for r in results])
+        for result in results:
+            result["cargos"] = per_cargo.get(result["journey_id"], [])
+    return results
@@ -0,0 +1,138 @@
+"""
+Change log of the catalogue, read by the sync feed.
+
+Every insert, update and delete of a catalogue object appends a
+ChangeLogEntry, whose id is the change token. The feed reads the
+entries after a client's token, keeps the last change of each object
+and loads the changed rows with one query per model, so a sync costs in
+proportion to the number of changes, not to the size of the catalogue.
+Deletes are kept as tombstones until the log is purged.
+
+Tokens are handed out in id order, but ids are taken when an entry is
+inserted, not when its transaction commits. The feed therefore only
+reads entries older than CHANGE_FEED_SETTLE_TIME, assuming every
+transaction writing catalogue changes commits within it. That is a hard
+limit: a transaction committing later, such as a large journey import,
+can land below a token already given out, and clients past that token
+never receive its changes. Raise the setting from the environment before
+running such writes, or have clients download the catalogue again.
+"""
+
+from typing import Any, Iterable
+
+from django.conf import settings
+from django.db.models import Max, Min, Model
+from django.utils import timezone
+from rest_framework.serializers import Serializer
+
+from .models import (
+    ChangeLogEntry,
+    Crew,
+    Journey,
+    Route,
+    Station,
+    Train,
+    TrainType,
+)
+
+# Feed key of each tracked model.
+TRACKED = {
+    "stations": Station,
+    "train_types": TrainType,
+    "crews": Crew,
+    "routes": Route,
+    "trains": Train,
+    "journeys": Journey,
+}
+MODEL_KEYS = {model: key for key, model in TRACKED.items()}
+
+
+class TokenExpired(Exception):
+    """The changes after the token were purged from the log."""
+
+
+def log_changes(
+    model: type[Model], ids: Iterable[int], deleted: bool = False
+) -> None:
+    ChangeLogEntry.objects.bulk_create(
+        [
+            ChangeLogEntry(
+                model=MODEL_KEYS[model], object_id=pk, deleted=deleted
+            )
+            for pk in ids
+        ]
+    )
+
+
+def latest_token() -> int:
+    settled = timezone.now() - settings.CHANGE_FEED_SETTLE_TIME
+    return (
+        ChangeLogEntry.objects.filter(created_at__lte=settled).aggregate(
+            token=Max("id")
+        )["token"]
+        or 0
+    )
+
+
+def read_changes(
+    since: int,
+    serializers: dict[str, type[Serializer]],
+    context: dict[str, Any],
+) -> tuple[dict[str, dict[str, list]], int, bool]:
+    """
+    Return the changes after a token, grouped by feed key, with the
+    token to continue from and whether more changes are waiting. Saved
+    objects are rendered with the serializer given for their key.
+    """
+    oldest = ChangeLogEntry.objects.aggregate(oldest=Min("id"))["oldest"]
+    if oldest is not None and since < oldest - 1:
+        raise TokenExpired
+
+    settled = timezone.now() - settings.CHANGE_FEED_SETTLE_TIME
+    limit = settings.CHANGE_FEED_PAGE_SIZE
+    entries = list(
+        ChangeLogEntry.objects.filter(
+            id__gt=since, created_at__lte=settled
+        ).values_list("id", "model", "object_id", "deleted")[: limit + 1]
+    )
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    last_change = {}
+    for _, key, object_id, deleted in entries:
+        last_change[(key, object_id)] = deleted
+
+    changes = {}
+    for key, model in TRACKED.items():
+        saved = [
+            pk
+            for (entry_key, pk), deleted in last_change.items()
+            if entry_key == key and not deleted
+        ]
+        deleted = [
+            pk
+            for (entry_key, pk), deleted in last_change.items()
+            if entry_key == key and deleted
+        ]
+        changes[key] = {
+            "saved": serialize(model, serializers[key], saved, context),
+            "deleted": deleted,
+        }
+
+    token = entries[-1][0] if entries else since
+    return changes, token, has_more
+
+
+def serialize(
+    model: type[Model],
+    serializer_class: type[Serializer],
+    ids: list[int],
+    context: dict[str, Any],
+) -> list[dict[str, Any]]:
+    if not ids:
+        return []
+    queryset = model.objects.filter(pk__in=ids).order_by("pk")
+    if model is Journey:
+        queryset = queryset.prefetch_related("crew")
+    # Objects deleted after this page show up as tombstones later on.
+    return serializer_class(queryset, many=True, context=context).data
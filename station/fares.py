@@ -0,0 +1,146 @@
+"""
+Journey fares, precomputed in the JourneySearchEntry projection.
+
+The base fare of a journey depends only on its train type and route
+distance, so it is computed in Python once per distinct pair and written
+to all entries with a single CASE update. The demand multiplier follows
+the fill ratio, which the projection already holds, so the final fare is
+recomputed in SQL together with the seat counters. Requests only read
+the stored fares.
+"""
+
+from decimal import Decimal
+from typing import Iterable
+
+from django.db.models import (
+    Case,
+    DecimalField,
+    Expression,
+    F,
+    QuerySet,
+    Value,
+    When,
+)
+from django.db.models.functions import Round
+from django.db.models.lookups import GreaterThanOrEqual
+
+from .models import DemandMultiplier, JourneySearchEntry, Tariff
+
+CENT = Decimal("0.01")
+# Fill ratios are compared in thousandths to stay in integer arithmetic.
+RATIO_SCALE = 1000
+
+FarePair = tuple[int, int]
+
+
+def distance_fare(tariff: Tariff, distance: int) -> Decimal:
+    """Return the tariff's base fare plus its tapered per-km charges."""
+    fare, start = tariff.base_fare, 0
+    for band in tariff.distance_bands.all():
+        end = distance if band.up_to_km is None else band.up_to_km
+        fare += max(min(end, distance) - start, 0) * band.rate_per_km
+        if end >= distance:
+            break
+        start = end
+    return fare.quantize(CENT)
+
+
+def base_fares(pairs: Iterable[FarePair]) -> dict[FarePair, Decimal]:
+    """Return base fares keyed by (train type id, distance)."""
+    pairs = set(pairs)
+    tariffs = {
+        tariff.train_type_id: tariff
+        for tariff in Tariff.objects.filter(
+            train_type_id__in={train_type_id for train_type_id, _ in pairs}
+        ).prefetch_related("distance_bands")
+    }
+    return {
+        (train_type_id, distance): distance_fare(
+            tariffs[train_type_id], distance
+        )
+        for train_type_id, distance in pairs
+        if train_type_id in tariffs and distance is not None
+    }
+
+
+def base_fare_expression(fares: dict[FarePair, Decimal]) -> Expression:
+    return Case(
+        *(
+            When(
+                train_type_id=train_type_id,
+                distance=distance,
+                then=Value(fare),
+            )
+            for (train_type_id, distance), fare in fares.items()
+        ),
+        default=None,
+        output_field=DecimalField(max_digits=8, decimal_places=2),
+    )
+
+
+def demand_multipliers() -> list[tuple[Decimal, Decimal]]:
+    """Return (min fill ratio, multiplier) pairs, fullest first."""
+    return list(
+        DemandMultiplier.objects.order_by("-min_fill_ratio").values_list(
+            "min_fill_ratio", "multiplier"
+        )
+    )
+
+
+def fare_expression(
+    multipliers: list[tuple[Decimal, Decimal]],
+    base_fare: Expression = F("base_fare"),
+    tickets_available: Expression = F("tickets_available"),
+) -> Expression:
+    """Apply the demand multiplier of each entry's fill ratio."""
+    taken = (F("capacity") - tickets_available) * RATIO_SCALE
+    multiplier = Case(
+        *(
+            When(
+                GreaterThanOrEqual(
+                    taken, F("capacity") * int(ratio * RATIO_SCALE)
+                ),
+                then=Value(factor),
+            )
+            for ratio, factor in multipliers
+        ),
+        default=Value(Decimal(1)),
+        output_field=DecimalField(max_digits=4, decimal_places=2),
+    )
+    return Round(
+        base_fare * multiplier,
+        2,
+        output_field=DecimalField(max_digits=8, decimal_places=2),
+    )
+
+
+def refresh_fares(entries: QuerySet) -> int:
+    """Recompute base fares and fares of the given entries."""
+    fares = base_fares(
+        entries.order_by().values_list("train_type_id", "distance").distinct()
+    )
+    base_fare = base_fare_expression(fares)
+    return entries.update(
+        base_fare=base_fare,
+        fare=fare_expression(demand_multipliers(), base_fare=base_fare),
+    )
+
+
+def refresh_train_type_fares(train_type_ids: Iterable[int] | None) -> int:
+    """
+    Recompute fares after a tariff change, of the given train types or
+    of all of them.
+    """
+    entries = JourneySearchEntry.objects.all()
+    if train_type_ids is not None:
+        entries = entries.filter(train_type_id__in=train_type_ids)
+    return refresh_fares(entries)
+
+
+def journey_fares(journey_ids: Iterable[int]) -> dict[int, Decimal | None]:
+    """Return the stored fares of the given journeys."""
+    return dict(
+        JourneySearchEntry.objects.filter(
+            journey_id__in=journey_ids
+        ).values_list("journey_id", "fare")
+    )
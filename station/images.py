@@ -0,0 +1,85 @@
+import hashlib
+import os
+from io import BytesIO
+from typing import TYPE_CHECKING
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.db import transaction
+
+from job.registry import enqueue
+from .changes import log_changes
+from .models import Train
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+VARIANT_EXTENSIONS = {"JPEG": "jpg", "PNG": "png", "WEBP": "webp"}
+
+
+def content_hash(file: File) -> str:
+    """Return the SHA-256 of an uploaded file without consuming it."""
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def render_variant(
+    source: "Image.Image", size: int, image_format: str
+) -> bytes:
+    image = source.copy()
+    image.thumbnail((size, size))
+    if image_format == "JPEG" and image.mode != "RGB":
+        image = image.convert("RGB")
+
+    buffer = BytesIO()
+    image.save(buffer, format=image_format, quality=85, optimize=True)
+    return buffer.getvalue()
+
+
+def generate_train_image_variants(train_id: int) -> None:
+    """
+    Create the resized copies of a train image and record their paths
+    on every train sharing the same image content.
+    """
+    # Pillow is only loaded by the processes that render images.
+    from PIL import Image, ImageOps
+
+    train = Train.objects.filter(pk=train_id).first()
+    if not train or not train.image:
+        return
+
+    storage = train.image.storage
+    with train.image.open("rb") as image_file:
+        source = ImageOps.exif_transpose(Image.open(image_file))
+        source.load()
+
+    variants = {}
+    for name, spec in settings.TRAIN_IMAGE_VARIANTS.items():
+        extension = VARIANT_EXTENSIONS[spec["format"]]
+        path = os.path.join(
+            "uploads/trains/variants/",
+            f"{train.image_hash}-{name}.{extension}",
+        )
+        if not storage.exists(path):
+            content = render_variant(source, spec["size"], spec["format"])
+            path = storage.save(path, ContentFile(content))
+        variants[name] = path
+
+    trains = Train.objects.filter(image_hash=train.image_hash)
+    trains.update(image_variants=variants)
+    log_changes(Train, trains.values_list("pk", flat=True))
+
+
+def schedule_train_image_processing(train_id: int) -> None:
+    """
+    Queue the generation of image variants, or run it once the current
+    transaction commits when IMAGE_PROCESSING_ASYNC is off.
+    """
+    if settings.IMAGE_PROCESSING_ASYNC:
+        enqueue("station.train_image_variants", {"train_id": train_id})
+    else:
+        transaction.on_commit(lambda: generate_train_image_variants(train_id))
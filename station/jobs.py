@@ -0,0 +1,33 @@
+from typing import Any
+
+from job.registry import task
+from .fares import refresh_train_type_fares
+from .images import generate_train_image_variants
+from .network import update_distances
+
+
+@task("station.train_image_variants", batch=True)
+def train_image_variants(payloads: list[dict[str, Any]]) -> None:
+    for train_id in {payload["train_id"] for payload in payloads}:
+        generate_train_image_variants(train_id)
+
+
+@task("station.refresh_fares", batch=True)
+def refresh_fares(payloads: list[dict[str, Any]]) -> None:
+    train_type_ids = {payload.get("train_type_id") for payload in payloads}
+    if None in train_type_ids:
+        refresh_train_type_fares(None)
+    else:
+        refresh_train_type_fares(train_type_ids)
+
+
+@task("station.update_distances", batch=True)
+def update_station_distances(payloads: list[dict[str, Any]]) -> None:
+    update_distances(
+        edges={
+            (payload["source"], payload["destination"])
+            for payload in payloads
+            if not payload.get("rebuild")
+        },
+        rebuild=any(payload.get("rebuild") for payload in payloads),
+    )
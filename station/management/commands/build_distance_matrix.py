@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from station.network import update_distances
+
+
+class Command(BaseCommand):
+    help = "Recompute shortest distances between all stations."
+
+    def handle(self, *args, **options):
+        matrix = update_distances(rebuild=True)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Built distance matrix v{matrix.version} "
+                f"for {matrix.size} stations."
+            )
+        )
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from config.schema import SCHEMA_RENDERERS, code_version, get_schema_document
+
+
+class Command(BaseCommand):
+    help = "Generate the cached OpenAPI schema for the current code version."
+
+    def handle(self, *args, **options):
+        for schema_format in SCHEMA_RENDERERS:
+            document = get_schema_document(schema_format, rebuild=True)
+            self.stdout.write(
+                f"{schema_format}: {len(document.content)} bytes"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f"Built schema for version {code_version()}.")
+        )
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+
+from config.startup import profile_imports
+
+WORKER_BOOT = "from config.wsgi import create_app; create_app()"
+LAZY_BOOT = "import config.wsgi"
+
+
+class Command(BaseCommand):
+    help = "Report the import time per module of booting a worker."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=30,
+            help="Number of modules to list.",
+        )
+        parser.add_argument(
+            "--sort",
+            choices=("self", "cumulative"),
+            default="cumulative",
+            help="Rank modules by their own or their cumulative time.",
+        )
+        parser.add_argument(
+            "--no-warm-up",
+            action="store_true",
+            help="Only build the application, as a non-preloaded worker.",
+        )
+
+    def handle(self, *args, **options):
+        code = LAZY_BOOT if options["no_warm_up"] else WORKER_BOOT
+        elapsed, imports = profile_imports(code)
+
+        key = "self_us" if options["sort"] == "self" else "cumulative_us"
+        ranked = sorted(imports, key=lambda i: getattr(i, key), reverse=True)
+        self.stdout.write(f"{'self ms':>9} {'total ms':>9}  module")
+        for module in ranked[: options["limit"]]:
+            self.stdout.write(
+                f"{module.self_us / 1000:9.1f} "
+                f"{module.cumulative_us / 1000:9.1f}  {module.name}"
+            )
+        imported = sum(module.self_us for module in imports) / 1000
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Booted in {elapsed * 1000:.0f} ms, {len(imports)} modules "
+                f"imported in {imported:.0f} ms."
+            )
+        )
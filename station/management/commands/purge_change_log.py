@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+from django.utils import timezone
+
+from station.models import ChangeLogEntry
+
+
+class Command(BaseCommand):
+    help = "Delete change log entries older than CHANGE_LOG_RETENTION."
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - settings.CHANGE_LOG_RETENTION
+        # The newest entry stays, so older tokens are still detected as
+        # expired once everything before it is gone.
+        latest = ChangeLogEntry.objects.aggregate(latest=Max("id"))["latest"]
+        deleted, _ = ChangeLogEntry.objects.filter(
+            created_at__lt=cutoff, id__lt=latest or 0
+        ).delete()
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {deleted} old change log entries.")
+        )
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from station.projection import rebuild_entries
+
+
+class Command(BaseCommand):
+    help = "Recreate the journey search table from journeys and tickets."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=2000,
+            help="Number of journeys projected per query.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rows = rebuild_entries(options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {rows} journey search entries.")
+        )
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.5 on 2026-10-19 09:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("station", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="station",
+            options={"ordering": ["name"]},
+        ),
+        migrations.AddField(
+            model_name="train",
+            name="image_hash",
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="train",
+            name="image_variants",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.5 on 2026-10-19 09:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("station", "0002_train_image_variants"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="journey",
+            index=models.Index(
+                fields=["departure_time"],
+                name="station_jou_departu_f114b4_idx",
+            ),
+        ),
+    ]
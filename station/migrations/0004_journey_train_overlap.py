@@ -0,0 +1,76 @@
+# Generated by Django 5.2.5 on 2026-10-19 09:55
+
+from django.db import migrations, models
+
+OVERLAPPING_JOURNEYS = """
+    SELECT journey.train_id, journey.id, other.id
+    FROM station_journey AS journey
+    JOIN station_journey AS other
+        ON other.train_id = journey.train_id
+        AND other.id > journey.id
+        AND tstzrange(other.departure_time, other.arrival_time)
+            && tstzrange(journey.departure_time, journey.arrival_time)
+    ORDER BY journey.train_id, journey.id, other.id
+    LIMIT 20
+"""
+
+
+def check_overlapping_journeys(schema_editor):
+    """
+    Stop with a list of the journeys the constraint would reject, rather
+    than a bare constraint violation, so they can be rescheduled first.
+    """
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(OVERLAPPING_JOURNEYS)
+        overlaps = cursor.fetchall()
+    if overlaps:
+        pairs = "\n".join(
+            f"  train {train_id}: journeys {journey_id} and {other_id}"
+            for train_id, journey_id, other_id in overlaps
+        )
+        raise RuntimeError(
+            "Journeys of the same train overlap, so the train overlap "
+            "constraint cannot be added. Reschedule or delete them and "
+            f"migrate again. Overlapping journeys (at most 20):\n{pairs}"
+        )
+
+
+def add_train_exclusion_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    check_overlapping_journeys(schema_editor)
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    schema_editor.execute(
+        "ALTER TABLE station_journey "
+        "ADD CONSTRAINT station_journey_train_no_overlap EXCLUDE USING gist "
+        "(train_id WITH =, tstzrange(departure_time, arrival_time) WITH &&)"
+    )
+
+
+def remove_train_exclusion_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        "ALTER TABLE station_journey "
+        "DROP CONSTRAINT IF EXISTS station_journey_train_no_overlap"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("station", "0003_journey_departure_time_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="journey",
+            index=models.Index(
+                fields=["train", "departure_time"],
+                name="station_jou_train_i_13d639_idx",
+            ),
+        ),
+        migrations.RunPython(
+            add_train_exclusion_constraint, remove_train_exclusion_constraint
+        ),
+    ]
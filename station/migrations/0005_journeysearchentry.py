@@ -0,0 +1,57 @@
+# Generated by Django 5.2.5 on 2026-10-19 09:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("station", "0004_journey_train_overlap"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JourneySearchEntry",
+            fields=[
+                (
+                    "journey",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="search_entry",
+                        serialize=False,
+                        to="station.journey",
+                    ),
+                ),
+                ("source_id", models.BigIntegerField()),
+                ("source_name", models.CharField(max_length=255)),
+                ("destination_id", models.BigIntegerField()),
+                ("destination_name", models.CharField(max_length=255)),
+                ("departure_date", models.DateField()),
+                ("departure_time", models.DateTimeField()),
+                ("arrival_time", models.DateTimeField()),
+                ("train_name", models.CharField(max_length=255)),
+                ("capacity", models.PositiveIntegerField()),
+                ("tickets_available", models.IntegerField()),
+            ],
+            options={
+                "verbose_name_plural": "journey search entries",
+                "ordering": ["departure_time", "journey"],
+                "indexes": [
+                    models.Index(
+                        fields=[
+                            "source_id",
+                            "destination_id",
+                            "departure_date",
+                        ],
+                        name="station_jou_source__9d9ca2_idx",
+                    ),
+                    models.Index(
+                        fields=["departure_date", "departure_time"],
+                        name="station_jou_departu_a61ace_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
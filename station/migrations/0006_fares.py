@@ -0,0 +1,152 @@
+# Generated by Django 5.2.5 on 2026-10-19 10:01
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_fare_keys(apps, schema_editor):
+    Journey = apps.get_model("station", "Journey")
+    JourneySearchEntry = apps.get_model("station", "JourneySearchEntry")
+    journey = Journey.objects.filter(pk=OuterRef("journey_id"))
+    JourneySearchEntry.objects.update(
+        train_type_id=Subquery(journey.values("train__train_type_id")[:1]),
+        distance=Subquery(journey.values("route__distance")[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("station", "0005_journeysearchentry"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DemandMultiplier",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "min_fill_ratio",
+                    models.DecimalField(
+                        decimal_places=3,
+                        max_digits=4,
+                        unique=True,
+                        validators=[
+                            django.core.validators.MinValueValidator(0),
+                            django.core.validators.MaxValueValidator(1),
+                        ],
+                    ),
+                ),
+                (
+                    "multiplier",
+                    models.DecimalField(
+                        decimal_places=2,
+                        max_digits=4,
+                        validators=[
+                            django.core.validators.MinValueValidator(0)
+                        ],
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["min_fill_ratio"],
+            },
+        ),
+        migrations.AddField(
+            model_name="journeysearchentry",
+            name="base_fare",
+            field=models.DecimalField(
+                decimal_places=2, max_digits=8, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="journeysearchentry",
+            name="distance",
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name="journeysearchentry",
+            name="fare",
+            field=models.DecimalField(
+                decimal_places=2, max_digits=8, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="journeysearchentry",
+            name="train_type_id",
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.CreateModel(
+            name="Tariff",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "base_fare",
+                    models.DecimalField(decimal_places=2, max_digits=8),
+                ),
+                (
+                    "train_type",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="tariff",
+                        to="station.traintype",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="DistanceBand",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "up_to_km",
+                    models.PositiveIntegerField(blank=True, null=True),
+                ),
+                (
+                    "rate_per_km",
+                    models.DecimalField(decimal_places=3, max_digits=6),
+                ),
+                (
+                    "tariff",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="distance_bands",
+                        to="station.tariff",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": [
+                    models.OrderBy(models.F("up_to_km"), nulls_last=True)
+                ],
+                "unique_together": {("tariff", "up_to_km")},
+            },
+        ),
+        migrations.RunPython(fill_fare_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.5 on 2026-10-19 10:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("station", "0006_fares"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StationDistanceMatrix",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("version", models.PositiveIntegerField(default=0)),
+                ("station_ids", models.BinaryField(default=bytes)),
+                ("distances", models.BinaryField(default=bytes)),
+                ("next_hops", models.BinaryField(default=bytes)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.5 on 2026-10-19 10:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("station", "0007_stationdistancematrix"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChangeLogEntry",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("model", models.CharField(max_length=32)),
+                ("object_id", models.BigIntegerField()),
+                ("deleted", models.BooleanField(default=False)),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, db_index=True),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "change log entries",
+                "ordering": ["id"],
+            },
+        ),
+    ]
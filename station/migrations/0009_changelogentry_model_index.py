@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-19 10:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("station", "0008_changelogentry"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="changelogentry",
+            index=models.Index(
+                fields=["model", "id"], name="station_cha_model_8d340d_idx"
+            ),
+        ),
+    ]
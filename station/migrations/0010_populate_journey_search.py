@@ -0,0 +1,23 @@
+from django.db import migrations
+
+
+def populate_journey_search(apps, schema_editor):
+    # The projection is built by the same code as the
+    # rebuild_journey_search command, so it matches what the app writes.
+    from station.projection import rebuild_entries
+
+    rebuild_entries()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("order", "0008_ticket_price"),
+        ("station", "0009_changelogentry_model_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            populate_journey_search, migrations.RunPython.noop
+        ),
+    ]
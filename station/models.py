@@ -2,6 +2,7 @@ import os
 import uuid
 
 from django.core.exceptions import ValidationError
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from django.utils.text import slugify
 
@@ -59,6 +60,8 @@ class Train(models.Model):
     image = models.ImageField(
         null=True, blank=True, upload_to=train_image_file_path
     )
+    image_hash = models.CharField(max_length=64, blank=True, db_index=True)
+    image_variants = models.JSONField(default=dict, blank=True)
 
     @property
     def capacity(self) -> int:
@@ -91,9 +94,152 @@ class Journey(models.Model):
     departure_time = models.DateTimeField()
     arrival_time = models.DateTimeField()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["departure_time"]),
+            models.Index(fields=["train", "departure_time"]),
+        ]
+
     def clean(self) -> None:
         if self.arrival_time <= self.departure_time:
             raise ValidationError("Arrival time must be after departure time.")
 
     def __str__(self) -> str:
         return f"{self.route} ({self.departure_time})"
+
+
+class JourneySearchEntry(models.Model):
+    """
+    Denormalized copy of a journey with everything the journey search
+    returns, so searches read a single table. Maintained by
+    station.projection.
+    """
+
+    journey = models.OneToOneField(
+        Journey,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="search_entry",
+    )
+    source_id = models.BigIntegerField()
+    source_name = models.CharField(max_length=255)
+    destination_id = models.BigIntegerField()
+    destination_name = models.CharField(max_length=255)
+    departure_date = models.DateField()
+    departure_time = models.DateTimeField()
+    arrival_time = models.DateTimeField()
+    train_name = models.CharField(max_length=255)
+    train_type_id = models.BigIntegerField(null=True)
+    distance = models.PositiveIntegerField(null=True)
+    capacity = models.PositiveIntegerField()
+    tickets_available = models.IntegerField()
+    # Fare of the train type's tariff over the route distance, and that
+    # fare with the demand multiplier of the current fill ratio. Empty
+    # when the train type has no tariff. Maintained by station.fares.
+    base_fare = models.DecimalField(max_digits=8, decimal_places=2, null=True)
+    fare = models.DecimalField(max_digits=8, decimal_places=2, null=True)
+
+    class Meta:
+        ordering = ["departure_time", "journey"]
+        indexes = [
+            models.Index(
+                fields=["source_id", "destination_id", "departure_date"]
+            ),
+            models.Index(fields=["departure_date", "departure_time"]),
+        ]
+        verbose_name_plural = "journey search entries"
+
+    def __str__(self) -> str:
+        return f"{self.source_name} -> {self.destination_name}"
+
+
+class Tariff(models.Model):
+    """Fare of a train type: a base fare plus per-km distance bands."""
+
+    train_type = models.OneToOneField(
+        TrainType, on_delete=models.CASCADE, related_name="tariff"
+    )
+    base_fare = models.DecimalField(max_digits=8, decimal_places=2)
+
+    def __str__(self) -> str:
+        return f"Tariff of {self.train_type}"
+
+
+class DistanceBand(models.Model):
+    """
+    Rate per km charged from the end of the previous band up to
+    `up_to_km`. The band without `up_to_km` covers longer distances.
+    """
+
+    tariff = models.ForeignKey(
+        Tariff, on_delete=models.CASCADE, related_name="distance_bands"
+    )
+    up_to_km = models.PositiveIntegerField(null=True, blank=True)
+    rate_per_km = models.DecimalField(max_digits=6, decimal_places=3)
+
+    class Meta:
+        ordering = [models.F("up_to_km").asc(nulls_last=True)]
+        unique_together = ("tariff", "up_to_km")
+
+    def __str__(self) -> str:
+        return f"{self.rate_per_km}/km up to {self.up_to_km or 'any'} km"
+
+
+class DemandMultiplier(models.Model):
+    """Fare multiplier of journeys at least `min_fill_ratio` full."""
+
+    min_fill_ratio = models.DecimalField(
+        max_digits=4,
+        decimal_places=3,
+        unique=True,
+        validators=[MinValueValidator(0), MaxValueValidator(1)],
+    )
+    multiplier = models.DecimalField(
+        max_digits=4, decimal_places=2, validators=[MinValueValidator(0)]
+    )
+
+    class Meta:
+        ordering = ["min_fill_ratio"]
+
+    def __str__(self) -> str:
+        return f"x{self.multiplier} from {self.min_fill_ratio:.0%} full"
+
+
+class StationDistanceMatrix(models.Model):
+    """
+    Shortest network distances and next hops between all stations, as
+    packed arrays indexed by station position. A single row, kept up to
+    date by station.network.
+    """
+
+    version = models.PositiveIntegerField(default=0)
+    station_ids = models.BinaryField(default=bytes)
+    distances = models.BinaryField(default=bytes)
+    next_hops = models.BinaryField(default=bytes)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"Distance matrix v{self.version}"
+
+
+class ChangeLogEntry(models.Model):
+    """
+    One insert, update or delete of a catalogue object. The id is the
+    change token of the sync feed, see station.changes.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    model = models.CharField(max_length=32)
+    object_id = models.BigIntegerField()
+    deleted = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ["id"]
+        verbose_name_plural = "change log entries"
+        # Latest change per model, see station.autocomplete.
+        indexes = [models.Index(fields=["model", "id"])]
+
+    def __str__(self) -> str:
+        action = "deleted" if self.deleted else "saved"
+        return f"{self.model} {self.object_id} {action}"
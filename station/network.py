@@ -0,0 +1,215 @@
+"""
+All-pairs shortest distances over the route network.
+
+Routes are directed edges. The matrix is computed with Dijkstra from
+every station and stored in StationDistanceMatrix as packed arrays of
+n * n distances and first hops, row-major by the position of a station
+in `station_ids`. A new or shorter route only relaxes the paths through
+it, in O(n²); other route changes recompute the matrix. Each process
+keeps the decoded arrays and reloads them when the stored version
+changes, so a lookup costs one small query and an array access.
+
+Arrays are stored in native byte order; all servers share one platform.
+"""
+
+import heapq
+import threading
+from array import array
+from typing import Iterable
+
+from django.db import transaction
+from django.db.models import F, Min
+
+from .models import Route, Station, StationDistanceMatrix
+
+UNREACHABLE = 0xFFFFFFFF
+NO_HOP = -1
+MATRIX_PK = 1
+
+Edge = tuple[int, int]
+
+
+class DistanceMatrix:
+    def __init__(
+        self,
+        station_ids: array,
+        distances: array,
+        next_hops: array,
+        version: int = 0,
+    ) -> None:
+        self.station_ids = station_ids
+        self.distances = distances
+        self.next_hops = next_hops
+        self.version = version
+        self.index = {pk: i for i, pk in enumerate(station_ids)}
+
+    @property
+    def size(self) -> int:
+        return len(self.station_ids)
+
+    def distance(self, source: int, destination: int) -> int | None:
+        i, j = self.index.get(source), self.index.get(destination)
+        if i is None or j is None:
+            return None
+        distance = self.distances[i * self.size + j]
+        return None if distance == UNREACHABLE else distance
+
+    def path(self, source: int, destination: int) -> list[int] | None:
+        """Return the station ids of a shortest path, both ends included."""
+        if self.distance(source, destination) is None:
+            return None
+        i, j = self.index[source], self.index[destination]
+        path = [source]
+        while i != j:
+            i = self.next_hops[i * self.size + j]
+            path.append(self.station_ids[i])
+        return path
+
+    def relax(self, source: int, destination: int, weight: int) -> bool:
+        """
+        Shorten the paths that improve by going through a new or shorter
+        edge. Returns whether anything changed.
+        """
+        n, u, v = self.size, self.index[source], self.index[destination]
+        distances, next_hops = self.distances, self.next_hops
+        if distances[u * n + v] <= weight:
+            return False
+
+        sources = [i for i in range(n) if distances[i * n + u] != UNREACHABLE]
+        targets = [
+            (j, distances[v * n + j])
+            for j in range(n)
+            if distances[v * n + j] != UNREACHABLE
+        ]
+        for i in sources:
+            row = i * n
+            through = distances[row + u] + weight
+            hop = v if i == u else next_hops[row + u]
+            for j, rest in targets:
+                if through + rest < distances[row + j]:
+                    distances[row + j] = through + rest
+                    next_hops[row + j] = hop
+        return True
+
+
+def compute(station_ids: list[int], edges: dict[Edge, int]) -> DistanceMatrix:
+    """Run Dijkstra from every station."""
+    n = len(station_ids)
+    index = {pk: i for i, pk in enumerate(station_ids)}
+    adjacency = [[] for _ in range(n)]
+    for (source, destination), weight in edges.items():
+        adjacency[index[source]].append((index[destination], weight))
+
+    distances = array("I", [UNREACHABLE]) * (n * n)
+    next_hops = array("i", [NO_HOP]) * (n * n)
+    for origin in range(n):
+        row = origin * n
+        distances[row + origin] = 0
+        heap = [(0, origin, NO_HOP)]
+        while heap:
+            distance, node, hop = heapq.heappop(heap)
+            if distance > distances[row + node]:
+                continue
+            for neighbour, weight in adjacency[node]:
+                candidate = distance + weight
+                if candidate < distances[row + neighbour]:
+                    first = neighbour if node == origin else hop
+                    distances[row + neighbour] = candidate
+                    next_hops[row + neighbour] = first
+                    heapq.heappush(heap, (candidate, neighbour, first))
+    return DistanceMatrix(array("q", station_ids), distances, next_hops)
+
+
+def edge_weights(edges: Iterable[Edge] | None = None) -> dict[Edge, int]:
+    """Return the shortest route of each (source, destination) pair."""
+    routes = Route.objects.exclude(source_id=F("destination_id"))
+    if edges is not None:
+        edges = set(edges)
+        routes = routes.filter(
+            source_id__in={source for source, _ in edges},
+            destination_id__in={destination for _, destination in edges},
+        )
+    rows = routes.values_list("source_id", "destination_id").annotate(
+        weight=Min("distance")
+    )
+    return {
+        (source, destination): weight
+        for source, destination, weight in rows.order_by()
+        if edges is None or (source, destination) in edges
+    }
+
+
+def build() -> DistanceMatrix:
+    station_ids = list(
+        Station.objects.order_by("pk").values_list("pk", flat=True)
+    )
+    return compute(station_ids, edge_weights())
+
+
+def decode(row: StationDistanceMatrix) -> DistanceMatrix:
+    station_ids, distances, next_hops = array("q"), array("I"), array("i")
+    station_ids.frombytes(row.station_ids)
+    distances.frombytes(row.distances)
+    next_hops.frombytes(row.next_hops)
+    return DistanceMatrix(station_ids, distances, next_hops, row.version)
+
+
+def store(row: StationDistanceMatrix, matrix: DistanceMatrix) -> None:
+    row.station_ids = matrix.station_ids.tobytes()
+    row.distances = matrix.distances.tobytes()
+    row.next_hops = matrix.next_hops.tobytes()
+    row.version += 1
+    row.save()
+    matrix.version = row.version
+
+
+@transaction.atomic
+def update_distances(
+    edges: Iterable[Edge] = (), rebuild: bool = False
+) -> DistanceMatrix:
+    """
+    Apply new or shortened routes between the given stations, or
+    recompute the whole matrix.
+    """
+    matrices = StationDistanceMatrix.objects.select_for_update()
+    row, created = matrices.get_or_create(pk=MATRIX_PK)
+    edges = set(edges)
+    matrix = None if created or rebuild else decode(row)
+    if matrix is None or any(
+        source not in matrix.index or destination not in matrix.index
+        for source, destination in edges
+    ):
+        matrix = build()
+    else:
+        changed = [
+            matrix.relax(source, destination, weight)
+            for (source, destination), weight in edge_weights(edges).items()
+        ]
+        if not any(changed):
+            return matrix
+    store(row, matrix)
+    return matrix
+
+
+_matrix: DistanceMatrix | None = None
+_matrix_key = None
+_lock = threading.Lock()
+
+
+def get_matrix() -> DistanceMatrix | None:
+    """Return the stored matrix, decoded once per version and process."""
+    global _matrix, _matrix_key
+    key = (
+        StationDistanceMatrix.objects.filter(pk=MATRIX_PK)
+        .values_list("version", "updated_at")
+        .first()
+    )
+    if key is None:
+        return None
+    if key != _matrix_key:
+        with _lock:
+            if key != _matrix_key:
+                row = StationDistanceMatrix.objects.get(pk=MATRIX_PK)
+                _matrix = decode(row)
+                _matrix_key = (row.version, row.updated_at)
+    return _matrix
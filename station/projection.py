@@ -0,0 +1,125 @@
+"""
+Maintenance of the JourneySearchEntry projection.
+
+Entries are rebuilt from the normalized tables when a journey changes,
+patched with set-based updates when a station, route or train changes,
+and their seat counters are adjusted when tickets are written.
+"""
+
+from django.db.models import Count, F, QuerySet
+from django.utils import timezone
+
+from . import fares
+from .models import Journey, JourneySearchEntry, Route, Station, Train
+
+ENTRY_FIELDS = [
+    "source_id",
+    "source_name",
+    "destination_id",
+    "destination_name",
+    "departure_date",
+    "departure_time",
+    "arrival_time",
+    "train_name",
+    "train_type_id",
+    "distance",
+    "capacity",
+    "tickets_available",
+]
+
+
+def build_entry(journey: Journey) -> JourneySearchEntry:
+    route, train = journey.route, journey.train
+    return JourneySearchEntry(
+        journey_id=journey.pk,
+        source_id=route.source_id,
+        source_name=route.source.name,
+        destination_id=route.destination_id,
+        destination_name=route.destination.name,
+        departure_date=timezone.localdate(journey.departure_time),
+        departure_time=journey.departure_time,
+        arrival_time=journey.arrival_time,
+        train_name=train.name,
+        train_type_id=train.train_type_id,
+        distance=route.distance,
+        capacity=train.capacity,
+        tickets_available=train.capacity - journey.tickets_taken,
+    )
+
+
+def refresh_entries(journeys: QuerySet) -> int:
+    """Recompute the entries of the given journeys."""
+    journeys = journeys.select_related(
+        "route__source", "route__destination", "train"
+    ).annotate(tickets_taken=Count("tickets"))
+    entries = JourneySearchEntry.objects.bulk_create(
+        [build_entry(journey) for journey in journeys],
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=["journey"],
+        update_fields=ENTRY_FIELDS,
+    )
+    fares.refresh_fares(
+        JourneySearchEntry.objects.filter(
+            journey_id__in=[entry.journey_id for entry in entries]
+        )
+    )
+    return len(entries)
+
+
+def rebuild_entries(batch_size: int = 2000) -> int:
+    """Recreate every entry, walking journeys in primary key batches."""
+    JourneySearchEntry.objects.all().delete()
+    total, last_pk = 0, 0
+    while True:
+        batch = list(
+            Journey.objects.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not batch:
+            return total
+        total += refresh_entries(Journey.objects.filter(pk__in=batch))
+        last_pk = batch[-1]
+
+
+def station_changed(station: Station) -> None:
+    JourneySearchEntry.objects.filter(source_id=station.pk).update(
+        source_name=station.name
+    )
+    JourneySearchEntry.objects.filter(destination_id=station.pk).update(
+        destination_name=station.name
+    )
+
+
+def route_changed(route: Route) -> None:
+    refresh_entries(Journey.objects.filter(route=route))
+
+
+def train_changed(train: Train) -> None:
+    # SET expressions read the old row, so the seat count follows the
+    # capacity change without recounting tickets.
+    entries = JourneySearchEntry.objects.filter(journey__train=train)
+    entries.update(
+        train_name=train.name,
+        train_type_id=train.train_type_id,
+        tickets_available=(
+            F("tickets_available") - F("capacity") + train.capacity
+        ),
+        capacity=train.capacity,
+    )
+    fares.refresh_fares(entries)
+
+
+def adjust_tickets_available(changes: dict[int, int]) -> None:
+    """Apply seat count deltas, keyed by journey id, and reprice."""
+    multipliers = fares.demand_multipliers()
+    for journey_id, delta in changes.items():
+        if delta:
+            tickets_available = F("tickets_available") + delta
+            JourneySearchEntry.objects.filter(journey_id=journey_id).update(
+                tickets_available=tickets_available,
+                fare=fares.fare_expression(
+                    multipliers, tickets_available=tickets_available
+                ),
+            )
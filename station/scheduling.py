@@ -0,0 +1,162 @@
+"""
+Detection of trains and crew members scheduled on overlapping journeys.
+
+Existing journeys are only loaded inside the time window of the checked
+journeys (extended by MAX_JOURNEY_DURATION), so the cost does not grow
+with the history of a train or crew member. Overlaps are then found with
+an interval tree per train and per crew member, which also catches
+conflicts between journeys of the same bulk import.
+"""
+
+import datetime
+from collections import defaultdict
+from typing import Any, Hashable, Iterable
+
+from django.conf import settings
+
+from .models import Journey
+
+Interval = tuple[datetime.datetime, datetime.datetime, Hashable]
+
+
+class IntervalTree:
+    """
+    Static interval tree over half-open [start, end) intervals.
+
+    Intervals are kept sorted by start in an implicit balanced binary
+    tree, each node storing the largest end of its subtree, so a query
+    only visits subtrees that can contain an overlap.
+    """
+
+    def __init__(self, intervals: Iterable[Interval]) -> None:
+        self._items = sorted(intervals, key=lambda item: item[:2])
+        self._max_end = [None] * len(self._items)
+        if self._items:
+            self._build(0, len(self._items) - 1)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def _build(self, low: int, high: int) -> datetime.datetime:
+        middle = (low + high) // 2
+        max_end = self._items[middle][1]
+        if low < middle:
+            max_end = max(max_end, self._build(low, middle - 1))
+        if middle < high:
+            max_end = max(max_end, self._build(middle + 1, high))
+        self._max_end[middle] = max_end
+        return max_end
+
+    def overlapping(
+        self, start: datetime.datetime, end: datetime.datetime
+    ) -> list[Hashable]:
+        """Return the payloads of intervals overlapping [start, end)."""
+        found = []
+        stack = [(0, len(self._items) - 1)]
+        while stack:
+            low, high = stack.pop()
+            if low > high:
+                continue
+            middle = (low + high) // 2
+            if self._max_end[middle] <= start:
+                continue
+
+            item_start, item_end, payload = self._items[middle]
+            if item_start < end and item_end > start:
+                found.append(payload)
+            stack.append((low, middle - 1))
+            if item_start < end:
+                stack.append((middle + 1, high))
+        return found
+
+
+def describe(journey: tuple[Any, ...]) -> str:
+    journey_id, start, end = journey
+    return f"journey #{journey_id} ({start:%Y-%m-%d %H:%M} - {end:%H:%M})"
+
+
+def find_conflicts(
+    candidates: list[dict[str, Any]],
+) -> dict[int, dict[str, list[str]]]:
+    """
+    Check journeys about to be saved against each other and against
+    stored journeys. Each candidate holds `train`, `crew`,
+    `departure_time`, `arrival_time` and the `id` of the journey being
+    updated, if any. Returns errors keyed by candidate index.
+    """
+    if not candidates:
+        return {}
+
+    updated_ids = [c["id"] for c in candidates if c.get("id")]
+    window_start = min(c["departure_time"] for c in candidates)
+    window_end = max(c["arrival_time"] for c in candidates)
+    nearby = Journey.objects.filter(
+        departure_time__gt=window_start - settings.MAX_JOURNEY_DURATION,
+        departure_time__lt=window_end,
+        arrival_time__gt=window_start,
+    ).exclude(pk__in=updated_ids)
+
+    train_intervals = defaultdict(list)
+    crew_intervals = defaultdict(list)
+    train_ids = {c["train"].pk for c in candidates}
+    crew_ids = {member.pk for c in candidates for member in c["crew"]}
+
+    for journey_id, train_id, start, end in nearby.filter(
+        train_id__in=train_ids
+    ).values_list("id", "train_id", "departure_time", "arrival_time"):
+        train_intervals[train_id].append(
+            (start, end, ("stored", (journey_id, start, end)))
+        )
+
+    crew_rows = Journey.crew.through.objects.filter(
+        crew_id__in=crew_ids, journey__in=nearby
+    ).values_list(
+        "crew_id",
+        "journey_id",
+        "journey__departure_time",
+        "journey__arrival_time",
+    )
+    for crew_id, journey_id, start, end in crew_rows:
+        crew_intervals[crew_id].append(
+            (start, end, ("stored", (journey_id, start, end)))
+        )
+
+    for index, candidate in enumerate(candidates):
+        interval = (
+            candidate["departure_time"],
+            candidate["arrival_time"],
+            ("new", index),
+        )
+        train_intervals[candidate["train"].pk].append(interval)
+        for member in candidate["crew"]:
+            crew_intervals[member.pk].append(interval)
+
+    train_trees = {
+        key: IntervalTree(value) for key, value in train_intervals.items()
+    }
+    crew_trees = {
+        key: IntervalTree(value) for key, value in crew_intervals.items()
+    }
+
+    errors = defaultdict(lambda: defaultdict(list))
+    for index, candidate in enumerate(candidates):
+        start, end = candidate["departure_time"], candidate["arrival_time"]
+        train = candidate["train"]
+        for kind, other in train_trees[train.pk].overlapping(start, end):
+            if (kind, other) == ("new", index):
+                continue
+            where = describe(other) if kind == "stored" else f"item {other}"
+            errors[index]["train"].append(
+                f"Train {train.name} is already scheduled on {where}."
+            )
+        for member in candidate["crew"]:
+            for kind, other in crew_trees[member.pk].overlapping(start, end):
+                if (kind, other) == ("new", index):
+                    continue
+                where = (
+                    describe(other) if kind == "stored" else f"item {other}"
+                )
+                errors[index]["crew"].append(
+                    f"{member.full_name} is already assigned to {where}."
+                )
+    return {index: dict(fields) for index, fields in errors.items()}
@@ -1,30 +1,81 @@
-from typing import Any
+from contextlib import contextmanager
+from typing import Any, Iterator
 
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
-from .models import Station, TrainType, Crew, Route, Train, Journey
-
-
-class StationSerializer(serializers.ModelSerializer):
+from config.fieldsets import SparseFieldsetMixin
+from . import images
+from .scheduling import find_conflicts
+from .models import (
+    Station,
+    TrainType,
+    Crew,
+    Route,
+    Train,
+    Journey,
+    JourneySearchEntry,
+)
+
+
+@extend_schema_field(
+    {
+        "type": "object",
+        "additionalProperties": {"type": "string", "format": "uri"},
+        "example": {"thumbnail": "http://example.com/media/abc-thumbnail.jpg"},
+    }
+)
+class ImageVariantsField(serializers.Field):
+    """Render stored image variant paths as absolute URLs."""
+
+    def __init__(self, **kwargs: Any) -> None:
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value: dict[str, str]) -> dict[str, str]:
+        storage = Train._meta.get_field("image").storage
+        request = self.context.get("request")
+        urls = {}
+        for name, path in value.items():
+            url = storage.url(path)
+            urls[name] = request.build_absolute_uri(url) if request else url
+        return urls
+
+
+class StationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Station
         fields = ("id", "name", "latitude", "longitude")
 
 
-class TrainTypeSerializer(serializers.ModelSerializer):
+class StationAutocompleteSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+
+
+class StationDistanceSerializer(serializers.Serializer):
+    source = serializers.IntegerField()
+    destination = serializers.IntegerField()
+    distance = serializers.IntegerField()
+    path = serializers.ListField(child=serializers.IntegerField())
+
+
+class TrainTypeSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = TrainType
         fields = ("id", "name")
 
 
-class CrewSerializer(serializers.ModelSerializer):
+class CrewSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Crew
         fields = ("id", "first_name", "last_name", "full_name")
         read_only_fields = ("full_name",)
 
 
-class RouteSerializer(serializers.ModelSerializer):
+class RouteSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Route
         fields = ("id", "source", "destination", "distance")
@@ -41,8 +92,16 @@ class RouteListSerializer(RouteSerializer):
     source = StationSerializer(many=False, read_only=True)
     destination = StationSerializer(many=False, read_only=True)
 
+    class Meta(RouteSerializer.Meta):
+        collapsed_fields = {
+            "source": serializers.PrimaryKeyRelatedField(read_only=True),
+            "destination": serializers.PrimaryKeyRelatedField(read_only=True),
+        }
+
+
+class TrainSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    image_variants = ImageVariantsField()
 
-class TrainSerializer(serializers.ModelSerializer):
     class Meta:
         model = Train
         fields = (
@@ -53,8 +112,11 @@ class TrainSerializer(serializers.ModelSerializer):
             "train_type",
             "capacity",
             "image",
+            "image_variants",
         )
-        read_only_fields = ("capacity",)
+        # Images are replaced through upload_image, which also tracks
+        # their hash and variants.
+        read_only_fields = ("capacity", "image")
 
     def validate(self, data: dict[str, Any]) -> dict[str, Any]:
         for attr in ["cargo_num", "places_in_cargo"]:
@@ -80,17 +142,53 @@ class TrainListSerializer(TrainSerializer):
             "capacity",
             "train_type_name",
             "image",
+            "image_variants",
         )
 
 
 class TrainDetailSerializer(TrainSerializer):
     train_type = TrainTypeSerializer(many=False, read_only=True)
 
+    class Meta(TrainSerializer.Meta):
+        collapsed_fields = {
+            "train_type": serializers.PrimaryKeyRelatedField(read_only=True),
+        }
+
 
 class TrainImageSerializer(serializers.ModelSerializer):
+    image_variants = ImageVariantsField()
+
     class Meta:
         model = Train
-        fields = ("id", "image")
+        fields = ("id", "image", "image_variants")
+
+    def update(self, instance: Train, validated_data: dict[str, Any]) -> Train:
+        image = validated_data.get("image")
+        if not image:
+            return super().update(instance, validated_data)
+
+        digest = images.content_hash(image)
+        if instance.image and digest == instance.image_hash:
+            return instance
+
+        duplicate = (
+            Train.objects.filter(image_hash=digest)
+            .exclude(image="")
+            .exclude(pk=instance.pk)
+            .first()
+        )
+        if duplicate:
+            instance.image = duplicate.image.name
+            instance.image_variants = duplicate.image_variants
+        else:
+            instance.image = image
+            instance.image_variants = {}
+        instance.image_hash = digest
+        instance.save(update_fields=["image", "image_hash", "image_variants"])
+
+        if not instance.image_variants:
+            images.schedule_train_image_processing(instance.pk)
+        return instance
 
 
 class RouteForJourneyDetailSerializer(serializers.ModelSerializer):
@@ -103,12 +201,50 @@ class RouteForJourneyDetailSerializer(serializers.ModelSerializer):
 
 
 class TrainForJourneyDetailSerializer(serializers.ModelSerializer):
+    image_variants = ImageVariantsField()
+
     class Meta:
         model = Train
-        fields = ("id", "name", "capacity", "image")
+        fields = ("id", "name", "capacity", "image", "image_variants")
+
+
+@contextmanager
+def rejecting_train_overlaps() -> Iterator[None]:
+    """
+    Turn a violation of the train overlap exclusion constraint, raised
+    when a concurrent request scheduled the same train in the meantime,
+    into a validation error.
+    """
+    try:
+        with transaction.atomic():
+            yield
+    except IntegrityError as error:
+        if "station_journey_train_no_overlap" not in str(error):
+            raise
+        raise serializers.ValidationError(
+            {"train": "Train is already scheduled at this time."}
+        )
 
 
-class JourneySerializer(serializers.ModelSerializer):
+class JourneyBulkSerializer(serializers.ListSerializer):
+    """Creates many journeys, checking them for overlaps in one pass."""
+
+    def validate(self, attrs: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        errors = find_conflicts(
+            [self.child.schedule_candidate(data) for data in attrs]
+        )
+        if errors:
+            raise serializers.ValidationError(
+                [errors.get(index, {}) for index in range(len(attrs))]
+            )
+        return attrs
+
+    def save(self, **kwargs: Any) -> list[Journey]:
+        with rejecting_train_overlaps():
+            return super().save(**kwargs)
+
+
+class JourneySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Journey
         fields = (
@@ -119,14 +255,48 @@ class JourneySerializer(serializers.ModelSerializer):
             "departure_time",
             "arrival_time",
         )
+        list_serializer_class = JourneyBulkSerializer
+
+    def schedule_candidate(self, data: dict[str, Any]) -> dict[str, Any]:
+        """Merge validated data with the journey being updated."""
+        instance = self.instance
+        candidate = {"id": instance.pk if instance else None}
+        for field in ("train", "departure_time", "arrival_time"):
+            candidate[field] = data.get(field, getattr(instance, field, None))
+        if "crew" in data:
+            candidate["crew"] = data["crew"]
+        else:
+            candidate["crew"] = list(instance.crew.all()) if instance else []
+        return candidate
 
     def validate(self, data: dict[str, Any]) -> dict[str, Any]:
-        if data["departure_time"] >= data["arrival_time"]:
+        candidate = self.schedule_candidate(data)
+        departure_time = candidate["departure_time"]
+        arrival_time = candidate["arrival_time"]
+        if departure_time >= arrival_time:
             raise serializers.ValidationError(
                 {"arrival_time": "Arrival time must be after departure time."}
             )
+        if arrival_time - departure_time > settings.MAX_JOURNEY_DURATION:
+            raise serializers.ValidationError(
+                {
+                    "arrival_time": (
+                        "Journey cannot last longer than "
+                        f"{settings.MAX_JOURNEY_DURATION}."
+                    )
+                }
+            )
+
+        # Bulk imports are checked together by JourneyBulkSerializer.
+        if not isinstance(self.parent, serializers.ListSerializer):
+            if errors := find_conflicts([candidate]):
+                raise serializers.ValidationError(errors[0])
         return data
 
+    def save(self, **kwargs: Any) -> Journey:
+        with rejecting_train_overlaps():
+            return super().save(**kwargs)
+
 
 class JourneyListSerializer(serializers.ModelSerializer):
     route = serializers.StringRelatedField(many=False)
@@ -149,12 +319,43 @@ class JourneyListSerializer(serializers.ModelSerializer):
         )
 
 
+class JourneySearchEntrySerializer(
+    SparseFieldsetMixin, serializers.ModelSerializer
+):
+    """JourneyListSerializer output, read from JourneySearchEntry."""
+
+    id = serializers.IntegerField(source="journey_id", read_only=True)
+    route = serializers.SerializerMethodField()
+    train_capacity = serializers.IntegerField(
+        source="capacity", read_only=True
+    )
+
+    class Meta:
+        model = JourneySearchEntry
+        fields = (
+            "id",
+            "route",
+            "train_name",
+            "train_capacity",
+            "tickets_available",
+            "fare",
+            "departure_time",
+            "arrival_time",
+        )
+
+    def get_route(self, obj: JourneySearchEntry) -> str:
+        return str(obj)
+
+
 class JourneyDetailSerializer(JourneySerializer):
     route = RouteForJourneyDetailSerializer(many=False, read_only=True)
     train = TrainForJourneyDetailSerializer(many=False, read_only=True)
     crew = serializers.StringRelatedField(many=True, read_only=True)
     taken_seats = serializers.SerializerMethodField()
     tickets_available = serializers.IntegerField(read_only=True)
+    fare = serializers.DecimalField(
+        max_digits=8, decimal_places=2, read_only=True, allow_null=True
+    )
 
     class Meta:
         model = Journey
@@ -166,11 +367,73 @@ class JourneyDetailSerializer(JourneySerializer):
             "departure_time",
             "arrival_time",
             "tickets_available",
+            "fare",
             "taken_seats",
         )
+        collapsed_fields = {
+            "route": serializers.PrimaryKeyRelatedField(read_only=True),
+            "train": serializers.PrimaryKeyRelatedField(read_only=True),
+            "crew": serializers.PrimaryKeyRelatedField(
+                many=True, read_only=True
+            ),
+        }
 
     def get_taken_seats(self, obj: Journey) -> list[dict[str, int]]:
         return [
             {"cargo": ticket.cargo, "seat": ticket.seat}
             for ticket in obj.tickets.all()
         ]
+
+
+class JourneyAvailabilityRequestSerializer(serializers.Serializer):
+    journeys = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+        max_length=settings.AVAILABILITY_MAX_JOURNEYS,
+    )
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    cargos = serializers.BooleanField(default=False)
+
+    def validate(self, data: dict[str, Any]) -> dict[str, Any]:
+        dates = [data.get("date_from"), data.get("date_to")]
+        if "journeys" in data:
+            if any(dates):
+                raise serializers.ValidationError(
+                    "Pass either journeys or a date range, not both."
+                )
+            return data
+
+        if not all(dates):
+            raise serializers.ValidationError(
+                "Pass journeys or both date_from and date_to."
+            )
+        days = (data["date_to"] - data["date_from"]).days + 1
+        if not 1 <= days <= settings.AVAILABILITY_MAX_DAYS:
+            raise serializers.ValidationError(
+                {
+                    "date_to": (
+                        "Date range must span 1 to "
+                        f"{settings.AVAILABILITY_MAX_DAYS} days."
+                    )
+                }
+            )
+        return data
+
+
+class CargoAvailabilitySerializer(serializers.Serializer):
+    cargo = serializers.IntegerField()
+    free = serializers.IntegerField()
+
+
+class JourneyAvailabilitySerializer(serializers.Serializer):
+    journey = serializers.IntegerField(source="journey_id")
+    departure_time = serializers.DateTimeField()
+    capacity = serializers.IntegerField()
+    tickets_available = serializers.IntegerField()
+    cargos = CargoAvailabilitySerializer(many=True, required=False)
+
+
+class ChangeFeedRequestSerializer(serializers.Serializer):
+    since = serializers.IntegerField(min_value=0, required=False)
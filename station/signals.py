@@ -0,0 +1,191 @@
+from typing import Any
+
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from job.registry import enqueue
+from . import autocomplete, changes, projection
+from .models import (
+    Crew,
+    DemandMultiplier,
+    DistanceBand,
+    Journey,
+    Route,
+    Station,
+    Tariff,
+    Train,
+    TrainType,
+)
+
+PROJECTED_TRAIN_FIELDS = {
+    "name",
+    "cargo_num",
+    "places_in_cargo",
+    "train_type",
+}
+
+
+@receiver(post_save, sender=Journey)
+def journey_saved(
+    sender: type[Journey], instance: Journey, **kwargs: Any
+) -> None:
+    projection.refresh_entries(Journey.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Station)
+def station_saved(
+    sender: type[Station], instance: Station, created: bool, **kwargs: Any
+) -> None:
+    if not created:
+        projection.station_changed(instance)
+
+
+@receiver([post_save, post_delete], sender=Station)
+def rebuild_station_index(sender: type[Station], **kwargs: Any) -> None:
+    autocomplete.invalidate()
+
+
+@receiver(post_save, sender=Route)
+def route_saved(
+    sender: type[Route], instance: Route, created: bool, **kwargs: Any
+) -> None:
+    if not created:
+        projection.route_changed(instance)
+
+
+@receiver(pre_save, sender=Route)
+def remember_route_edge(
+    sender: type[Route], instance: Route, **kwargs: Any
+) -> None:
+    instance._previous_edge = (
+        Route.objects.filter(pk=instance.pk)
+        .values_list("source_id", "destination_id", "distance")
+        .first()
+        if instance.pk
+        else None
+    )
+
+
+@receiver(post_save, sender=Route)
+def schedule_distance_update(
+    sender: type[Route], instance: Route, **kwargs: Any
+) -> None:
+    previous = instance._previous_edge
+    edge = (instance.source_id, instance.destination_id)
+    if previous is None or (
+        previous[:2] == edge and instance.distance < previous[2]
+    ):
+        # New and shorter routes only relax paths through them.
+        enqueue(
+            "station.update_distances",
+            {"source": edge[0], "destination": edge[1]},
+        )
+    elif previous != (*edge, instance.distance):
+        enqueue("station.update_distances", {"rebuild": True})
+
+
+@receiver(post_delete, sender=Route)
+def route_deleted(sender: type[Route], **kwargs: Any) -> None:
+    enqueue("station.update_distances", {"rebuild": True})
+
+
+@receiver(post_save, sender=Train)
+def train_saved(
+    sender: type[Train], instance: Train, created: bool, **kwargs: Any
+) -> None:
+    update_fields = kwargs.get("update_fields")
+    if update_fields and not PROJECTED_TRAIN_FIELDS & set(update_fields):
+        return
+    if not created:
+        projection.train_changed(instance)
+
+
+# Fares are recomputed by a background job. Jobs queued by one admin
+# save of a tariff and its bands run as a single batch.
+@receiver([post_save, post_delete], sender=Tariff)
+def tariff_changed(
+    sender: type[Tariff], instance: Tariff, **kwargs: Any
+) -> None:
+    enqueue("station.refresh_fares", {"train_type_id": instance.train_type_id})
+
+
+@receiver([post_save, post_delete], sender=DistanceBand)
+def distance_band_changed(
+    sender: type[DistanceBand], instance: DistanceBand, **kwargs: Any
+) -> None:
+    train_type_id = (
+        Tariff.objects.filter(pk=instance.tariff_id)
+        .values_list("train_type_id", flat=True)
+        .first()
+    )
+    enqueue("station.refresh_fares", {"train_type_id": train_type_id})
+
+
+@receiver([post_save, post_delete], sender=DemandMultiplier)
+def demand_multiplier_changed(
+    sender: type[DemandMultiplier], **kwargs: Any
+) -> None:
+    enqueue("station.refresh_fares", {})
+
+
+# Change log of the sync feed. Cascaded deletes send post_delete for
+# every collected object, so they are logged as tombstones too.
+@receiver(post_save, sender=Station)
+@receiver(post_save, sender=TrainType)
+@receiver(post_save, sender=Crew)
+@receiver(post_save, sender=Route)
+@receiver(post_save, sender=Train)
+@receiver(post_save, sender=Journey)
+def log_catalogue_save(sender: type, instance: Any, **kwargs: Any) -> None:
+    changes.log_changes(sender, [instance.pk])
+
+
+@receiver(post_delete, sender=Station)
+@receiver(post_delete, sender=TrainType)
+@receiver(post_delete, sender=Crew)
+@receiver(post_delete, sender=Route)
+@receiver(post_delete, sender=Train)
+@receiver(post_delete, sender=Journey)
+def log_catalogue_delete(sender: type, instance: Any, **kwargs: Any) -> None:
+    changes.log_changes(sender, [instance.pk], deleted=True)
+
+
+@receiver(m2m_changed, sender=Journey.crew.through)
+def log_journey_crew_change(
+    sender: type,
+    instance: Journey | Crew,
+    action: str,
+    reverse: bool,
+    pk_set: set[int] | None,
+    **kwargs: Any,
+) -> None:
+    if action == "pre_clear" and reverse:
+        # The cleared journeys are unknown once the rows are gone.
+        instance._cleared_journey_ids = list(
+            instance.journeys.values_list("pk", flat=True)
+        )
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        journey_ids = [instance.pk]
+    elif action == "post_clear":
+        journey_ids = instance._cleared_journey_ids
+    else:
+        journey_ids = pk_set
+    changes.log_changes(Journey, journey_ids)
+
+
+@receiver(pre_delete, sender=Crew)
+def log_crew_journeys(
+    sender: type[Crew], instance: Crew, **kwargs: Any
+) -> None:
+    # Deleting a crew member drops them from their journeys' crew lists.
+    changes.log_changes(
+        Journey, instance.journeys.values_list("pk", flat=True)
+    )
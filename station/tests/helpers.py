@@ -0,0 +1,6 @@
+import datetime
+
+
+def at(hour, day=10):
+    """Return the given hour of a day of October 2025, in UTC."""
+    return datetime.datetime(2025, 10, day, hour, tzinfo=datetime.UTC)
@@ -0,0 +1,136 @@
+import datetime
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from order.models import Order
+from station.autocomplete import get_index, normalize
+from station.changes import log_changes
+from station.models import Journey, Route, Station, Train, TrainType
+
+AUTOCOMPLETE_URL = reverse("station:station-autocomplete")
+JOURNEY_URL = reverse("station:journey-list")
+
+
+class StationAutocompleteTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.stations = {
+            name: Station.objects.create(name=name, latitude=1, longitude=1)
+            for name in (
+                "Kyiv Central",
+                "Kyivska",
+                "Lviv",
+                "Zürich HB",
+                "Bila Tserkva",
+            )
+        }
+        self.train = Train.objects.create(
+            name="Express",
+            cargo_num=1,
+            places_in_cargo=10,
+            train_type=TrainType.objects.create(name="Type"),
+        )
+
+    def sell_tickets(self, source, destination, count):
+        departure = timezone.now() + datetime.timedelta(days=1)
+        journey = Journey.objects.create(
+            route=Route.objects.create(
+                source=self.stations[source],
+                destination=self.stations[destination],
+                distance=100,
+            ),
+            train=self.train,
+            departure_time=departure,
+            arrival_time=departure + datetime.timedelta(hours=1),
+        )
+        order = Order.objects.create(
+            user=get_user_model().objects.create_user(
+                f"{source}{destination}@example.com", "password123"
+            )
+        )
+        for seat in range(1, count + 1):
+            order.tickets.create(cargo=1, seat=seat, journey=journey)
+        return journey
+
+    def suggest(self, query, **params):
+        res = self.client.get(AUTOCOMPLETE_URL, {"q": query, **params})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [station["name"] for station in res.data]
+
+    def test_normalize_ignores_case_and_diacritics(self):
+        """Test that names are folded to plain lowercase words"""
+        self.assertEqual(normalize("  Zürich-HB "), "zurich hb")
+        self.assertEqual(normalize("Kyïv"), "kyiv")
+
+    @override_settings(AUTOCOMPLETE_MAX_AGE=0)
+    def test_prefixes_rank_by_popularity(self):
+        """Test that equally good matches are ranked by tickets sold"""
+        self.assertEqual(self.suggest("kyi"), ["Kyiv Central", "Kyivska"])
+
+        self.sell_tickets("Kyivska", "Lviv", 3)
+
+        self.assertEqual(self.suggest("KYI"), ["Kyivska", "Kyiv Central"])
+        self.assertEqual(self.suggest("kyi", limit=1), ["Kyivska"])
+
+    def test_word_prefix_substring_and_typo_matches(self):
+        """Test that name prefixes come before weaker matches"""
+        self.assertEqual(self.suggest("zurich"), ["Zürich HB"])
+        self.assertEqual(self.suggest("hb"), ["Zürich HB"])
+        self.assertEqual(self.suggest("erkva"), ["Bila Tserkva"])
+        self.assertEqual(self.suggest("centrl"), ["Kyiv Central"])
+        self.assertEqual(self.suggest(""), [])
+
+    def test_index_follows_station_changes(self):
+        """Test that renamed stations are found under their new name"""
+        station = self.stations["Lviv"]
+        station.name = "Lviv Holovnyi"
+        station.save()
+
+        self.assertEqual(self.suggest("holov"), ["Lviv Holovnyi"])
+
+    @override_settings(AUTOCOMPLETE_VERSION_CHECK_INTERVAL=0)
+    def test_index_follows_changes_from_other_processes(self):
+        """Test that a station saved elsewhere is found once checked for"""
+        station = self.stations["Lviv"]
+        get_index()
+        # What a save in another process leaves behind: the new row and
+        # its change log entry, without invalidating this index.
+        Station.objects.filter(pk=station.pk).update(name="Lviv Holovnyi")
+        log_changes(Station, [station.pk])
+
+        self.assertEqual(self.suggest("holov"), ["Lviv Holovnyi"])
+
+    def test_index_version_is_checked_at_most_every_interval(self):
+        """Test that lookups within the interval do not query the database"""
+        index = get_index()
+
+        with self.assertNumQueries(0):
+            self.assertIs(get_index(), index)
+
+        index.checked_at -= settings.AUTOCOMPLETE_VERSION_CHECK_INTERVAL
+        with self.assertNumQueries(1):
+            self.assertIs(get_index(), index)
+
+    def test_journey_search_ignores_empty_names(self):
+        """Test that a name without letters or digits matches nothing"""
+        self.sell_tickets("Zürich HB", "Lviv", 1)
+
+        res = self.client.get(JOURNEY_URL, {"from": "---"})
+
+        self.assertEqual(res.data["results"], [])
+
+    def test_journey_search_resolves_names_through_index(self):
+        """Test that journey search matches names without diacritics"""
+        journey = self.sell_tickets("Zürich HB", "Lviv", 1)
+
+        res = self.client.get(JOURNEY_URL, {"from": "zurich", "to": "LVIV"})
+
+        self.assertEqual(
+            [result["id"] for result in res.data["results"]], [journey.id]
+        )
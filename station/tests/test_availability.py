@@ -0,0 +1,106 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from order.models import Order
+from station.models import Journey, Route, Station, Train, TrainType
+from station.tests.helpers import at
+
+AVAILABILITY_URL = reverse("station:journey-availability")
+
+
+class JourneyAvailabilityTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        user = get_user_model().objects.create_user(
+            "user@example.com", "password123"
+        )
+        source = Station.objects.create(name="A", latitude=1, longitude=1)
+        destination = Station.objects.create(name="B", latitude=2, longitude=2)
+        route = Route.objects.create(
+            source=source, destination=destination, distance=100
+        )
+        train = Train.objects.create(
+            name="Express",
+            cargo_num=2,
+            places_in_cargo=10,
+            train_type=TrainType.objects.create(name="Type"),
+        )
+        self.journeys = [
+            Journey.objects.create(
+                route=route,
+                train=train,
+                departure_time=at(10, day),
+                arrival_time=at(18, day),
+            )
+            for day in (10, 11, 12)
+        ]
+        order = Order.objects.create(user=user)
+        order.tickets.create(journey=self.journeys[0], cargo=1, seat=1)
+        order.tickets.create(journey=self.journeys[0], cargo=1, seat=2)
+        order.tickets.create(journey=self.journeys[0], cargo=2, seat=1)
+
+    def test_availability_by_journey_ids(self):
+        """Test that availability is returned for the given journeys"""
+        res = self.client.post(
+            AVAILABILITY_URL,
+            {"journeys": [j.id for j in self.journeys[:2]], "cargos": True},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        availability = {item["journey"]: item for item in res.data}
+        self.assertEqual(len(availability), 2)
+        first = availability[self.journeys[0].id]
+        self.assertEqual(first["tickets_available"], 17)
+        self.assertEqual(
+            first["cargos"],
+            [{"cargo": 1, "free": 8}, {"cargo": 2, "free": 9}],
+        )
+        self.assertEqual(
+            availability[self.journeys[1].id]["cargos"],
+            [{"cargo": 1, "free": 10}, {"cargo": 2, "free": 10}],
+        )
+
+    def test_availability_by_date_range(self):
+        """Test that a date range selects journeys by departure date"""
+        res = self.client.post(
+            AVAILABILITY_URL,
+            {"date_from": "2025-10-11", "date_to": "2025-10-12"},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["journey"] for item in res.data],
+            [j.id for j in self.journeys[1:]],
+        )
+        self.assertNotIn("cargos", res.data[0])
+
+    def test_availability_requires_journeys_or_dates(self):
+        """Test that requests without a selection are rejected"""
+        res = self.client.post(
+            AVAILABILITY_URL, {"date_from": "2025-10-11"}, format="json"
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.post(
+            AVAILABILITY_URL,
+            {"date_from": "2025-10-01", "date_to": "2025-12-01"},
+            format="json",
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(AVAILABILITY_MAX_JOURNEYS=2)
+    def test_availability_rejects_too_many_journeys(self):
+        """Test that date ranges matching too many journeys are rejected"""
+        res = self.client.post(
+            AVAILABILITY_URL,
+            {"date_from": "2025-10-10", "date_to": "2025-10-12"},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("date_to", res.data)
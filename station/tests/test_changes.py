@@ -0,0 +1,186 @@
+import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.models import (
+    ChangeLogEntry,
+    Crew,
+    Journey,
+    Route,
+    Station,
+    Train,
+    TrainType,
+)
+
+CHANGES_URL = reverse("station:changes")
+
+
+@override_settings(CHANGE_FEED_SETTLE_TIME=datetime.timedelta(0))
+class ChangeFeedTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.source = Station.objects.create(
+            name="Kyiv", latitude=1, longitude=1
+        )
+        self.destination = Station.objects.create(
+            name="Lviv", latitude=2, longitude=2
+        )
+        self.route = Route.objects.create(
+            source=self.source, destination=self.destination, distance=500
+        )
+        self.train = Train.objects.create(
+            name="Express",
+            cargo_num=2,
+            places_in_cargo=10,
+            train_type=TrainType.objects.create(name="Intercity"),
+        )
+        self.crew = Crew.objects.create(first_name="Ann", last_name="Lee")
+        departure = timezone.now() + datetime.timedelta(days=1)
+        self.journey = Journey.objects.create(
+            route=self.route,
+            train=self.train,
+            departure_time=departure,
+            arrival_time=departure + datetime.timedelta(hours=6),
+        )
+
+    def sync(self, since=None):
+        params = {} if since is None else {"since": since}
+        res = self.client.get(CHANGES_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def test_initial_sync_returns_everything(self):
+        """Test that syncing from zero returns the whole catalogue"""
+        data = self.sync(0)
+
+        changes = data["changes"]
+        self.assertFalse(data["has_more"])
+        self.assertEqual(
+            [station["name"] for station in changes["stations"]["saved"]],
+            ["Kyiv", "Lviv"],
+        )
+        self.assertEqual(
+            changes["journeys"]["saved"][0]["id"], self.journey.id
+        )
+        self.assertEqual(
+            changes["train_types"]["saved"][0]["name"], "Intercity"
+        )
+        self.assertEqual(data["token"], self.sync()["token"])
+
+    def test_sync_returns_only_later_changes(self):
+        """Test that a token hides changes the client already has"""
+        token = self.sync()["token"]
+        self.destination.name = "Lviv Holovnyi"
+        self.destination.save()
+        self.journey.crew.add(self.crew)
+
+        data = self.sync(token)
+
+        changes = data["changes"]
+        self.assertEqual(
+            [station["name"] for station in changes["stations"]["saved"]],
+            ["Lviv Holovnyi"],
+        )
+        self.assertEqual(
+            changes["journeys"]["saved"][0]["crew"], [self.crew.id]
+        )
+        self.assertEqual(changes["routes"]["saved"], [])
+        self.assertEqual(
+            self.sync(data["token"])["changes"]["stations"],
+            {"saved": [], "deleted": []},
+        )
+
+    def test_deletes_are_tombstones(self):
+        """Test that deleted objects and their cascades are reported"""
+        token = self.sync()["token"]
+        route_id, journey_id = self.route.id, self.journey.id
+        self.route.delete()
+
+        changes = self.sync(token)["changes"]
+
+        self.assertEqual(changes["routes"]["deleted"], [route_id])
+        self.assertEqual(changes["journeys"]["deleted"], [journey_id])
+        self.assertEqual(changes["journeys"]["saved"], [])
+
+    def test_crew_deletion_updates_journeys(self):
+        """Test that journeys losing a crew member are reported"""
+        self.journey.crew.add(self.crew)
+        token = self.sync()["token"]
+        crew_id = self.crew.id
+        self.crew.delete()
+
+        changes = self.sync(token)["changes"]
+
+        self.assertEqual(changes["crews"]["deleted"], [crew_id])
+        self.assertEqual(changes["journeys"]["saved"][0]["crew"], [])
+
+    @override_settings(CHANGE_FEED_PAGE_SIZE=2)
+    def test_changes_are_paged(self):
+        """Test that large change sets are read in pages"""
+        token = 0
+        station_ids = []
+        for _ in range(10):
+            data = self.sync(token)
+            token = data["token"]
+            station_ids += [
+                s["id"] for s in data["changes"]["stations"]["saved"]
+            ]
+            if not data["has_more"]:
+                break
+
+        self.assertFalse(data["has_more"])
+        self.assertEqual(station_ids, [self.source.id, self.destination.id])
+
+    def test_unsettled_changes_are_held_back(self):
+        """Test that the newest changes wait for the settle time"""
+        token = self.sync()["token"]
+        self.destination.save()
+
+        with override_settings(
+            CHANGE_FEED_SETTLE_TIME=datetime.timedelta(minutes=1)
+        ):
+            data = self.sync(token)
+
+        self.assertEqual(data["token"], token)
+        self.assertEqual(data["changes"]["stations"]["saved"], [])
+
+    def test_expired_token(self):
+        """Test that a token older than the purged log is rejected"""
+        token = self.sync()["token"]
+        self.destination.save()
+        self.destination.save()
+        ChangeLogEntry.objects.update(
+            created_at=timezone.now() - datetime.timedelta(days=365)
+        )
+
+        call_command("purge_change_log", stdout=StringIO())
+
+        self.assertEqual(ChangeLogEntry.objects.count(), 1)
+        res = self.client.get(CHANGES_URL, {"since": token})
+        self.assertEqual(res.status_code, status.HTTP_410_GONE)
+        self.assertEqual(self.sync(token + 1)["token"], token + 2)
+
+    def test_invalid_token(self):
+        """Test that a malformed token is rejected"""
+        res = self.client.get(CHANGES_URL, {"since": "abc"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_changes_are_read_only(self):
+        """Test that the feed accepts no writes, even from admins"""
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser(
+                "admin@example.com", "password123"
+            )
+        )
+
+        res = self.client.post(CHANGES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
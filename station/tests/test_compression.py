@@ -0,0 +1,106 @@
+import gzip
+import json
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from config import compression
+from config.compression import CompressionMiddleware, choose_encoding
+from station.models import Station
+
+STATION_URL = reverse("station:station-list")
+
+
+def decompress(content, encoding):
+    if encoding == "gzip":
+        return gzip.decompress(content)
+    if encoding == "br":
+        return compression.brotli.decompress(content)
+    reader = compression.zstandard.ZstdDecompressor().decompressobj()
+    return reader.decompress(content)
+
+
+@override_settings(COMPRESSION_MIN_SIZE=200)
+class CompressionTests(TestCase):
+    def setUp(self):
+        Station.objects.bulk_create(
+            Station(name=f"Station {i}", latitude=i, longitude=i)
+            for i in range(10)
+        )
+
+    def test_json_is_compressed_with_negotiated_encoding(self):
+        """Test that API responses use the best accepted encoding"""
+        for encoding in compression.COMPRESSORS:
+            res = self.client.get(
+                STATION_URL, HTTP_ACCEPT_ENCODING=f"{encoding}, identity"
+            )
+
+            self.assertEqual(res["Content-Encoding"], encoding)
+            self.assertIn("Accept-Encoding", res["Vary"])
+            data = json.loads(decompress(res.content, encoding))
+            self.assertEqual(data["count"], 10)
+
+    def test_small_or_unaccepted_responses_are_not_compressed(self):
+        """Test that compression honours the size threshold and q=0"""
+        res = self.client.get(STATION_URL, HTTP_ACCEPT_ENCODING="gzip;q=0")
+        self.assertFalse(res.has_header("Content-Encoding"))
+
+        with override_settings(COMPRESSION_MIN_SIZE=100_000):
+            res = self.client.get(STATION_URL, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertFalse(res.has_header("Content-Encoding"))
+
+    def test_html_is_not_compressed(self):
+        """Test that HTML pages, which may embed CSRF tokens, stay plain"""
+        body = "<p>page</p>" * 500
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING="gzip")
+        middleware = CompressionMiddleware(lambda request: HttpResponse(body))
+
+        res = middleware(request)
+
+        self.assertFalse(res.has_header("Content-Encoding"))
+        self.assertEqual(res.content.decode(), body)
+
+    def test_choose_encoding_prefers_quality_then_server_order(self):
+        """Test that q-values win over the server preference"""
+        self.assertEqual(choose_encoding("gzip, br;q=0.5"), "gzip")
+        self.assertEqual(
+            choose_encoding("*"), choose_encoding("zstd, br, gzip")
+        )
+        self.assertIsNone(choose_encoding("identity"))
+
+    def test_streaming_response_is_compressed(self):
+        """Test that streamed bodies are compressed chunk by chunk"""
+        chunks = [b'{"items": [', b"1, " * 1000, b"1]}"]
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING="gzip")
+        middleware = CompressionMiddleware(
+            lambda request: StreamingHttpResponse(
+                iter(chunks), content_type="application/json"
+            )
+        )
+
+        res = middleware(request)
+
+        self.assertEqual(res["Content-Encoding"], "gzip")
+        body = gzip.decompress(b"".join(res.streaming_content))
+        self.assertEqual(body, b"".join(chunks))
+
+    def test_schema_compression_is_cached(self):
+        """Test that the schema document is compressed once"""
+        body = b"openapi: 3.0.3\n" * 500
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING="gzip")
+        middleware = CompressionMiddleware(
+            lambda request: HttpResponse(
+                body, content_type="application/vnd.oai.openapi"
+            )
+        )
+        first = middleware(request).content
+
+        compression.COMPRESSORS["gzip"] = None
+        try:
+            second = middleware(request).content
+        finally:
+            compression.COMPRESSORS["gzip"] = compression.GzipCompressor
+
+        self.assertEqual(first, second)
+        self.assertEqual(gzip.decompress(second), body)
@@ -0,0 +1,145 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from job.worker import run_pending
+from order.models import Ticket
+from station.fares import distance_fare
+from station.models import (
+    DemandMultiplier,
+    Journey,
+    JourneySearchEntry,
+    Route,
+    Station,
+    Tariff,
+    Train,
+    TrainType,
+)
+from station.tests.helpers import at
+
+JOURNEY_URL = reverse("station:journey-list")
+ORDER_URL = reverse("order:order-list")
+
+
+class FareTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "user@example.com", "password123"
+        )
+        self.client.force_authenticate(self.user)
+        self.route = Route.objects.create(
+            source=Station.objects.create(name="A", latitude=1, longitude=1),
+            destination=Station.objects.create(
+                name="B", latitude=2, longitude=2
+            ),
+            distance=300,
+        )
+        self.train_type = TrainType.objects.create(name="Intercity")
+        self.train = Train.objects.create(
+            name="Express",
+            cargo_num=1,
+            places_in_cargo=4,
+            train_type=self.train_type,
+        )
+        self.journey = Journey.objects.create(
+            route=self.route,
+            train=self.train,
+            departure_time=at(10),
+            arrival_time=at(14),
+        )
+
+    def create_tariff(self, train_type=None):
+        tariff = Tariff.objects.create(
+            train_type=train_type or self.train_type,
+            base_fare=Decimal("5.00"),
+        )
+        tariff.distance_bands.create(up_to_km=100, rate_per_km="0.100")
+        tariff.distance_bands.create(up_to_km=200, rate_per_km="0.080")
+        tariff.distance_bands.create(up_to_km=None, rate_per_km="0.050")
+        return tariff
+
+    def entry(self):
+        return JourneySearchEntry.objects.get(journey=self.journey)
+
+    def test_distance_bands_are_tapered(self):
+        """Test that each band charges only its own stretch"""
+        tariff = self.create_tariff()
+
+        self.assertEqual(distance_fare(tariff, 0), Decimal("5.00"))
+        self.assertEqual(distance_fare(tariff, 50), Decimal("10.00"))
+        self.assertEqual(distance_fare(tariff, 150), Decimal("19.00"))
+        self.assertEqual(distance_fare(tariff, 300), Decimal("28.00"))
+
+    def test_tariff_changes_reprice_journeys_in_background(self):
+        """Test that fares are recomputed by a job after tariff edits"""
+        self.assertIsNone(self.entry().fare)
+
+        tariff = self.create_tariff()
+        self.assertIsNone(self.entry().fare)
+        run_pending()
+        self.assertEqual(self.entry().fare, Decimal("28.00"))
+
+        tariff.base_fare = Decimal("7.00")
+        tariff.save()
+        run_pending()
+        self.assertEqual(self.entry().base_fare, Decimal("30.00"))
+
+        tariff.delete()
+        run_pending()
+        self.assertIsNone(self.entry().fare)
+
+    def test_fare_follows_fill_ratio(self):
+        """Test that demand multipliers apply as the journey fills up"""
+        self.create_tariff()
+        DemandMultiplier.objects.create(min_fill_ratio="0.5", multiplier="1.5")
+        DemandMultiplier.objects.create(min_fill_ratio="0.75", multiplier="2")
+        run_pending()
+
+        for seat, fare in ((1, "28.00"), (2, "28.00"), (3, "42.00")):
+            res = self.client.post(
+                ORDER_URL,
+                {
+                    "tickets": [
+                        {"cargo": 1, "seat": seat, "journey": self.journey.id}
+                    ]
+                },
+                format="json",
+            )
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+            ticket = Ticket.objects.get(seat=seat)
+            self.assertEqual(ticket.price, Decimal(fare))
+
+        self.assertEqual(self.entry().fare, Decimal("56.00"))
+
+    def test_train_type_change_reprices_journeys(self):
+        """Test that moving a train to another type switches its tariff"""
+        self.create_tariff()
+        other_type = TrainType.objects.create(name="Regional")
+        tariff = Tariff.objects.create(train_type=other_type, base_fare="3")
+        run_pending()
+
+        self.train.train_type = other_type
+        self.train.save()
+
+        self.assertEqual(self.entry().fare, Decimal("3.00"))
+        tariff.distance_bands.create(up_to_km=None, rate_per_km="0.010")
+        run_pending()
+        self.assertEqual(self.entry().fare, Decimal("6.00"))
+
+    def test_journey_list_and_detail_show_fares(self):
+        """Test that journey responses read the stored fare"""
+        self.create_tariff()
+        run_pending()
+
+        res = self.client.get(JOURNEY_URL)
+        self.assertEqual(res.data["results"][0]["fare"], "28.00")
+
+        res = self.client.get(
+            reverse("station:journey-detail", args=[self.journey.id])
+        )
+        self.assertEqual(res.data["fare"], "28.00")
@@ -0,0 +1,81 @@
+import datetime
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.models import Crew, Journey, Route, Station, Train, TrainType
+
+JOURNEY_URL = reverse("station:journey-list")
+
+
+def detail_url(journey_id):
+    return reverse("station:journey-detail", args=[journey_id])
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        source = Station.objects.create(name="A", latitude=1, longitude=1)
+        destination = Station.objects.create(name="B", latitude=2, longitude=2)
+        self.route = Route.objects.create(
+            source=source, destination=destination, distance=100
+        )
+        self.train = Train.objects.create(
+            name="Express",
+            cargo_num=2,
+            places_in_cargo=10,
+            train_type=TrainType.objects.create(name="Type"),
+        )
+        self.crew = Crew.objects.create(first_name="Ann", last_name="Lee")
+        self.journey = Journey.objects.create(
+            route=self.route,
+            train=self.train,
+            departure_time=datetime.datetime(
+                2025, 10, 10, 10, tzinfo=datetime.UTC
+            ),
+            arrival_time=datetime.datetime(
+                2025, 10, 10, 18, tzinfo=datetime.UTC
+            ),
+        )
+        self.journey.crew.add(self.crew)
+
+    def test_detail_returns_requested_fields(self):
+        """Test that ?fields= limits the journey detail"""
+        res = self.client.get(
+            detail_url(self.journey.id),
+            {"fields": "id,departure_time,tickets_available"},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            set(res.data), {"id", "departure_time", "tickets_available"}
+        )
+        self.assertEqual(res.data["tickets_available"], 20)
+
+    def test_detail_collapses_unexpanded_relations(self):
+        """Test that relations left out of ?expand= are returned as IDs"""
+        res = self.client.get(detail_url(self.journey.id), {"expand": "route"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["route"]["source"], "A")
+        self.assertEqual(res.data["train"], self.train.id)
+        self.assertEqual(res.data["crew"], [self.crew.id])
+
+    def test_detail_without_parameters_is_unchanged(self):
+        """Test that all relations are nested by default"""
+        res = self.client.get(detail_url(self.journey.id))
+
+        self.assertEqual(res.data["train"]["name"], "Express")
+        self.assertEqual(res.data["crew"], ["Ann Lee"])
+        self.assertEqual(res.data["taken_seats"], [])
+
+    def test_list_returns_requested_fields(self):
+        """Test that ?fields= limits the journey list"""
+        res = self.client.get(JOURNEY_URL, {"fields": "id,route"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data["results"], [{"id": self.journey.id, "route": "A -> B"}]
+        )
@@ -0,0 +1,154 @@
+import os
+import shutil
+import tempfile
+
+from PIL import Image
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from job.models import Job
+from job.worker import run_pending
+from station.models import Train, TrainType
+
+TRAIN_URL = reverse("station:train-list")
+TEMP_MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def train_image_upload_url(train_id):
+    return reverse("station:train-upload-image", args=[train_id])
+
+
+def sample_image_file(color="red"):
+    ntf = tempfile.NamedTemporaryFile(suffix=".png")
+    Image.new("RGB", (1200, 600), color).save(ntf, format="PNG")
+    ntf.seek(0)
+    return ntf
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, IMAGE_PROCESSING_ASYNC=False)
+class TrainImageProcessingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin_user = get_user_model().objects.create_superuser(
+            "admin@example.com", "password123"
+        )
+        self.client.force_authenticate(self.admin_user)
+        train_type = TrainType.objects.create(name="Type 1")
+        self.train = Train.objects.create(
+            name="Train 1",
+            cargo_num=2,
+            places_in_cargo=50,
+            train_type=train_type,
+        )
+        self.other_train = Train.objects.create(
+            name="Train 2",
+            cargo_num=2,
+            places_in_cargo=50,
+            train_type=train_type,
+        )
+
+    def tearDown(self):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def upload(self, train, image_file):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                train_image_upload_url(train.id),
+                {"image": image_file},
+                format="multipart",
+            )
+
+    def test_image_is_only_replaced_through_upload(self):
+        """Test that train updates cannot swap the image past its variants"""
+        with sample_image_file() as image_file:
+            self.upload(self.train, image_file)
+        self.train.refresh_from_db()
+        image, variants = self.train.image.name, self.train.image_variants
+
+        with sample_image_file("blue") as image_file:
+            res = self.client.put(
+                reverse("station:train-detail", args=[self.train.id]),
+                {
+                    "name": "Train 1",
+                    "cargo_num": 2,
+                    "places_in_cargo": 50,
+                    "train_type": self.train.train_type_id,
+                    "image": image_file,
+                },
+                format="multipart",
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.train.refresh_from_db()
+        self.assertEqual(self.train.image.name, image)
+        self.assertEqual(self.train.image_variants, variants)
+
+    def test_upload_generates_resized_variants(self):
+        """Test that uploading an image creates resized variants"""
+        with sample_image_file() as image_file:
+            res = self.upload(self.train, image_file)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        self.train.refresh_from_db()
+        self.assertEqual(
+            set(self.train.image_variants), {"thumbnail", "medium", "webp"}
+        )
+        storage = self.train.image.storage
+        with Image.open(
+            storage.path(self.train.image_variants["thumbnail"])
+        ) as thumbnail:
+            self.assertEqual(thumbnail.size, (320, 160))
+        with Image.open(
+            storage.path(self.train.image_variants["webp"])
+        ) as webp:
+            self.assertEqual(webp.format, "WEBP")
+
+    def test_list_exposes_variant_urls(self):
+        """Test that the train list returns URLs of the image variants"""
+        with sample_image_file() as image_file:
+            self.upload(self.train, image_file)
+
+        res = self.client.get(TRAIN_URL)
+        train_data = next(
+            item for item in res.data["results"] if item["id"] == self.train.id
+        )
+        self.assertTrue(
+            train_data["image_variants"]["thumbnail"].startswith("http")
+        )
+
+    def test_reupload_same_content_is_deduplicated(self):
+        """Test that identical uploads reuse the stored file"""
+        with sample_image_file() as image_file:
+            self.upload(self.train, image_file)
+        with sample_image_file() as image_file:
+            self.upload(self.other_train, image_file)
+
+        self.train.refresh_from_db()
+        self.other_train.refresh_from_db()
+        self.assertEqual(self.train.image.name, self.other_train.image.name)
+        self.assertEqual(
+            self.train.image_variants, self.other_train.image_variants
+        )
+        uploads = os.listdir(os.path.join(TEMP_MEDIA_ROOT, "uploads/trains"))
+        self.assertEqual(len([f for f in uploads if f != "variants"]), 1)
+
+    @override_settings(IMAGE_PROCESSING_ASYNC=True)
+    def test_async_processing_runs_in_job_worker(self):
+        """Test that variants are generated by a background job"""
+        with sample_image_file() as image_file:
+            self.upload(self.train, image_file)
+
+        self.train.refresh_from_db()
+        self.assertEqual(self.train.image_variants, {})
+        self.assertEqual(
+            Job.objects.filter(task="station.train_image_variants").count(), 1
+        )
+
+        self.assertEqual(run_pending(), 1)
+
+        self.train.refresh_from_db()
+        self.assertEqual(len(self.train.image_variants), 3)
+        self.assertFalse(Job.objects.exists())
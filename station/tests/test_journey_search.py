@@ -0,0 +1,111 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from order.models import Order
+from station.models import (
+    Journey,
+    JourneySearchEntry,
+    Route,
+    Station,
+    Train,
+    TrainType,
+)
+from station.tests.helpers import at
+
+JOURNEY_URL = reverse("station:journey-list")
+ORDER_URL = reverse("order:order-list")
+
+
+class JourneySearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "user@example.com", "password123"
+        )
+        self.client.force_authenticate(self.user)
+        self.source = Station.objects.create(
+            name="Kyiv", latitude=1, longitude=1
+        )
+        self.destination = Station.objects.create(
+            name="Lviv", latitude=2, longitude=2
+        )
+        self.route = Route.objects.create(
+            source=self.source, destination=self.destination, distance=540
+        )
+        self.train = Train.objects.create(
+            name="Express",
+            cargo_num=2,
+            places_in_cargo=10,
+            train_type=TrainType.objects.create(name="Type"),
+        )
+        self.journey = Journey.objects.create(
+            route=self.route,
+            train=self.train,
+            departure_time=at(10),
+            arrival_time=at(18),
+        )
+
+    def entry(self):
+        return JourneySearchEntry.objects.get(journey=self.journey)
+
+    def test_list_is_served_from_entries(self):
+        """Test that the journey list reads the search entries"""
+        res = self.client.get(
+            JOURNEY_URL, {"from": "kyiv", "to": "lviv", "date": "2025-10-10"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["count"], 1)
+        journey = res.data["results"][0]
+        self.assertEqual(journey["id"], self.journey.id)
+        self.assertEqual(journey["route"], "Kyiv -> Lviv")
+        self.assertEqual(journey["train_name"], "Express")
+        self.assertEqual(journey["train_capacity"], 20)
+        self.assertEqual(journey["tickets_available"], 20)
+
+        res = self.client.get(JOURNEY_URL, {"date": "2025-10-11"})
+        self.assertEqual(res.data["count"], 0)
+
+    def test_booking_reduces_tickets_available(self):
+        """Test that booked tickets are taken from the entry"""
+        res = self.client.post(
+            ORDER_URL,
+            {
+                "tickets": [
+                    {"cargo": 1, "seat": 1, "journey": self.journey.id},
+                    {"cargo": 1, "seat": 2, "journey": self.journey.id},
+                ]
+            },
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.entry().tickets_available, 18)
+
+    def test_related_changes_are_propagated(self):
+        """Test that station and train updates reach the entries"""
+        order = Order.objects.create(user=self.user)
+        order.tickets.create(journey=self.journey, cargo=1, seat=1)
+        self.source.name = "Kyiv-Pasazhyrskyi"
+        self.source.save()
+        self.train.cargo_num = 3
+        self.train.save()
+
+        entry = self.entry()
+        self.assertEqual(entry.source_name, "Kyiv-Pasazhyrskyi")
+        self.assertEqual(entry.capacity, 30)
+        self.assertEqual(entry.tickets_available, 29)
+
+    def test_rebuild_command_recreates_entries(self):
+        """Test that the rebuild command restores missing entries"""
+        JourneySearchEntry.objects.all().delete()
+
+        call_command("rebuild_journey_search", stdout=StringIO())
+
+        self.assertEqual(self.entry().tickets_available, 20)
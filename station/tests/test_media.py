@@ -0,0 +1,103 @@
+import os
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp()
+IMMUTABLE_NAME = (
+    "uploads/trains/train-1-0b8f2f5e-3c1d-4a8e-9f7a-2d6c5b4a3e21.jpg"
+)
+MUTABLE_NAME = "uploads/trains/plain.jpg"
+CONTENT = bytes(range(256)) * 4
+
+
+def media_url(path):
+    return reverse("media", args=[path])
+
+
+def read(response):
+    content = b"".join(response.streaming_content)
+    response.close()
+    return content
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, MEDIA_SENDFILE_HEADER="")
+class MediaServingTests(TestCase):
+    def setUp(self):
+        os.makedirs(os.path.join(TEMP_MEDIA_ROOT, "uploads/trains"))
+        for name in (IMMUTABLE_NAME, MUTABLE_NAME):
+            with open(os.path.join(TEMP_MEDIA_ROOT, name), "wb") as f:
+                f.write(CONTENT)
+
+    def tearDown(self):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_content_addressed_file_is_cached_forever(self):
+        """Test that UUID-named uploads get immutable cache headers"""
+        res = self.client.get(media_url(IMMUTABLE_NAME))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(read(res), CONTENT)
+        self.assertIn("immutable", res.headers["Cache-Control"])
+
+        res = self.client.get(media_url(MUTABLE_NAME))
+        read(res)
+        self.assertNotIn("immutable", res.headers["Cache-Control"])
+
+    def test_matching_etag_returns_not_modified(self):
+        """Test that a matching ETag is answered with 304"""
+        res = self.client.get(media_url(IMMUTABLE_NAME))
+        read(res)
+        res = self.client.get(
+            media_url(IMMUTABLE_NAME), HTTP_IF_NONE_MATCH=res.headers["ETag"]
+        )
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_range_request_returns_partial_content(self):
+        """Test that a byte range returns only the requested bytes"""
+        res = self.client.get(
+            media_url(IMMUTABLE_NAME), HTTP_RANGE="bytes=10-19"
+        )
+        self.assertEqual(res.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(res.headers["Content-Length"], "10")
+        self.assertEqual(
+            res.headers["Content-Range"], f"bytes 10-19/{len(CONTENT)}"
+        )
+        self.assertEqual(read(res), CONTENT[10:20])
+
+    def test_unsatisfiable_range_fails(self):
+        """Test that a range outside the file is rejected"""
+        res = self.client.get(
+            media_url(IMMUTABLE_NAME), HTTP_RANGE="bytes=5000-6000"
+        )
+        self.assertEqual(
+            res.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+        )
+
+    def test_unsupported_range_is_ignored(self):
+        """Test that malformed or multiple ranges get the whole file"""
+        for header in ("bytes=0-1,5-6", "bytes=20-10", "items=0-1", "bytes=-"):
+            with self.subTest(header=header):
+                res = self.client.get(
+                    media_url(IMMUTABLE_NAME), HTTP_RANGE=header
+                )
+                self.assertEqual(res.status_code, status.HTTP_200_OK)
+                self.assertNotIn("Content-Range", res.headers)
+                self.assertEqual(read(res), CONTENT)
+
+    @override_settings(MEDIA_SENDFILE_HEADER="X-Accel-Redirect")
+    def test_transfer_is_delegated_to_front_server(self):
+        """Test that the file is handed to nginx when configured"""
+        res = self.client.get(media_url(IMMUTABLE_NAME))
+        self.assertEqual(
+            res.headers["X-Accel-Redirect"],
+            f"/protected-media/{IMMUTABLE_NAME}",
+        )
+        self.assertEqual(res.content, b"")
+
+    def test_path_outside_media_root_not_found(self):
+        """Test that paths escaping MEDIA_ROOT are not served"""
+        res = self.client.get(media_url("../settings.py"))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,126 @@
+import random
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from job.worker import run_pending
+from station.models import Route, Station
+from station.network import UNREACHABLE, compute, update_distances
+
+
+def distance_url(source, destination):
+    return reverse(
+        "station:station-distance",
+        kwargs={"pk": source, "destination": destination},
+    )
+
+
+def floyd_warshall(n, edges):
+    distances = [[UNREACHABLE] * n for _ in range(n)]
+    for i in range(n):
+        distances[i][i] = 0
+    for (source, destination), weight in edges.items():
+        distances[source][destination] = weight
+    for k in range(n):
+        for i in range(n):
+            for j in range(n):
+                through = distances[i][k] + distances[k][j]
+                if through < distances[i][j]:
+                    distances[i][j] = through
+    return [value for row in distances for value in row]
+
+
+class DistanceMatrixTests(TestCase):
+    def test_incremental_updates_match_full_computation(self):
+        """Test that relaxing new edges matches Floyd-Warshall"""
+        rng = random.Random(7)
+        n = 12
+        edges = {}
+        matrix = compute(list(range(n)), {})
+        for _ in range(40):
+            source, destination = rng.sample(range(n), 2)
+            weight = rng.randint(1, 100)
+            if weight < edges.get((source, destination), UNREACHABLE):
+                edges[(source, destination)] = weight
+                matrix.relax(source, destination, weight)
+
+        expected = floyd_warshall(n, edges)
+        self.assertEqual(
+            list(compute(list(range(n)), edges).distances), expected
+        )
+        self.assertEqual(list(matrix.distances), expected)
+        for source in range(n):
+            for destination in range(n):
+                path = matrix.path(source, destination)
+                if path is None:
+                    continue
+                length = sum(edges[step] for step in zip(path, path[1:]))
+                self.assertEqual(length, matrix.distance(source, destination))
+
+
+class StationDistanceApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.a, self.b, self.c = (
+            Station.objects.create(name=name, latitude=1, longitude=1)
+            for name in "ABC"
+        )
+        Route.objects.create(source=self.a, destination=self.b, distance=100)
+        self.b_c = Route.objects.create(
+            source=self.b, destination=self.c, distance=50
+        )
+        self.a_c = Route.objects.create(
+            source=self.a, destination=self.c, distance=200
+        )
+        run_pending()
+
+    def get_distance(self, source, destination):
+        return self.client.get(distance_url(source.id, destination.id))
+
+    def test_shortest_distance_and_path(self):
+        """Test that the endpoint returns the shortest path"""
+        res = self.get_distance(self.a, self.c)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["distance"], 150)
+        self.assertEqual(res.data["path"], [self.a.id, self.b.id, self.c.id])
+
+    def test_unreachable_station(self):
+        """Test that routes are directed"""
+        res = self.get_distance(self.c, self.a)
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_route_changes_update_distances(self):
+        """Test that the matrix follows added, changed and deleted routes"""
+        self.a_c.distance = 120
+        self.a_c.save()
+        run_pending()
+        self.assertEqual(
+            self.get_distance(self.a, self.c).data["path"],
+            [self.a.id, self.c.id],
+        )
+
+        self.a_c.distance = 300
+        self.a_c.save()
+        run_pending()
+        self.assertEqual(
+            self.get_distance(self.a, self.c).data["distance"], 150
+        )
+
+        self.b_c.delete()
+        run_pending()
+        self.assertEqual(
+            self.get_distance(self.a, self.c).data["distance"], 300
+        )
+
+    def test_unchanged_routes_keep_matrix_version(self):
+        """Test that routes that shorten nothing do not rewrite the matrix"""
+        version = update_distances().version
+
+        Route.objects.create(source=self.a, destination=self.c, distance=500)
+        run_pending()
+
+        self.assertEqual(update_distances().version, version)
@@ -0,0 +1,85 @@
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+
+from config import profiling
+from station.models import Station
+
+TEMP_PROFILING_DIR = tempfile.mkdtemp()
+STATION_URL = reverse("station:station-list")
+
+
+@override_settings(PROFILING_DIR=TEMP_PROFILING_DIR)
+class ProfilingTests(TestCase):
+    def setUp(self):
+        Station.objects.create(name="A", latitude=1, longitude=1)
+        self.staff = get_user_model().objects.create_user(
+            "staff@example.com", "password123", is_staff=True
+        )
+        self.user = get_user_model().objects.create_user(
+            "user@example.com", "password123"
+        )
+
+    def tearDown(self):
+        shutil.rmtree(TEMP_PROFILING_DIR, ignore_errors=True)
+
+    def auth(self, user):
+        return {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(user)}"}
+
+    def test_staff_gets_profile_report(self):
+        """Test that a staff request flagged json returns the profile"""
+        res = self.client.get(
+            STATION_URL, {"profile": "json"}, **self.auth(self.staff)
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        report = res.json()
+        self.assertEqual(report["status"], 200)
+        self.assertGreater(report["sql"]["count"], 0)
+        self.assertTrue(
+            any(
+                "station_station" in q["sql"] for q in report["sql"]["queries"]
+            )
+        )
+        self.assertTrue(report["top_functions"])
+        self.assertTrue(report["call_tree"])
+
+    def test_staff_profile_is_stored(self):
+        """Test that other flag values store the profile on disk"""
+        res = self.client.get(
+            STATION_URL, HTTP_X_PROFILE="1", **self.auth(self.staff)
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("results", res.json())
+        profile_id = res["X-Profile-Id"]
+        directory = Path(TEMP_PROFILING_DIR)
+        self.assertTrue((directory / f"{profile_id}.prof").is_file())
+        report = json.loads((directory / f"{profile_id}.json").read_text())
+        self.assertEqual(report["path"], STATION_URL)
+
+    def test_non_staff_requests_are_not_profiled(self):
+        """Test that the flag is ignored for other users"""
+        for headers in ({}, self.auth(self.user)):
+            res = self.client.get(STATION_URL, {"profile": "json"}, **headers)
+
+            self.assertIn("results", res.json())
+            self.assertFalse(res.has_header("X-Profile-Id"))
+
+    def test_concurrent_profile_request_is_served_unprofiled(self):
+        """Test that a request is not profiled while another one is"""
+        with profiling._profiler_lock:
+            res = self.client.get(
+                STATION_URL, {"profile": "json"}, **self.auth(self.staff)
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("results", res.json())
+        self.assertEqual(res["X-Profile-Skipped"], "busy")
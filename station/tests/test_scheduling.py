@@ -0,0 +1,163 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import serializers, status
+from rest_framework.test import APIClient
+
+from station.models import Crew, Journey, Route, Station, Train, TrainType
+from station.scheduling import IntervalTree
+from station.serializers import JourneySerializer
+from station.tests.helpers import at
+
+JOURNEY_URL = reverse("station:journey-list")
+
+
+class IntervalTreeTests(TestCase):
+    def test_overlapping_returns_only_intersecting_intervals(self):
+        """Test that queries return overlapping half-open intervals"""
+        tree = IntervalTree(
+            [(start, start + 2, start) for start in range(0, 100, 3)]
+        )
+        self.assertEqual(sorted(tree.overlapping(10, 13)), [9, 12])
+        self.assertEqual(tree.overlapping(2, 3), [])
+        self.assertEqual(IntervalTree([]).overlapping(0, 1), [])
+
+
+class JourneyOverlapTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin_user = get_user_model().objects.create_superuser(
+            "admin@example.com", "password123"
+        )
+        self.client.force_authenticate(self.admin_user)
+        source = Station.objects.create(name="A", latitude=1, longitude=1)
+        destination = Station.objects.create(name="B", latitude=2, longitude=2)
+        self.route = Route.objects.create(
+            source=source, destination=destination, distance=100
+        )
+        train_type = TrainType.objects.create(name="Type")
+        self.train = Train.objects.create(
+            name="Express",
+            cargo_num=2,
+            places_in_cargo=10,
+            train_type=train_type,
+        )
+        self.other_train = Train.objects.create(
+            name="Local",
+            cargo_num=2,
+            places_in_cargo=10,
+            train_type=train_type,
+        )
+        self.crew = Crew.objects.create(first_name="Ann", last_name="Lee")
+        journey = Journey.objects.create(
+            route=self.route,
+            train=self.train,
+            departure_time=at(10),
+            arrival_time=at(12),
+        )
+        journey.crew.add(self.crew)
+
+    def payload(self, train, start, end, crew=()):
+        return {
+            "route": self.route.id,
+            "train": train.id,
+            "crew": [member.id for member in crew],
+            "departure_time": start.isoformat(),
+            "arrival_time": end.isoformat(),
+        }
+
+    def test_overlapping_train_journey_rejected(self):
+        """Test that a train cannot run two journeys at once"""
+        res = self.client.post(
+            JOURNEY_URL,
+            self.payload(self.train, at(11), at(13)),
+            format="json",
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("train", res.data)
+
+    def test_overlapping_crew_journey_rejected(self):
+        """Test that a crew member cannot work two journeys at once"""
+        payload = self.payload(self.other_train, at(9), at(11), [self.crew])
+        res = self.client.post(JOURNEY_URL, payload, format="json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("crew", res.data)
+
+    def test_back_to_back_journeys_allowed(self):
+        """Test that a journey may start when the previous one arrives"""
+        payload = self.payload(self.train, at(12), at(14), [self.crew])
+        res = self.client.post(JOURNEY_URL, payload, format="json")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_overlap_check_ignores_distant_history(self):
+        """Test that only journeys near the new one are considered"""
+        history = [
+            Journey(
+                route=self.route,
+                train=self.other_train,
+                departure_time=at(11) - datetime.timedelta(days=d),
+                arrival_time=at(12) - datetime.timedelta(days=d),
+            )
+            for d in range(30, 530)
+        ]
+        # Longer than MAX_JOURNEY_DURATION, so it starts before the
+        # window even though it would overlap; a full scan catches it.
+        history.append(
+            Journey(
+                route=self.route,
+                train=self.other_train,
+                departure_time=at(11) - datetime.timedelta(days=400),
+                arrival_time=at(13),
+            )
+        )
+        Journey.objects.bulk_create(history)
+
+        payload = self.payload(self.other_train, at(11), at(13))
+        res = self.client.post(JOURNEY_URL, payload, format="json")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_bulk_import_checks_journeys_against_each_other(self):
+        """Test that journeys of one import cannot overlap each other"""
+        payload = [
+            self.payload(self.other_train, at(8, day=11), at(10, day=11)),
+            self.payload(self.other_train, at(9, day=11), at(11, day=11)),
+        ]
+        res = self.client.post(JOURNEY_URL, payload, format="json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("train", res.data["non_field_errors"][1])
+
+        payload[1] = self.payload(
+            self.other_train, at(10, day=11), at(11, day=11)
+        )
+        res = self.client.post(JOURNEY_URL, payload, format="json")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data), 2)
+
+    def test_concurrent_bulk_import_conflict_is_a_validation_error(self):
+        """Test that the overlap constraint rejects a bulk import cleanly"""
+        serializer = JourneySerializer(
+            data=[self.payload(self.other_train, at(8), at(9))], many=True
+        )
+        serializer.is_valid(raise_exception=True)
+
+        # What PostgreSQL raises when a concurrent request scheduled the
+        # same train between validation and the insert.
+        def violate(validated_data):
+            raise IntegrityError(
+                "conflicting key value violates exclusion constraint "
+                '"station_journey_train_no_overlap"'
+            )
+
+        serializer.create = violate
+        with self.assertRaises(serializers.ValidationError) as error:
+            serializer.save()
+        self.assertIn("train", error.exception.detail)
+
+    def test_journey_longer_than_limit_rejected(self):
+        """Test that unrealistically long journeys are rejected"""
+        payload = self.payload(self.other_train, at(8), at(8, day=25))
+        res = self.client.post(JOURNEY_URL, payload, format="json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,57 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from config import schema
+
+TEMP_SCHEMA_DIR = tempfile.mkdtemp()
+SCHEMA_URL = reverse("schema")
+
+
+@override_settings(SCHEMA_CACHE_DIR=TEMP_SCHEMA_DIR)
+class CachedSchemaTests(TestCase):
+    def setUp(self):
+        schema._documents.clear()
+
+    def tearDown(self):
+        schema._documents.clear()
+        shutil.rmtree(TEMP_SCHEMA_DIR, ignore_errors=True)
+
+    def test_schema_is_generated_once(self):
+        """Test that the schema is kept in memory and on disk"""
+        res = self.client.get(SCHEMA_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn(b"Train Station API", res.content)
+        path = schema.schema_path("yaml", schema.code_version())
+        self.assertEqual(path.read_bytes(), res.content)
+
+        document = schema.get_schema_document("yaml")
+        self.assertIs(schema.get_schema_document("yaml"), document)
+
+    def test_schema_is_revalidated_with_etag(self):
+        """Test that a matching If-None-Match returns 304"""
+        res = self.client.get(SCHEMA_URL, {"format": "json"})
+        etag = res["ETag"]
+
+        res = self.client.get(
+            SCHEMA_URL, {"format": "json"}, HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_schema_is_loaded_from_disk(self):
+        """Test that a new process reuses the schema built on disk"""
+        call_command("build_schema", stdout=StringIO())
+        path = schema.schema_path("json", schema.code_version())
+        path.write_bytes(b'{"openapi": "prebuilt"}')
+        schema._documents.clear()
+
+        res = self.client.get(SCHEMA_URL, {"format": "json"})
+
+        self.assertEqual(res.content, b'{"openapi": "prebuilt"}')
@@ -0,0 +1,129 @@
+import shutil
+import tempfile
+import threading
+from types import SimpleNamespace
+
+from django.contrib.auth import get_user_model
+from django.db import OperationalError, connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from config import gunicorn, workers
+
+LIVE_URL = reverse("health-live")
+READY_URL = reverse("health-ready")
+WORKER_METRICS_URL = reverse("worker-metrics")
+TEMP_METRICS_DIR = tempfile.mkdtemp()
+
+
+def refuse_queries(execute, sql, params, many, context):
+    raise OperationalError("connection refused")
+
+
+class WorkerSizingTests(SimpleTestCase):
+    def test_workers_follow_cpus(self):
+        """Test that workers default to two per CPU plus one"""
+        self.assertEqual(gunicorn.size_workers(4, 100, 4), (9, 4))
+
+    def test_connection_budget_limits_workers_and_threads(self):
+        """Test that workers times threads stays within the DB budget"""
+        self.assertEqual(gunicorn.size_workers(4, 20, 4), (9, 2))
+        self.assertEqual(gunicorn.size_workers(8, 5, 4), (5, 1))
+        self.assertEqual(gunicorn.size_workers(1, 0, 4), (1, 1))
+
+    def test_booking_writers_reserve_connections(self):
+        """Test that booking queue writers count against the DB budget"""
+        self.assertEqual(gunicorn.size_workers(4, 20, 4, reserved=4), (4, 1))
+
+
+class HealthTests(TestCase):
+    def test_liveness_does_not_query(self):
+        """Test that the liveness check never hits the database"""
+        with self.assertNumQueries(0):
+            res = self.client.get(LIVE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), {"status": "ok"})
+
+    def test_readiness_checks_database(self):
+        """Test that readiness fails while the database is unreachable"""
+        res = self.client.get(READY_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        with connection.execute_wrapper(refuse_queries):
+            res = self.client.get(READY_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
+@override_settings(
+    WORKER_METRICS_DIR=TEMP_METRICS_DIR, WORKER_METRICS_INTERVAL=0
+)
+class WorkerMetricsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin_user = get_user_model().objects.create_superuser(
+            "admin@example.com", "password123"
+        )
+
+    def tearDown(self):
+        workers._metrics = None
+        shutil.rmtree(TEMP_METRICS_DIR, ignore_errors=True)
+
+    def serve(self, status_code):
+        request = SimpleNamespace()
+        gunicorn.pre_request(None, request)
+        gunicorn.post_request(
+            None, request, {}, SimpleNamespace(status_code=status_code)
+        )
+
+    def test_hooks_report_worker_requests(self):
+        """Test that the server hooks publish each worker's requests"""
+        gunicorn.on_starting(None)
+        gunicorn.post_fork(None, SimpleNamespace(pid=4242))
+        self.serve(200)
+        self.serve(500)
+        self.client.force_authenticate(self.admin_user)
+
+        res = self.client.get(WORKER_METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        [worker] = res.data
+        self.assertEqual(worker["pid"], 4242)
+        self.assertEqual(worker["requests"], 2)
+        self.assertEqual(worker["errors"], 1)
+        self.assertEqual(worker["in_flight"], 0)
+
+        gunicorn.child_exit(None, SimpleNamespace(pid=4242))
+        self.assertEqual(self.client.get(WORKER_METRICS_URL).data, [])
+
+    def test_concurrent_requests_write_metrics_safely(self):
+        """Test that threads finishing requests at once can all write"""
+        workers.start(4242)
+        errors = []
+
+        def serve_many():
+            try:
+                for _ in range(50):
+                    self.serve(200)
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=serve_many) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        workers.write()
+        [worker] = workers.read_all()
+        self.assertEqual(worker["requests"], 400)
+
+    def test_metrics_require_admin(self):
+        """Test that worker metrics are hidden from other users"""
+        res = self.client.get(WORKER_METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,69 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from config import slow_queries
+from station.models import Station
+
+JOURNEY_URL = reverse("station:journey-list")
+SLOW_QUERIES_URL = reverse("slow-queries")
+
+
+@override_settings(
+    SLOW_QUERY_ENABLED=True,
+    SLOW_QUERY_THRESHOLD_MS=0,
+    SLOW_QUERY_EXPLAIN_RATE=1,
+)
+class SlowQueryTests(TestCase):
+    def setUp(self):
+        slow_queries.clear_entries()
+        self.client = APIClient()
+        self.admin_user = get_user_model().objects.create_superuser(
+            "admin@example.com", "password123"
+        )
+        Station.objects.create(name="A", latitude=1, longitude=1)
+
+    def tearDown(self):
+        slow_queries.clear_entries()
+
+    def test_slow_queries_are_recorded_with_origin_and_plan(self):
+        """Test that queries are attributed to the view action"""
+        with self.assertLogs("config.slow_queries", "WARNING") as logs:
+            self.client.get(JOURNEY_URL, {"from": "kyiv"})
+
+        self.assertTrue(
+            any(
+                "Slow query" in message and "JourneyViewSet.list" in message
+                for message in logs.output
+            )
+        )
+
+        entries = slow_queries.recent_entries()
+        search = [
+            e for e in entries if "station_journeysearchentry" in e["sql"]
+        ]
+        self.assertTrue(search)
+        self.assertEqual(search[0]["origin"], "JourneyViewSet.list")
+        self.assertTrue(search[0]["plan"])
+
+    def test_admins_can_list_and_clear_entries(self):
+        """Test that the captured queries are exposed to admins only"""
+        with self.assertLogs("config.slow_queries", "WARNING"):
+            self.client.get(JOURNEY_URL)
+            anonymous = self.client.get(SLOW_QUERIES_URL)
+            self.client.force_authenticate(self.admin_user)
+            listed = self.client.get(
+                SLOW_QUERIES_URL, {"origin": "JourneyViewSet.list"}
+            )
+            cleared = self.client.delete(SLOW_QUERIES_URL)
+
+        self.assertEqual(anonymous.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(listed.status_code, status.HTTP_200_OK)
+        self.assertTrue(listed.data)
+        self.assertTrue(
+            all(e["origin"] == "JourneyViewSet.list" for e in listed.data)
+        )
+        self.assertEqual(cleared.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(slow_queries.recent_entries(), [])
@@ -0,0 +1,56 @@
+import subprocess
+import sys
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from config.startup import parse_import_times
+
+LAZY_MODULES = ("PIL.Image", "drf_spectacular.generators", "order.admin")
+CHECK_LAZY_MODULES = f"""
+import sys
+from config.wsgi import create_app
+create_app()
+print(",".join(name for name in {LAZY_MODULES!r} if name in sys.modules))
+"""
+
+
+class StartupTests(SimpleTestCase):
+    def test_workers_defer_optional_subsystems(self):
+        """Test that a warmed-up app has not loaded Pillow, schema or admin"""
+        result = subprocess.run(
+            [sys.executable, "-W", "ignore", "-c", CHECK_LAZY_MODULES],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+        self.assertEqual(result.stdout.strip(), "")
+
+    def test_parse_import_times(self):
+        """Test that the importtime report is read per module"""
+        report = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   json.decoder\n"
+            "import time:       300 |        420 | json\n"
+            "unrelated output\n"
+        )
+
+        modules = parse_import_times(report)
+
+        self.assertEqual(
+            [(m.name, m.self_us, m.cumulative_us) for m in modules],
+            [("json.decoder", 120, 120), ("json", 300, 420)],
+        )
+
+    def test_profile_startup_command(self):
+        """Test that the command lists the slowest imports"""
+        out = StringIO()
+
+        call_command("profile_startup", "--limit", "5", stdout=out)
+
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 7)
+        self.assertIn("config.wsgi", out.getvalue())
+        self.assertTrue(lines[-1].startswith("Booted in"))
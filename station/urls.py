@@ -7,6 +7,7 @@ from .views import (
     RouteViewSet,
     TrainViewSet,
     JourneyViewSet,
+    ChangeFeedView,
 )
 
 app_name = "station"
@@ -19,4 +20,7 @@ router.register("routes", RouteViewSet, basename="route")
 router.register("trains", TrainViewSet, basename="train")
 router.register("journeys", JourneyViewSet, basename="journey")
 
-urlpatterns = [path("", include(router.urls))]
+urlpatterns = [
+    path("changes/", ChangeFeedView.as_view(), name="changes"),
+    path("", include(router.urls)),
+]
@@ -1,21 +1,39 @@
 from typing import Type
 
-from django.db.models import Count, F, QuerySet
+from django.conf import settings
+from django.db.models import Count, F, Q, QuerySet
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import (
     extend_schema_view,
     extend_schema,
     OpenApiParameter,
 )
-from rest_framework import viewsets, mixins, status
+from rest_framework import generics, viewsets, mixins, status
 from rest_framework.decorators import action
-from rest_framework.permissions import IsAdminUser
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.response import Response
 from rest_framework.serializers import Serializer
 
+from config.fieldsets import FIELDSET_PARAMETERS, SparseFieldsetViewMixin
 from user.permissions import IsAdminOrReadOnly
-from .models import Station, TrainType, Crew, Route, Train, Journey
+from .autocomplete import get_index
+from .availability import TooManyJourneys, journey_availability
+from .changes import TokenExpired, latest_token, read_changes
+from .network import get_matrix
+from .models import (
+    Station,
+    TrainType,
+    Crew,
+    Route,
+    Train,
+    Journey,
+    JourneySearchEntry,
+)
 from .serializers import (
+    ChangeFeedRequestSerializer,
+    StationAutocompleteSerializer,
+    StationDistanceSerializer,
     StationSerializer,
     TrainTypeSerializer,
     CrewSerializer,
@@ -25,13 +43,16 @@ from .serializers import (
     TrainListSerializer,
     TrainSerializer,
     TrainDetailSerializer,
-    JourneyListSerializer,
     JourneyDetailSerializer,
+    JourneySearchEntrySerializer,
     JourneySerializer,
+    JourneyAvailabilityRequestSerializer,
+    JourneyAvailabilitySerializer,
 )
 
 
 class BaseViewSet(
+    SparseFieldsetViewMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
@@ -42,9 +63,13 @@ class BaseViewSet(
 
 
 @extend_schema_view(
-    list=extend_schema(summary="List all stations"),
+    list=extend_schema(
+        summary="List all stations", parameters=FIELDSET_PARAMETERS
+    ),
     create=extend_schema(summary="Create a new station (admin only)"),
-    retrieve=extend_schema(summary="Retrieve a specific station"),
+    retrieve=extend_schema(
+        summary="Retrieve a specific station", parameters=FIELDSET_PARAMETERS
+    ),
     update=extend_schema(summary="Update a specific station (admin only)"),
     partial_update=extend_schema(
         summary="Partially update a specific station (admin only)"
@@ -54,11 +79,83 @@ class StationViewSet(BaseViewSet):
     queryset = Station.objects.all()
     serializer_class = StationSerializer
 
+    @extend_schema(
+        summary="Autocomplete station names",
+        description=(
+            "Stations whose name, or a word of it, starts with the query, "
+            "then stations containing it or close to it, ignoring case "
+            "and diacritics. Ties are ranked by recent ticket sales."
+        ),
+        parameters=[
+            OpenApiParameter(
+                name="q",
+                type=OpenApiTypes.STR,
+                description="Beginning of a station name.",
+            ),
+            OpenApiParameter(
+                name="limit",
+                type=OpenApiTypes.INT,
+                description=(
+                    "Maximum number of suggestions, "
+                    f"at most {settings.AUTOCOMPLETE_LIMIT} (the default)."
+                ),
+            ),
+        ],
+        responses=StationAutocompleteSerializer(many=True),
+    )
+    @action(methods=["GET"], detail=False)
+    def autocomplete(self, request) -> Response:
+        limit = request.query_params.get("limit", "")
+        limit = int(limit) if limit.isdigit() else settings.AUTOCOMPLETE_LIMIT
+        stations = get_index().search(
+            request.query_params.get("q", ""),
+            min(limit, settings.AUTOCOMPLETE_LIMIT),
+        )
+        return Response(
+            StationAutocompleteSerializer(stations, many=True).data
+        )
+
+    @extend_schema(
+        summary="Shortest network distance between two stations",
+        description=(
+            "Distance in km of the shortest sequence of routes from this "
+            "station to the destination, and the stations it passes. "
+            "Read from a precomputed all-pairs matrix."
+        ),
+        responses=StationDistanceSerializer,
+    )
+    @action(
+        methods=["GET"],
+        detail=True,
+        url_path=r"distance/(?P<destination>\d+)",
+    )
+    def distance(self, request, pk=None, destination=None) -> Response:
+        matrix = get_matrix()
+        if not pk.isdigit() or matrix is None:
+            raise NotFound("No connection between these stations.")
+        source, destination = int(pk), int(destination)
+        distance = matrix.distance(source, destination)
+        if distance is None:
+            raise NotFound("No connection between these stations.")
+        return Response(
+            {
+                "source": source,
+                "destination": destination,
+                "distance": distance,
+                "path": matrix.path(source, destination),
+            }
+        )
+
 
 @extend_schema_view(
-    list=extend_schema(summary="List all train types"),
+    list=extend_schema(
+        summary="List all train types", parameters=FIELDSET_PARAMETERS
+    ),
     create=extend_schema(summary="Create a new train type (admin only)"),
-    retrieve=extend_schema(summary="Retrieve a specific train type"),
+    retrieve=extend_schema(
+        summary="Retrieve a specific train type",
+        parameters=FIELDSET_PARAMETERS,
+    ),
     update=extend_schema(summary="Update a specific train type (admin only)"),
     partial_update=extend_schema(
         summary="Partially update a specific train type (admin only)"
@@ -70,9 +167,14 @@ class TrainTypeViewSet(BaseViewSet):
 
 
 @extend_schema_view(
-    list=extend_schema(summary="List all crew members"),
+    list=extend_schema(
+        summary="List all crew members", parameters=FIELDSET_PARAMETERS
+    ),
     create=extend_schema(summary="Create a new crew member (admin only)"),
-    retrieve=extend_schema(summary="Retrieve a specific crew member"),
+    retrieve=extend_schema(
+        summary="Retrieve a specific crew member",
+        parameters=FIELDSET_PARAMETERS,
+    ),
     update=extend_schema(summary="Update a specific crew member (admin only)"),
     partial_update=extend_schema(
         summary="Partially update a specific crew member (admin only)"
@@ -84,18 +186,30 @@ class CrewViewSet(BaseViewSet):
 
 
 @extend_schema_view(
-    list=extend_schema(summary="List all routes"),
+    list=extend_schema(
+        summary="List all routes", parameters=FIELDSET_PARAMETERS
+    ),
     create=extend_schema(summary="Create a new route (admin only)"),
-    retrieve=extend_schema(summary="Retrieve a specific route"),
+    retrieve=extend_schema(
+        summary="Retrieve a specific route", parameters=FIELDSET_PARAMETERS
+    ),
     update=extend_schema(summary="Update a specific route (admin only)"),
     partial_update=extend_schema(
         summary="Partially update a specific route (admin only)"
     ),
 )
 class RouteViewSet(BaseViewSet):
-    queryset = Route.objects.select_related("source", "destination")
+    queryset = Route.objects.all()
     serializer_class = RouteSerializer
 
+    def get_queryset(self) -> QuerySet:
+        queryset = self.queryset
+        if self.action in ("list", "retrieve"):
+            for relation in ("source", "destination"):
+                if self.expands_field(relation):
+                    queryset = queryset.select_related(relation)
+        return queryset
+
     def get_serializer_class(self) -> Type[Serializer]:
         if self.action in ("list", "retrieve"):
             return RouteListSerializer
@@ -103,18 +217,29 @@ class RouteViewSet(BaseViewSet):
 
 
 @extend_schema_view(
-    list=extend_schema(summary="List all trains"),
+    list=extend_schema(
+        summary="List all trains", parameters=FIELDSET_PARAMETERS
+    ),
     create=extend_schema(summary="Create a new train (admin only)"),
-    retrieve=extend_schema(summary="Retrieve a specific train"),
+    retrieve=extend_schema(
+        summary="Retrieve a specific train", parameters=FIELDSET_PARAMETERS
+    ),
     update=extend_schema(summary="Update a specific train (admin only)"),
     partial_update=extend_schema(
         summary="Partially update a specific train (admin only)"
     ),
 )
 class TrainViewSet(BaseViewSet):
-    queryset = Train.objects.select_related("train_type")
+    queryset = Train.objects.all()
     serializer_class = TrainSerializer
 
+    def get_queryset(self) -> QuerySet:
+        queryset = self.queryset
+        relation = "train_type_name" if self.action == "list" else "train_type"
+        if self.expands_field(relation):
+            queryset = queryset.select_related("train_type")
+        return queryset
+
     def get_serializer_class(self) -> Type[Serializer]:
         if self.action == "list":
             return TrainListSerializer
@@ -175,12 +300,16 @@ class TrainViewSet(BaseViewSet):
                 type=OpenApiTypes.DATE,
                 description="Filter by departure date (format: YYYY-MM-DD).",
             ),
+            *FIELDSET_PARAMETERS,
         ],
     ),
     create=extend_schema(
         summary="Create a new journey (admin only)",
         description=(
             "Create a new journey for a specific route and train. "
+            "A list of journeys can be sent to import them at once. "
+            "Journeys overlapping another journey of the same train or "
+            "crew member are rejected. "
             "Only administrators can perform this action."
         ),
     ),
@@ -190,6 +319,7 @@ class TrainViewSet(BaseViewSet):
             "Retrieve detailed information about a specific journey, "
             "including the route, train, crew, and taken seats."
         ),
+        parameters=FIELDSET_PARAMETERS,
     ),
     update=extend_schema(
         summary="Update a specific journey (admin only)",
@@ -209,51 +339,192 @@ class TrainViewSet(BaseViewSet):
 class JourneyViewSet(BaseViewSet):
     queryset = Journey.objects.all()
     serializer_class = JourneySerializer
+    throttle_scopes = {
+        "list": "journey_search",
+        "availability": "journey_search",
+    }
 
-    def get_queryset(self) -> QuerySet:
-        queryset = self.queryset
+    def get_search_queryset(self) -> QuerySet:
+        """Journey search, answered from the JourneySearchEntry table."""
+        queryset = JourneySearchEntry.objects.all()
 
         if source := self.request.query_params.get("from"):
             if source.isdigit():
-                queryset = queryset.filter(route__source__id=int(source))
+                queryset = queryset.filter(source_id=int(source))
             else:
                 queryset = queryset.filter(
-                    route__source__name__icontains=source
+                    source_id__in=get_index().station_ids(source)
                 )
 
         if destination := self.request.query_params.get("to"):
             if destination.isdigit():
-                queryset = queryset.filter(
-                    route__destination__id=int(destination)
-                )
+                queryset = queryset.filter(destination_id=int(destination))
             else:
                 queryset = queryset.filter(
-                    route__destination__name__icontains=destination
+                    destination_id__in=get_index().station_ids(destination)
                 )
 
         if date := self.request.query_params.get("date"):
-            queryset = queryset.filter(departure_time__date=date)
+            queryset = queryset.filter(departure_date=date)
+
+        return queryset
 
+    def get_queryset(self) -> QuerySet:
         if self.action == "list":
-            queryset = queryset.select_related(
-                "route__source", "route__destination", "train"
-            ).annotate(
-                tickets_available=(
-                    F("train__cargo_num") * F("train__places_in_cargo")
-                    - Count("tickets")
-                )
+            return self.only_requested(
+                self.get_search_queryset(),
+                {
+                    "route": ["source_name", "destination_name"],
+                    "train_name": "train_name",
+                    "train_capacity": "capacity",
+                    "tickets_available": "tickets_available",
+                    "fare": "fare",
+                    "departure_time": "departure_time",
+                    "arrival_time": "arrival_time",
+                },
             )
 
+        queryset = self.queryset
         if self.action == "retrieve":
-            queryset = queryset.select_related(
-                "route__source", "route__destination", "train"
-            ).prefetch_related("crew", "tickets")
+            if self.expands_field("route"):
+                queryset = queryset.select_related(
+                    "route__source", "route__destination"
+                )
+            if self.expands_field("train"):
+                queryset = queryset.select_related("train")
+            if self.wants_field("crew"):
+                queryset = queryset.prefetch_related("crew")
+            if self.wants_field("taken_seats"):
+                queryset = queryset.prefetch_related("tickets")
+            if self.wants_field("tickets_available"):
+                queryset = queryset.annotate(
+                    tickets_available=(
+                        F("train__cargo_num") * F("train__places_in_cargo")
+                        - Count("tickets")
+                    )
+                )
+            if self.wants_field("fare"):
+                queryset = queryset.annotate(fare=F("search_entry__fare"))
+            queryset = self.only_requested(
+                queryset,
+                {
+                    "route": "route",
+                    "train": "train",
+                    "departure_time": "departure_time",
+                    "arrival_time": "arrival_time",
+                },
+            )
 
         return queryset
 
     def get_serializer_class(self) -> Type[Serializer]:
         if self.action == "list":
-            return JourneyListSerializer
+            return JourneySearchEntrySerializer
         if self.action == "retrieve":
             return JourneyDetailSerializer
+        if self.action == "availability":
+            return JourneyAvailabilityRequestSerializer
         return self.serializer_class
+
+    @extend_schema(
+        summary="Seat availability of many journeys",
+        description=(
+            "Return the remaining seats of up to "
+            f"{settings.AVAILABILITY_MAX_JOURNEYS} journeys, given by id "
+            "or by a departure date range, in a single request. "
+            "Set `cargos` to also get the free seats of every cargo."
+        ),
+        responses=JourneyAvailabilitySerializer(many=True),
+    )
+    @action(
+        methods=["POST"],
+        detail=False,
+        permission_classes=[AllowAny],
+    )
+    def availability(self, request) -> Response:
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        if "journeys" in data:
+            journey_filter = Q(journey_id__in=data["journeys"])
+        else:
+            journey_filter = Q(
+                departure_date__gte=data["date_from"],
+                departure_date__lte=data["date_to"],
+            )
+        try:
+            results = journey_availability(journey_filter, data["cargos"])
+        except TooManyJourneys:
+            raise ValidationError(
+                {
+                    "date_to": (
+                        "More than "
+                        f"{settings.AVAILABILITY_MAX_JOURNEYS} journeys "
+                        "depart in this range; narrow it down."
+                    )
+                }
+            )
+        return Response(JourneyAvailabilitySerializer(results, many=True).data)
+
+    def get_serializer(self, *args, **kwargs) -> Serializer:
+        # A list payload on create is a bulk import of journeys.
+        if self.action == "create" and isinstance(kwargs.get("data"), list):
+            kwargs["many"] = True
+        return super().get_serializer(*args, **kwargs)
+
+
+CHANGE_FEED_SERIALIZERS = {
+    "stations": StationSerializer,
+    "train_types": TrainTypeSerializer,
+    "crews": CrewSerializer,
+    "routes": RouteSerializer,
+    "trains": TrainSerializer,
+    "journeys": JourneySerializer,
+}
+
+
+class ChangeFeedView(generics.GenericAPIView):
+    serializer_class = ChangeFeedRequestSerializer
+    permission_classes = (IsAdminOrReadOnly,)
+
+    @extend_schema(
+        summary="Catalogue changes since a token",
+        description=(
+            "Return the stations, train types, crews, routes, trains and "
+            "journeys saved or deleted after `since`, with the token to "
+            "pass next time. Without `since`, only the current token is "
+            "returned. While `has_more` is true, call again with the new "
+            "token. A token older than the change log answers 410; the "
+            "client then downloads the catalogue again."
+        ),
+        parameters=[
+            OpenApiParameter(
+                name="since",
+                type=OpenApiTypes.INT,
+                description="Token returned by the previous call.",
+            ),
+        ],
+        responses=OpenApiTypes.OBJECT,
+    )
+    def get(self, request) -> Response:
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        since = serializer.validated_data.get("since")
+        if since is None:
+            return Response(
+                {"token": latest_token(), "has_more": False, "changes": {}}
+            )
+
+        try:
+            changes, token, has_more = read_changes(
+                since, CHANGE_FEED_SERIALIZERS, self.get_serializer_context()
+            )
+        except TokenExpired:
+            return Response(
+                {"detail": "Token expired, download the catalogue again."},
+                status=status.HTTP_410_GONE,
+            )
+        return Response(
+            {"token": token, "has_more": has_more, "changes": changes}
+        )
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.5 on 2026-10-19 09:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("user", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ThrottleState",
+            fields=[
+                (
+                    "key",
+                    models.CharField(
+                        max_length=255, primary_key=True, serialize=False
+                    ),
+                ),
+                ("tat", models.FloatField(db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 10:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("user", "0002_throttlestate"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="throttlestate",
+            name="tat",
+            field=models.FloatField(),
+        ),
+    ]
@@ -50,3 +50,14 @@ class User(AbstractUser):
     REQUIRED_FIELDS = []
 
     objects = UserManager()
+
+
+class ThrottleState(models.Model):
+    """Theoretical arrival time of the next request for a throttle key."""
+
+    key = models.CharField(max_length=255, primary_key=True)
+    # Rewritten on every request; left unindexed to allow HOT updates.
+    tat = models.FloatField()
+
+    def __str__(self) -> str:
+        return self.key
@@ -0,0 +1,116 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from django.test import TestCase, override_settings
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from user.models import ThrottleState
+from user.throttling import AnonThrottle, CacheThrottleStore, ScopedThrottle
+
+LOCAL_STORE = {"BACKEND": "user.throttling.LocalMemoryThrottleStore"}
+DATABASE_STORE = {"BACKEND": "user.throttling.DatabaseThrottleStore"}
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_request(ip="10.0.0.1"):
+    return Request(APIRequestFactory().get("/", REMOTE_ADDR=ip))
+
+
+class GCRAThrottleTests(TestCase):
+    def setUp(self):
+        self.timer = FakeTimer()
+
+    def make_throttle(self, throttle_class=AnonThrottle, rate="3/minute"):
+        throttle = throttle_class()
+        throttle.timer = self.timer
+        throttle.THROTTLE_RATES = {
+            "anon": rate,
+            "journey_search": "2/minute",
+        }
+        if throttle_class is AnonThrottle:
+            throttle.rate = rate
+            throttle.num_requests, throttle.duration = throttle.parse_rate(
+                rate
+            )
+        return throttle
+
+    @override_settings(THROTTLE_STORE=LOCAL_STORE)
+    def test_burst_up_to_limit_then_denied(self):
+        """Test that the limit allows a burst and then reports a wait"""
+        request = make_request("10.0.0.2")
+        results = [
+            self.make_throttle().allow_request(request, None) for _ in range(4)
+        ]
+        self.assertEqual(results, [True, True, True, False])
+
+        throttle = self.make_throttle()
+        self.assertFalse(throttle.allow_request(request, None))
+        self.assertAlmostEqual(throttle.wait(), 20.0)
+
+        self.timer.now += 20
+        self.assertTrue(self.make_throttle().allow_request(request, None))
+
+    @override_settings(THROTTLE_STORE=DATABASE_STORE)
+    def test_database_store_keeps_one_row_per_key(self):
+        """Test that the database store keeps a single row per client"""
+        request = make_request("10.0.0.3")
+        for _ in range(3):
+            self.make_throttle().allow_request(request, None)
+
+        self.assertEqual(ThrottleState.objects.count(), 1)
+        self.assertFalse(self.make_throttle().allow_request(request, None))
+
+    @override_settings(THROTTLE_STORE=LOCAL_STORE)
+    def test_scope_is_selected_per_action(self):
+        """Test that scoped throttles apply only to the mapped actions"""
+        request = make_request("10.0.0.4")
+        scopes = {"list": "journey_search"}
+        list_view = SimpleNamespace(action="list", throttle_scopes=scopes)
+        create_view = SimpleNamespace(action="create", throttle_scopes=scopes)
+
+        results = [
+            self.make_throttle(ScopedThrottle).allow_request(
+                request, list_view
+            )
+            for _ in range(3)
+        ]
+        self.assertEqual(results, [True, True, False])
+        self.assertTrue(
+            self.make_throttle(ScopedThrottle).allow_request(
+                request, create_view
+            )
+        )
+
+
+class CacheThrottleStoreTests(TestCase):
+    def test_concurrent_updates_do_not_exceed_limit(self):
+        """Test that workers sharing a cache cannot overwrite each other"""
+        store = CacheThrottleStore(lock_wait=5)
+        allowed = []
+
+        def advance(count):
+            # Widen the window between reading and writing the state.
+            time.sleep(0.001)
+            count = (count or 0) + 1
+            return None if count > 10 else count
+
+        def request_many():
+            for _ in range(4):
+                allowed.append(store.update("cache-test", advance, 60))
+
+        threads = [threading.Thread(target=request_many) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(allowed.count(True), 10)
@@ -0,0 +1,181 @@
+import random
+import threading
+import time
+from typing import Callable, TYPE_CHECKING
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpRequest
+from django.utils.module_loading import import_string
+from rest_framework.throttling import (
+    AnonRateThrottle,
+    ScopedRateThrottle,
+    UserRateThrottle,
+)
+
+if TYPE_CHECKING:
+    # Throttle classes are imported while rest_framework.views loads.
+    from rest_framework.views import APIView
+
+Advance = Callable[[float | None], float | None]
+
+
+class LocalMemoryThrottleStore:
+    """
+    Per-process store. Only accurate with a single worker,
+    but needs no shared infrastructure.
+    """
+
+    _tats: dict[str, float] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, max_entries: int = 10000) -> None:
+        self.max_entries = max_entries
+
+    def update(self, key: str, advance: Advance, ttl: int) -> bool:
+        with self._lock:
+            tat = advance(self._tats.get(key))
+            if tat is None:
+                return False
+            self._tats[key] = tat
+            if len(self._tats) > self.max_entries:
+                self._prune()
+            return True
+
+    def _prune(self) -> None:
+        now = time.time()
+        for key in [k for k, tat in self._tats.items() if tat <= now]:
+            del self._tats[key]
+
+
+class CacheThrottleStore:
+    """
+    Keeps throttle state in any configured Django cache. Only shared by
+    the workers using a shared cache backend, such as Redis or Memcached.
+
+    Updates of a key hold a lock entry added with `cache.add`, so workers
+    do not overwrite each other's TAT. A request that cannot take the
+    lock within `lock_wait` seconds is throttled.
+    """
+
+    def __init__(
+        self,
+        alias: str = "default",
+        lock_timeout: int = 1,
+        lock_wait: float = 0.05,
+    ) -> None:
+        self.cache = caches[alias]
+        self.lock_timeout = lock_timeout
+        self.lock_wait = lock_wait
+
+    def update(self, key: str, advance: Advance, ttl: int) -> bool:
+        lock_key = f"{key}:lock"
+        deadline = time.monotonic() + self.lock_wait
+        while not self.cache.add(lock_key, 1, self.lock_timeout):
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.001)
+        try:
+            tat = advance(self.cache.get(key))
+            if tat is None:
+                return False
+            self.cache.set(key, tat, ttl)
+            return True
+        finally:
+            self.cache.delete(lock_key)
+
+
+class DatabaseThrottleStore:
+    """
+    Keeps throttle state in the ThrottleState table, so every worker
+    sharing the database sees the same limits.
+    """
+
+    def __init__(self, purge_probability: float = 0.01) -> None:
+        self.purge_probability = purge_probability
+
+    def update(self, key: str, advance: Advance, ttl: int) -> bool:
+        from .models import ThrottleState
+
+        with transaction.atomic():
+            (
+                state,
+                created,
+            ) = ThrottleState.objects.select_for_update().get_or_create(
+                key=key, defaults={"tat": 0.0}
+            )
+            tat = advance(None if created else state.tat)
+            if tat is not None:
+                state.tat = tat
+                state.save(update_fields=["tat"])
+
+        if random.random() < self.purge_probability:
+            ThrottleState.objects.filter(tat__lt=time.time()).delete()
+        return tat is not None
+
+
+def get_throttle_store():
+    config = settings.THROTTLE_STORE
+    return import_string(config["BACKEND"])(**config.get("OPTIONS", {}))
+
+
+class GCRAThrottleMixin:
+    """
+    Generic cell rate algorithm on top of DRF's rate throttles.
+
+    Only the theoretical arrival time (TAT) of the next request is stored
+    per key, instead of the timestamp history kept by SimpleRateThrottle.
+    """
+
+    retry_after = None
+
+    def allow_request(self, request: HttpRequest, view: "APIView") -> bool:
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        interval = self.duration / self.num_requests
+
+        def advance(tat: float | None) -> float | None:
+            new_tat = max(tat or self.now, self.now) + interval
+            if new_tat - self.now > self.duration:
+                self.retry_after = new_tat - self.now - self.duration
+                return None
+            return new_tat
+
+        return get_throttle_store().update(self.key, advance, self.duration)
+
+    def wait(self) -> float | None:
+        return self.retry_after
+
+
+class AnonThrottle(GCRAThrottleMixin, AnonRateThrottle):
+    pass
+
+
+class UserThrottle(GCRAThrottleMixin, UserRateThrottle):
+    pass
+
+
+class ScopedThrottle(GCRAThrottleMixin, ScopedRateThrottle):
+    """
+    Applies the rate of the view's scope. The scope is looked up per action
+    in `view.throttle_scopes` and falls back to `view.throttle_scope`.
+    """
+
+    def allow_request(self, request: HttpRequest, view: "APIView") -> bool:
+        scopes = getattr(view, "throttle_scopes", {})
+        self.scope = scopes.get(getattr(view, "action", None)) or getattr(
+            view, self.scope_attr, None
+        )
+        if not self.scope:
+            return True
+
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)